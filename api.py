@@ -2,7 +2,7 @@ from flask import Blueprint, request, redirect, jsonify, url_for, session, abort
 from werkzeug.exceptions import BadRequest
 from sqlalchemy import and_, or_, cast, desc, asc, func
 from sqlalchemy.exc import SQLAlchemyError
-from datetime import datetime, time, timedelta
+from datetime import datetime, timedelta
 from requests import get as requests_get
 from sqlalchemy.orm import joinedload
 from flask_login import current_user
@@ -28,6 +28,7 @@ from website_scripts import (
     notifications,
     image_util,
     captcha_util,
+    rollup_util,
 )
 
 api = Blueprint("api", __name__)
@@ -97,78 +98,52 @@ def get_home_dashboard():
     now = datetime.utcnow()
     today = now.date()
     start_date = today - timedelta(days=6)  # inclusive 7-day window
-    start_dt = datetime.combine(start_date, time.min)
+
+    # Everything comes from the daily rollups, so this reads O(days) rows
+    # instead of scanning stories, reactions, comments and bookmarks.
 
     # ── 1) STORIES PER DAY ──
     daily = (
         extensions.db.session.query(
-            cast(models.Story.pub_date, Date).label("day"),
-            func.count(models.Story.id).label("count"),
+            models.StoryDailyCount.day,
+            func.sum(models.StoryDailyCount.stories).label("count"),
         )
-        .filter(cast(models.Story.pub_date, Date) >= start_date)
-        .group_by("day")
-        .order_by("day")
+        .filter(models.StoryDailyCount.day >= start_date)
+        .group_by(models.StoryDailyCount.day)
         .all()
     )
-    day_map = {r.day: r.count for r in daily}
-    days = [start_date + timedelta(days=i) for i in range(7)]
-    stories_last_7_days = [day_map.get(d, 0) for d in days]
+    stories_last_7_days = rollup_util.daily_series(
+        {r.day: int(r.count) for r in daily}, start_date, 7
+    )
 
     # ── 2) TOP 5 COUNTRIES ──
-    # get raw category counts, then aggregate on country‐prefix
+    # get per-category counts, then aggregate on country‐prefix
     raw = (
         extensions.db.session.query(
-            models.Category.name, func.count(models.Story.id).label("count")
+            models.Category.name, func.sum(models.StoryDailyCount.stories)
         )
-        .join(models.Story, models.Story.category_id == models.Category.id)
-        .filter(cast(models.Story.pub_date, Date) >= start_date)
+        .join(
+            models.StoryDailyCount,
+            models.StoryDailyCount.category_id == models.Category.id,
+        )
+        .filter(models.StoryDailyCount.day >= start_date)
         .group_by(models.Category.name)
         .all()
     )
-    # fold into per‐country totals
-    country_totals = {}
-    for cat_name, cnt in raw:
-        country = cat_name.split("_", 1)[0].upper()
-        country_totals[country] = country_totals.get(country, 0) + cnt
-
-    top_countries = [
-        {"country": c, "count": country_totals[c]}
-        for c in sorted(country_totals, key=lambda k: country_totals[k], reverse=True)[
-            :5
-        ]
-    ]
+    top_countries = rollup_util.top_countries(raw, limit=5)
 
     # ── 3) ENGAGEMENT METRICS ──
-    likes = (
-        extensions.db.session.query(func.count(models.StoryReaction.id))
-        .filter(
-            models.StoryReaction.action == "like",
-            models.StoryReaction.created_at >= start_dt,
-        )
-        .scalar()
-        or 0
-    )
-    dislikes = (
-        extensions.db.session.query(func.count(models.StoryReaction.id))
-        .filter(
-            models.StoryReaction.action == "dislike",
-            models.StoryReaction.created_at >= start_dt,
+    engagement = (
+        extensions.db.session.query(
+            *(
+                func.coalesce(func.sum(getattr(models.EngagementDailyCount, metric)), 0)
+                for metric in rollup_util.ENGAGEMENT_METRICS
+            )
         )
-        .scalar()
-        or 0
-    )
-    comments = (
-        extensions.db.session.query(func.count(models.Comment.id))
-        .filter(models.Comment.created_at >= start_dt)
-        .scalar()
-        or 0
-    )
-    shares = (
-        extensions.db.session.query(func.count(models.Bookmark.id))
-        .filter(models.Bookmark.created_at >= start_dt)
-        .scalar()
-        or 0
+        .filter(models.EngagementDailyCount.day >= start_date)
+        .one()
     )
+    likes, dislikes, comments, shares = (int(value) for value in engagement)
     days_iso = [(start_date + timedelta(days=i)).isoformat() for i in range(7)]
 
     return (
@@ -718,6 +693,9 @@ def story_reaction(action):
         if existing_reaction.action == action:
             # If the reaction is already the same as the requested action, delete it (unreact)
             extensions.db.session.delete(existing_reaction)
+            rollup_util.count_reaction(
+                extensions.db.session, action, existing_reaction.created_at, -1
+            )
 
             if action == "like":
                 story.stats.likes -= 1
@@ -726,8 +704,17 @@ def story_reaction(action):
 
             message = f"{action.capitalize()} removed"
         else:
-            # If the reaction is different, update it
+            # If the reaction is different, update it. It counts as made now,
+            # on the day of its new created_at.
+            rollup_util.count_reaction(
+                extensions.db.session,
+                existing_reaction.action,
+                existing_reaction.created_at,
+                -1,
+            )
             existing_reaction.action = action
+            existing_reaction.created_at = datetime.now()
+            rollup_util.count_reaction(extensions.db.session, action, existing_reaction.created_at)
 
             if action == "like":
                 story.stats.likes += 1
@@ -737,7 +724,6 @@ def story_reaction(action):
                 story.stats.dislikes += 1
                 story.stats.likes -= 1
                 is_disliked = True
-            existing_reaction.created_at = datetime.now()
             message = f"Reaction updated to {action}"
             is_liked = action == "like"
             is_disliked = action == "dislike"
@@ -750,6 +736,7 @@ def story_reaction(action):
             created_at=datetime.now(),
         )
         extensions.db.session.add(new_reaction)
+        rollup_util.count_reaction(extensions.db.session, action, new_reaction.created_at)
 
         if action == "like":
             story.stats.likes += 1
@@ -1005,6 +992,13 @@ def summarize_story(story_url_hash):
     if story.gpt_summary:
         return jsonify({"response": story.gpt_summary}), 200
 
+    # A near-duplicate from another publisher may already be summarized
+    cluster_summary = story.get_cluster_summary()
+    if cluster_summary:
+        story.gpt_summary = cluster_summary
+        extensions.db.session.commit()
+        return jsonify({"response": cluster_summary}), 200
+
     try:
         r = requests_get(story.url, timeout=4)
         if r.status_code == 200:
@@ -1073,7 +1067,10 @@ def chat_about_story(story_url_hash: str):
         article_text = story.description or ""
 
     # Ensure we have/can produce a compact structured summary for grounding
-    summary_obj = story.gpt_summary
+    summary_obj = story.gpt_summary or story.get_cluster_summary()
+    if summary_obj and not story.gpt_summary:
+        story.gpt_summary = summary_obj
+        extensions.db.session.commit()
     if not summary_obj:
         try:
             summary_obj = llm_util.gpt_summarize(
@@ -1119,6 +1116,7 @@ def get_stories():
     end_date = request.args.get("end_date", "", type=str)
     query_search = input_sanitization.sanitize_text(request.args.get("query", "", type=str)).strip()
     include_no_image = request.args.get("include_no_image", "false", type=str).lower() == "true"
+    collapse_duplicates = request.args.get("collapse_duplicates", "true", type=str).lower() == "true"
 
     # 2) Resolve the Category row (e.g. "br_general")
     category = models.Category.query.filter_by(
@@ -1156,6 +1154,17 @@ def get_stories():
     # 6) Start building the main query
     query = models.Story.query.filter(and_(*base_filters))
 
+    # 6.5) Show only the first story of each near-duplicate cluster
+    if collapse_duplicates:
+        cluster_firsts = (
+            extensions.db.session.query(func.min(models.Story.id))
+            .filter(and_(*base_filters), models.Story.cluster_id.isnot(None))
+            .group_by(models.Story.cluster_id)
+        )
+        query = query.filter(
+            or_(models.Story.cluster_id.is_(None), models.Story.id.in_(cluster_firsts))
+        )
+
     # 7) If ordering by "views" or "likes", we need to join StoryStats
     if order_by in ("views", "likes"):
         query = query.outerjoin(
@@ -1298,6 +1307,7 @@ def create_comment():
     )
     extensions.db.session.add(comment)  # stage the INSERT
     extensions.db.session.flush()  # actually send it to the DB, get back the PK
+    rollup_util.count_engagement(extensions.db.session, "comments", comment.created_at)
 
     if type == "story":
         comment.url = (
@@ -1543,6 +1553,9 @@ def add_bookmark():
 
     bm = models.Bookmark(user_id=current_user.id, story_id=story.id)
     extensions.db.session.add(bm)
+    # created_at is set by the database, counted once it's stored
+    extensions.db.session.flush()
+    rollup_util.count_engagement(extensions.db.session, "bookmarks", bm.created_at)
     extensions.db.session.commit()
     return jsonify(message="Bookmarked!"), 201
 
@@ -1556,6 +1569,7 @@ def remove_bookmark(story_id):
     if not bm:
         abort(404, description="Couldn't find target bookmark.")
     extensions.db.session.delete(bm)
+    rollup_util.count_engagement(extensions.db.session, "bookmarks", bm.created_at, -1)
     extensions.db.session.commit()
     return jsonify(message="Removed bookmark"), 200
 
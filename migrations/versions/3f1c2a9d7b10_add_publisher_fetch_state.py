@@ -0,0 +1,34 @@
+"""add publisher_fetch_state
+
+Revision ID: 3f1c2a9d7b10
+Revises: 
+Create Date: 2026-10-17 09:12:41.204518
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c2a9d7b10'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'publisher_fetch_state',
+        sa.Column('publisher_id', sa.Integer(), nullable=False),
+        sa.Column('etag', sa.String(length=255), nullable=True),
+        sa.Column('last_modified', sa.String(length=64), nullable=True),
+        sa.Column('content_hash', mysql.BINARY(length=16), nullable=True),
+        sa.Column('last_fetched_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['publisher_id'], ['publishers.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('publisher_id')
+    )
+
+
+def downgrade():
+    op.drop_table('publisher_fetch_state')
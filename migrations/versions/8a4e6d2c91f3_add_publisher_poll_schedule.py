@@ -0,0 +1,32 @@
+"""add publisher poll schedule
+
+Revision ID: 8a4e6d2c91f3
+Revises: 3f1c2a9d7b10
+Create Date: 2026-10-17 11:03:27.518842
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8a4e6d2c91f3'
+down_revision = '3f1c2a9d7b10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('publisher_fetch_state', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('poll_interval', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('next_due_at', sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column('new_item_ratio', sa.Float(), nullable=True))
+        batch_op.create_index('idx_fetch_state_next_due', ['next_due_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('publisher_fetch_state', schema=None) as batch_op:
+        batch_op.drop_index('idx_fetch_state_next_due')
+        batch_op.drop_column('new_item_ratio')
+        batch_op.drop_column('next_due_at')
+        batch_op.drop_column('poll_interval')
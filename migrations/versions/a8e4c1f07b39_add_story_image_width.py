@@ -0,0 +1,27 @@
+"""add story image_width
+
+Revision ID: a8e4c1f07b39
+Revises: f3d9a6b2c815
+Create Date: 2026-10-18 10:14:07.318842
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision = 'a8e4c1f07b39'
+down_revision = 'f3d9a6b2c815'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('stories', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('image_width', mysql.SMALLINT(unsigned=True), server_default='0', nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('stories', schema=None) as batch_op:
+        batch_op.drop_column('image_width')
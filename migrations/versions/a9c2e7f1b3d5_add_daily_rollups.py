@@ -0,0 +1,68 @@
+"""add daily rollups
+
+Revision ID: a9c2e7f1b3d5
+Revises: e5c83a1f4d27
+Create Date: 2026-10-17 20:04:18.731092
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a9c2e7f1b3d5'
+down_revision = 'e5c83a1f4d27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'story_daily_counts',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('category_id', sa.Integer(), nullable=False),
+        sa.Column('stories', sa.Integer(), server_default='0', nullable=False),
+        sa.ForeignKeyConstraint(['category_id'], ['categories.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('day', 'category_id')
+    )
+    op.create_table(
+        'engagement_daily_counts',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('likes', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('dislikes', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('comments', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('bookmarks', sa.Integer(), server_default='0', nullable=False),
+        sa.PrimaryKeyConstraint('day')
+    )
+
+    # Backfill from the existing rows
+    op.execute(
+        """
+        INSERT INTO story_daily_counts (day, category_id, stories)
+        SELECT DATE(pub_date), category_id, COUNT(*)
+        FROM stories
+        WHERE pub_date IS NOT NULL
+        GROUP BY DATE(pub_date), category_id
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO engagement_daily_counts (day, likes, dislikes, comments, bookmarks)
+        SELECT day, SUM(likes), SUM(dislikes), SUM(comments), SUM(bookmarks)
+        FROM (
+            SELECT DATE(created_at) AS day, action = 'like' AS likes, action = 'dislike' AS dislikes,
+                   0 AS comments, 0 AS bookmarks
+            FROM story_reactions WHERE action IN ('like', 'dislike') AND created_at IS NOT NULL
+            UNION ALL
+            SELECT DATE(created_at), 0, 0, 1, 0 FROM comments WHERE created_at IS NOT NULL
+            UNION ALL
+            SELECT DATE(created_at), 0, 0, 0, 1 FROM bookmarks
+        ) AS events
+        GROUP BY day
+        """
+    )
+
+
+def downgrade():
+    op.drop_table('engagement_daily_counts')
+    op.drop_table('story_daily_counts')
@@ -0,0 +1,26 @@
+"""add stories pub_date index
+
+Revision ID: b7e1f04c5a92
+Revises: 8a4e6d2c91f3
+Create Date: 2026-10-17 14:21:05.903417
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e1f04c5a92'
+down_revision = '8a4e6d2c91f3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('stories', schema=None) as batch_op:
+        batch_op.create_index('idx_stories_pub_date', ['pub_date'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('stories', schema=None) as batch_op:
+        batch_op.drop_index('idx_stories_pub_date')
@@ -0,0 +1,26 @@
+"""add story feed_image_url
+
+Revision ID: c47d1e8a2b60
+Revises: a9c2e7f1b3d5
+Create Date: 2026-10-17 21:26:53.118407
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c47d1e8a2b60'
+down_revision = 'a9c2e7f1b3d5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('stories', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('feed_image_url', sa.String(length=512), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('stories', schema=None) as batch_op:
+        batch_op.drop_column('feed_image_url')
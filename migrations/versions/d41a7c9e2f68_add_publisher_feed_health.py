@@ -0,0 +1,34 @@
+"""add publisher feed health
+
+Revision ID: d41a7c9e2f68
+Revises: b7e1f04c5a92
+Create Date: 2026-10-17 16:02:44.129730
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd41a7c9e2f68'
+down_revision = 'b7e1f04c5a92'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('publisher_fetch_state', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('consecutive_failures', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('last_success_at', sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column('last_error', sa.String(length=32), nullable=True))
+        batch_op.add_column(sa.Column('latency_ewma', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('circuit_open_until', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('publisher_fetch_state', schema=None) as batch_op:
+        batch_op.drop_column('circuit_open_until')
+        batch_op.drop_column('latency_ewma')
+        batch_op.drop_column('last_error')
+        batch_op.drop_column('last_success_at')
+        batch_op.drop_column('consecutive_failures')
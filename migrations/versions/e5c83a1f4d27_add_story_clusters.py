@@ -0,0 +1,31 @@
+"""add story clusters
+
+Revision ID: e5c83a1f4d27
+Revises: d41a7c9e2f68
+Create Date: 2026-10-17 18:37:12.540218
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5c83a1f4d27'
+down_revision = 'd41a7c9e2f68'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('stories', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('minhash', mysql.BINARY(length=128), nullable=True))
+        batch_op.add_column(sa.Column('cluster_id', mysql.BIGINT(unsigned=True), nullable=True))
+        batch_op.create_index('idx_stories_cluster_id', ['cluster_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('stories', schema=None) as batch_op:
+        batch_op.drop_index('idx_stories_cluster_id')
+        batch_op.drop_column('cluster_id')
+        batch_op.drop_column('minhash')
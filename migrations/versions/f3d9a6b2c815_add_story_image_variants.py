@@ -0,0 +1,27 @@
+"""add story image_variants
+
+Revision ID: f3d9a6b2c815
+Revises: c47d1e8a2b60
+Create Date: 2026-10-17 23:02:41.520376
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3d9a6b2c815'
+down_revision = 'c47d1e8a2b60'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('stories', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('image_variants', mysql.TINYINT(unsigned=True), server_default='0', nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('stories', schema=None) as batch_op:
+        batch_op.drop_column('image_variants')
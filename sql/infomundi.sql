@@ -13,11 +13,14 @@ DROP TABLE IF EXISTS user_blocks;
 DROP TABLE IF EXISTS user_reports;
 DROP TABLE IF EXISTS messages;
 DROP TABLE IF EXISTS users;
+DROP TABLE IF EXISTS publisher_fetch_state;
 DROP TABLE IF EXISTS publishers;
 DROP TABLE IF EXISTS categories;
 DROP TABLE IF EXISTS common_passwords;
 DROP TABLE IF EXISTS register_tokens;
 DROP TABLE IF EXISTS site_statistics;
+DROP TABLE IF EXISTS story_daily_counts;
+DROP TABLE IF EXISTS engagement_daily_counts;
 DROP TABLE IF EXISTS stocks;
 DROP TABLE IF EXISTS currencies;
 DROP TABLE IF EXISTS crypto;
@@ -136,6 +139,35 @@ CREATE TABLE publishers (
 );
 
 
+CREATE TABLE publisher_fetch_state (
+    publisher_id INT PRIMARY KEY,
+
+    /* HTTP validators from the last successful fetch, sent back as If-None-Match / If-Modified-Since. The MD5 of the
+    body is kept as a fallback for servers that don't honour conditional requests. */
+    etag VARCHAR(255),
+    last_modified VARCHAR(64),
+    content_hash BINARY(16),
+    last_fetched_at DATETIME,
+
+    -- Adaptive polling: learned interval (seconds), when the publisher is due next and the
+    -- moving average of the fraction of new items per fetch
+    poll_interval INT,
+    next_due_at DATETIME,
+    new_item_ratio FLOAT,
+    KEY idx_fetch_state_next_due (next_due_at),
+
+    -- Feed health: failures in a row, last working fetch, download latency moving average (seconds) and,
+    -- once the circuit breaker trips, when the publisher may be tried again
+    consecutive_failures INT NOT NULL DEFAULT 0,
+    last_success_at DATETIME,
+    last_error VARCHAR(32),
+    latency_ewma FLOAT,
+    circuit_open_until DATETIME,
+
+    FOREIGN KEY (publisher_id) REFERENCES publishers(id) ON DELETE CASCADE
+);
+
+
 CREATE TABLE stories (
     id INT AUTO_INCREMENT PRIMARY KEY,
     
@@ -153,12 +185,29 @@ CREATE TABLE stories (
     
     pub_date DATETIME NOT NULL,
     has_image TINYINT(1) DEFAULT 0,
+    -- Narrower copies of the image stored for srcset, as bits: 1 = 320px, 2 = 640px, 128 = WebP copies of every
+    -- size (see encode_util.VARIANT_BITS). 0 for just the full-size AVIF.
+    image_variants TINYINT UNSIGNED NOT NULL DEFAULT 0,
+    -- Width of the stored full-size image (at most encode_util.STORY_IMAGE_SIZE), its srcset descriptor. 0 if unknown.
+    image_width SMALLINT UNSIGNED NOT NULL DEFAULT 0,
+    -- Image URL from the feed entry (media:content, enclosure or media:thumbnail); search_news_images downloads it
+    -- instead of scraping the story's page
+    feed_image_url VARCHAR(512),
     created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    /* Near-duplicate clustering: MinHash signature of title + description, and the cluster
+    the story belongs to (first 8 bytes of the url_hash of the cluster's first story). */
+    minhash BINARY(128),
+    cluster_id BIGINT UNSIGNED,
     
     category_id INT NOT NULL,
     publisher_id INT NOT NULL,
     country_id MEDIUMINT UNSIGNED,
 
+    /* Retention pruning and the "since" filters look stories up by pub_date */
+    KEY idx_stories_pub_date (pub_date),
+    KEY idx_stories_cluster_id (cluster_id),
+
     FOREIGN KEY (country_id) REFERENCES countries(id),
     FOREIGN KEY (category_id) REFERENCES categories(id),
     FOREIGN KEY (publisher_id) REFERENCES publishers(id)
@@ -234,6 +283,27 @@ CREATE TABLE site_statistics (
 );
 
 
+/* Rollups for the dashboard and site statistics, kept up to date by the writes they count (see rollup_util).
+Stories are counted by the day of their pub_date, engagement by the day it happened. */
+CREATE TABLE story_daily_counts (
+    day DATE NOT NULL,
+    category_id INT NOT NULL,
+    stories INT NOT NULL DEFAULT 0,
+
+    PRIMARY KEY (day, category_id),
+    FOREIGN KEY (category_id) REFERENCES categories(id) ON DELETE CASCADE
+);
+
+
+CREATE TABLE engagement_daily_counts (
+    day DATE PRIMARY KEY,
+    likes INT NOT NULL DEFAULT 0,
+    dislikes INT NOT NULL DEFAULT 0,
+    comments INT NOT NULL DEFAULT 0,
+    bookmarks INT NOT NULL DEFAULT 0
+);
+
+
 CREATE TABLE comments (
     id INT AUTO_INCREMENT PRIMARY KEY,
     page_hash BINARY(16) NOT NULL, -- Unique page identifier (MD5)
@@ -733,6 +733,27 @@ document.addEventListener("DOMContentLoaded", function () {
       });
   }
 
+  // Rendered card width per breakpoint (col-lg-6 col-xl-4), to pick from the srcset
+  const CARD_IMAGE_SIZES = "(min-width: 1200px) 33vw, (min-width: 992px) 50vw, 100vw";
+
+  function createStoryPicture(item, imgTag, lazy) {
+    // One <source> per stored format (AVIF, then WebP if any), each with its width variants
+    const picture = document.createElement("picture");
+    (item.image_sources || []).forEach((source) => {
+      const sourceTag = document.createElement("source");
+      sourceTag.type = source.type;
+      sourceTag.sizes = CARD_IMAGE_SIZES;
+      if (lazy) {
+        sourceTag.setAttribute("data-srcset", source.srcset);
+      } else {
+        sourceTag.srcset = source.srcset;
+      }
+      picture.appendChild(sourceTag);
+    });
+    picture.appendChild(imgTag);
+    return picture;
+  }
+
   function createStoryCard(item, index) {
     const colDiv = document.createElement("div");
     colDiv.classList.add("col-lg-6", "col-xl-4", "my-5");
@@ -758,7 +779,7 @@ document.addEventListener("DOMContentLoaded", function () {
         imgTag.setAttribute("data-src", item.image_url);
         imgTag.classList.add("lazyload");
       }
-      imageLink.appendChild(imgTag);
+      imageLink.appendChild(createStoryPicture(item, imgTag, index >= 3));
       cardDiv.appendChild(imageLink);
     } else {
       // No image available - use placeholder
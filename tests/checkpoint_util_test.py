@@ -0,0 +1,96 @@
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+from website_scripts import checkpoint_util
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "checkpoint.json")
+
+
+def test_resume_restores_progress(path):
+    checkpoint = checkpoint_util.RunCheckpoint.load(path)
+    assert not checkpoint.resumed
+    checkpoint.order_categories([(3, "c"), (1, "a"), (2, "b")])
+    checkpoint.plan({10: 1, 11: 1, 20: 2})
+    for publisher_id in (10, 11, 20):
+        checkpoint.start(publisher_id)
+    checkpoint.finish(10, {"error": None, "latency": 0.5})
+    checkpoint.finish(11, {"error": "timeout", "latency": 5.0})
+    checkpoint.save(force=True)
+
+    resumed = checkpoint_util.RunCheckpoint.load(path)
+    assert resumed.resumed
+    assert resumed.started_at == checkpoint.started_at
+    assert resumed.completed_categories == {1}
+    assert resumed.in_flight == {20}
+    assert resumed.is_done(11) and not resumed.is_done(20)
+    assert resumed.outcome(11) == {"error": "timeout", "latency": 5.0}
+    assert resumed.order_categories([(1, "a"), (4, "d"), (2, "b"), (3, "c")]) == [
+        (3, "c"), (1, "a"), (2, "b"), (4, "d")
+    ]
+
+
+def test_resumed_outcomes_include_publishers_no_longer_due(path):
+    checkpoint = checkpoint_util.RunCheckpoint.load(path)
+    checkpoint.plan({10: 1, 11: 1, 12: 1, 13: 1})
+    checkpoint.finish(10, {"error": None, "latency": 0.5})
+    checkpoint.finish(11, {"error": "timeout", "latency": 5.0})
+    checkpoint.finish(12, {"error": None, "latency": 0.2})
+    checkpoint.forget_outcomes([12])
+    checkpoint.save(force=True)
+
+    # 10 was fetched fine, so its next poll is planned ahead: only 11 and 13 are due
+    due = [{"id": 11}, {"id": 13}]
+    resumed, not_due_ids = checkpoint_util.RunCheckpoint.load(path).resumed_outcomes(due)
+
+    assert resumed == [{"id": 11, "fetch_outcome": {"error": "timeout", "latency": 5.0}}]
+    assert not_due_ids == [10]
+
+
+def test_forgotten_outcomes_stay_done(path):
+    checkpoint = checkpoint_util.RunCheckpoint.load(path)
+    checkpoint.finish(10, {"error": "http_503", "latency": 0.1})
+    checkpoint.forget_outcomes([10, 99])
+    checkpoint.save(force=True)
+
+    resumed = checkpoint_util.RunCheckpoint.load(path)
+    assert resumed.is_done(10) and resumed.outcome(10) is None
+    assert not resumed.is_done(99)
+
+
+def test_without_resume_starts_fresh(path):
+    checkpoint = checkpoint_util.RunCheckpoint.load(path)
+    checkpoint.finish(10)
+    checkpoint.save(force=True)
+
+    assert not checkpoint_util.RunCheckpoint.load(path, resume=False).is_done(10)
+
+
+@pytest.mark.parametrize("content", ["", "{not json", "[1, 2]", '{"done": [1]}'])
+def test_corrupt_checkpoint_starts_fresh(path, content):
+    with open(path, "w") as f:
+        f.write(content)
+    assert not checkpoint_util.RunCheckpoint.load(path).resumed
+
+
+def test_stale_checkpoint_starts_fresh(path):
+    checkpoint = checkpoint_util.RunCheckpoint.load(path)
+    checkpoint.finish(10)
+    checkpoint.save(force=True)
+    os.utime(path, (0, 0))
+
+    assert not checkpoint_util.RunCheckpoint.load(path).resumed
+
+
+def test_clear_removes_file(path):
+    checkpoint = checkpoint_util.RunCheckpoint.load(path)
+    checkpoint.save(force=True)
+    checkpoint.clear()
+    checkpoint.clear()
+    assert not os.path.exists(path)
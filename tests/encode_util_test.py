@@ -0,0 +1,106 @@
+import pytest
+import sys
+import os
+
+from io import BytesIO
+from PIL import Image
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+from website_scripts import encode_util, preview_util
+
+
+def make_image(size, image_format="JPEG", mode="RGB") -> bytes:
+    buffer = BytesIO()
+    Image.new(mode, size, "teal").save(buffer, format=image_format)
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize(
+    "size,box,fitted",
+    [
+        ((4000, 3000), (1280, 720), (960, 720)),
+        ((4000, 1000), (1280, 720), (1280, 320)),
+        ((640, 480), (1280, 720), (640, 480)),
+        ((5000, 1), (32, 32), (32, 1)),
+    ],
+)
+def test_fit_size(size, box, fitted):
+    assert encode_util.fit_size(size, box) == fitted
+
+
+def test_open_image_drafts_large_jpegs():
+    image = encode_util.open_image(make_image((4000, 3000)), encode_util.STORY_IMAGE_SIZE)
+    # 1/2 scale is the smallest JPEG decode that still covers twice 960x720
+    assert image.size == (2000, 1500)
+
+    image = encode_util.open_image(make_image((4000, 3000), "PNG"), encode_util.STORY_IMAGE_SIZE)
+    assert image.size == (4000, 3000)
+
+
+@pytest.mark.parametrize("tier", list(encode_util.AVIF_TIERS))
+def test_encode_story_image(tier):
+    data = encode_util.encode_story_image(make_image((2600, 1400)), tier)
+    assert preview_util.sniff_image(data[:preview_util.IMAGE_SNIFF_SIZE]) == "avif"
+    with Image.open(BytesIO(data)) as image:
+        assert image.size == (1280, 689)
+
+
+def test_encode_story_image_converts_modes():
+    data = encode_util.encode_story_image(make_image((300, 200), "PNG", "RGBA"), "fast")
+    with Image.open(BytesIO(data)) as image:
+        assert image.size == (300, 200)
+
+
+def test_encode_favicon():
+    data = encode_util.encode_favicon(make_image((180, 180), "PNG"))
+    with Image.open(BytesIO(data)) as image:
+        assert image.format == "ICO" and image.size == (32, 32)
+
+
+def test_small_and_undecodable_images():
+    assert encode_util.encode_story_image(make_image((9, 400))) is None
+    assert encode_util.encode_favicon(make_image((1, 1), "GIF", "P")) is None
+    with pytest.raises(Exception):
+        encode_util.encode_story_image(b"\xff\xd8\xff" + b"\x00" * 64)
+
+
+def test_encode_story_variants_from_one_decode():
+    variants, width, files = encode_util.encode_story_variants(make_image((2600, 1400)), "fast", webp=True)
+    assert variants == 1 | 2 | encode_util.WEBP_BIT
+    assert width == 1280
+    assert list(files) == [
+        ".avif", ".webp", "-320.avif", "-320.webp", "-640.avif", "-640.webp",
+    ]
+    assert sorted(files) == sorted(encode_util.variant_suffixes(variants))
+
+    widths = {}
+    for suffix, data in files.items():
+        with Image.open(BytesIO(data)) as image:
+            assert image.format == suffix.rsplit(".", 1)[1].upper()
+            widths[suffix] = image.size
+    assert widths["-320.avif"] == (320, 172)
+    assert widths["-640.webp"] == (640, 344)
+    assert widths[".avif"] == (1280, 689)
+
+
+@pytest.mark.parametrize(
+    "size,variants,width",
+    [
+        ((500, 400), 1, 500),
+        ((320, 200), 0, 320),
+        ((641, 360), 3, 641),
+        ((4000, 3000), 3, 960),
+    ],
+)
+def test_variants_only_below_full_width(size, variants, width):
+    made, full_width, files = encode_util.encode_story_variants(make_image(size), "fast")
+    assert made == variants
+    assert full_width == width
+    assert sorted(files) == sorted(encode_util.variant_suffixes(variants))
+
+
+def test_no_variants():
+    variants, _, files = encode_util.encode_story_variants(make_image((2600, 1400)), "fast", widths=())
+    assert variants == 0 and list(files) == [".avif"]
@@ -0,0 +1,118 @@
+import feedparser
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+from website_scripts import feed_util
+
+ITEMS = b"".join(b"<item><title>Story %d</title><link>https://example.com/%d</link></item>" % (i, i) for i in range(5))
+
+
+@pytest.mark.parametrize(
+    "head,content_type,expected",
+    [
+        (b'<?xml version="1.0" encoding="utf-8"?>\n<rss version="2.0">', "application/rss+xml", "rss"),
+        (b'\xef\xbb\xbf<?xml version="1.0"?><feed xmlns="http://www.w3.org/2005/Atom">', "", "feed"),
+        (b'<?xml version="1.0"?><!-- generator --><rdf:RDF xmlns:rdf="x">', "text/xml", "rdf"),
+        (b'<!DOCTYPE rss PUBLIC "-//Netscape Communications//DTD RSS 0.91//EN"><rss>', "", "rss"),
+        (b'<?xml version="1.0"?>\n<!-- ' + b"x" * 2000, "text/xml", "xml"),
+        (b'{"version": "https://jsonfeed.org/version/1.1", "items": []}', "application/feed+json", "json"),
+        # Misconfigured servers send feeds as text/html
+        (b"<rss version=\"2.0\"><channel>", "text/html", "rss"),
+    ],
+)
+def test_sniff_feed_accepts_feeds(head, content_type, expected):
+    assert feed_util.sniff_feed(head, content_type) == expected
+
+
+@pytest.mark.parametrize(
+    "head,content_type",
+    [
+        (b"<!DOCTYPE html>\n<html lang=\"en\"><head>", "text/html"),
+        (b"<html><head><title>Feed moved</title>", "text/html"),
+        (b'<?xml version="1.0"?><urlset xmlns="http://www.sitemaps.org/">', "application/xml"),
+        (b"\x89PNG\r\n\x1a\n\x00\x00", ""),
+        (b"<rss>", "image/jpeg"),
+        (b"Service Unavailable", "text/plain"),
+    ],
+)
+def test_sniff_feed_rejects_non_feeds(head, content_type):
+    assert feed_util.sniff_feed(head, content_type) is None
+
+
+def test_truncate_feed_keeps_complete_entries():
+    content = b'<?xml version="1.0"?><rss version="2.0"><channel><title>T</title>' + ITEMS + b"<item><title>Half"
+    parsed = feedparser.parse(feed_util.truncate_feed(content, "rss"))
+    assert not parsed.bozo
+    assert [entry.title for entry in parsed.entries] == [f"Story {i}" for i in range(5)]
+
+
+def test_truncate_atom_feed():
+    content = b'<feed xmlns="http://www.w3.org/2005/Atom"><entry><title>A</title></entry><entry><title>B'
+    parsed = feedparser.parse(feed_util.truncate_feed(content, "feed"))
+    assert not parsed.bozo
+    assert [entry.title for entry in parsed.entries] == ["A"]
+
+
+@pytest.mark.parametrize(
+    "content,root",
+    [
+        (b"<rss><channel><title>" + b"x" * 100, "rss"),
+        (b'{"items": [{"id": 1}, {"id": 2', "json"),
+    ],
+)
+def test_truncate_feed_without_complete_entry(content, root):
+    assert feed_util.truncate_feed(content, root) is None
+
+
+@pytest.mark.parametrize(
+    "entry,expected",
+    [
+        # The widest media:content image wins; videos don't count
+        (
+            {"media_content": [
+                {"url": "https://e.com/small.jpg", "medium": "image", "width": "300"},
+                {"url": "https://e.com/video.mp4", "medium": "video", "width": "1920"},
+                {"url": "https://e.com/large.jpg", "type": "image/jpeg", "width": "1200"},
+            ]},
+            "https://e.com/large.jpg",
+        ),
+        # Untyped media:content is judged by its extension
+        ({"media_content": [{"url": "https://e.com/clip"}, {"url": "https://e.com/a.webp"}]}, "https://e.com/a.webp"),
+        # Image enclosures come before thumbnails; audio enclosures are skipped
+        (
+            {
+                "enclosures": [
+                    {"href": "https://e.com/ep.mp3", "type": "audio/mpeg"},
+                    {"href": "https://e.com/e.png", "type": "image/png"},
+                ],
+                "media_thumbnail": [{"url": "https://e.com/t.jpg"}],
+            },
+            "https://e.com/e.png",
+        ),
+        ({"media_thumbnail": [{"url": "https://e.com/t"}, {"url": "https://e.com/big", "width": "640"}]}, "https://e.com/big"),
+        # Relative URLs are resolved against the story link
+        ({"media_content": [{"url": "/img/a.jpg", "medium": "image"}]}, "https://news.example/img/a.jpg"),
+        ({"media_content": [{"url": "data:image/png;base64,AAAA", "medium": "image"}]}, None),
+        ({"media_thumbnail": [{"url": "https://e.com/" + "a" * 600 + ".jpg"}]}, None),
+        ({"media_content": [{"url": "https://e.com/a.jpg", "width": "wide"}]}, "https://e.com/a.jpg"),
+        ({}, None),
+    ],
+)
+def test_feed_image_url(entry, expected):
+    assert feed_util.feed_image_url(entry, "https://news.example/story/1") == expected
+
+
+def test_feed_image_url_from_feedparser():
+    feed = feedparser.parse(
+        b'<rss version="2.0" xmlns:media="http://search.yahoo.com/mrss/"><channel><title>t</title>'
+        b'<item><title>a</title><link>https://e.com/a</link>'
+        b'<media:group><media:content url="https://e.com/a.jpg" medium="image" width="800"/></media:group>'
+        b'<enclosure url="https://e.com/a.mp3" type="audio/mpeg" length="1"/></item>'
+        b'<item><title>b</title><link>https://e.com/b</link></item>'
+        b'</channel></rss>'
+    )
+    assert [feed_util.feed_image_url(entry, entry.link) for entry in feed.entries] == ["https://e.com/a.jpg", None]
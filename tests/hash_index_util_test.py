@@ -0,0 +1,75 @@
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+from website_scripts import hash_index_util
+
+
+def make_hash(n: int) -> bytes:
+    return n.to_bytes(16, "big")
+
+
+@pytest.fixture
+def index_path(tmp_path):
+    return str(tmp_path / "url_hashes.bin")
+
+
+def test_missing_file_is_empty_index(index_path):
+    index = hash_index_util.UrlHashIndex.load(index_path)
+    assert len(index) == 0
+    assert make_hash(1) not in index
+
+
+def test_add_save_and_reload(index_path):
+    index = hash_index_util.UrlHashIndex.load(index_path)
+    index.add([make_hash(n) for n in (5, 1, 3)])
+    index.save()
+    index.close()
+
+    reloaded = hash_index_util.UrlHashIndex.load(index_path)
+    assert len(reloaded) == 3
+    for n in (1, 3, 5):
+        assert make_hash(n) in reloaded
+    for n in (0, 2, 4, 6):
+        assert make_hash(n) not in reloaded
+
+
+def test_save_merges_and_deduplicates(index_path):
+    index = hash_index_util.UrlHashIndex.load(index_path)
+    index.add([make_hash(n) for n in range(0, 100, 2)])
+    index.save()
+    index.add([make_hash(n) for n in range(0, 100, 3)])
+    index.save()
+
+    expected = set(range(0, 100, 2)) | set(range(0, 100, 3))
+    assert len(index) == len(expected)
+    assert all(make_hash(n) in index for n in expected)
+    assert make_hash(1) not in index
+
+
+def test_partition(index_path):
+    index = hash_index_util.UrlHashIndex.load(index_path)
+    index.rebuild([make_hash(1), make_hash(2)])
+    known, unknown = index.partition([make_hash(1), make_hash(3), make_hash(2)])
+    assert known == {make_hash(1), make_hash(2)}
+    assert unknown == [make_hash(3)]
+
+
+def test_rebuild_replaces_contents(index_path):
+    index = hash_index_util.UrlHashIndex.load(index_path)
+    index.add([make_hash(1)])
+    index.save()
+    index.rebuild([make_hash(7), make_hash(7)])
+    assert len(index) == 1
+    assert make_hash(1) not in index
+    assert make_hash(7) in index
+
+
+def test_corrupt_file_is_ignored(index_path):
+    with open(index_path, "wb") as f:
+        f.write(b"not an index file")
+    index = hash_index_util.UrlHashIndex.load(index_path)
+    assert len(index) == 0
@@ -0,0 +1,66 @@
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+from website_scripts import keyword_util
+
+
+def test_candidates_skip_stopwords_and_short_words():
+    candidates = keyword_util.extract_candidates("The EU and Brazil sign trade deal", frozenset({"the", "and"}))
+    keys = [key for key, _, _, _ in candidates]
+    assert keys == ["brazil", "sign", "brazil sign", "trade", "sign trade", "deal", "trade deal"]
+
+
+def test_bigrams_do_not_cross_punctuation():
+    candidates = keyword_util.extract_candidates("Markets fall. Investors worry", frozenset())
+    keys = [key for key, _, _, _ in candidates]
+    assert "fall investors" not in keys
+    assert [phrase for _, _, phrase, _ in candidates] == [0, 0, 0, 1, 1, 1]
+
+
+def test_load_stopwords_falls_back_for_unknown_languages():
+    assert "the" in keyword_util.load_stopwords("en")
+    assert "the" not in keyword_util.load_stopwords("xx")
+
+
+def test_extract_keywords_batch():
+    texts = [
+        ("Central Bank raises interest rates again as inflation climbs", "en"),
+        ("Central Bank chief says interest rates will stay high", "en"),
+        ("Football: Flamengo wins the league title", "en"),
+        ("", "en"),
+    ]
+    results = keyword_util.extract_keywords_batch(texts, top_n=3)
+
+    assert len(results) == len(texts)
+    assert results[0][:2] == ("Central Bank", "interest rates")
+    assert "Flamengo" in results[2]
+    assert results[3] == ()
+
+
+@pytest.mark.parametrize("top_n", [1, 3, 5])
+def test_keywords_are_tag_sized_and_distinct(top_n):
+    text = "Supercalifragilisticexpialidocious Extraordinarily-long-hyphenated-words appear in Lisbon"
+    (keywords,) = keyword_util.extract_keywords_batch([(text, "en")], top_n=top_n)
+
+    assert 0 < len(keywords) <= top_n
+    assert all(len(keyword) <= keyword_util.TAG_MAX_LENGTH for keyword in keywords)
+    words = [word.lower() for keyword in keywords for word in keyword.split(" ")]
+    assert len(words) == len(set(words))
+
+
+def test_context_lowers_words_common_in_the_category():
+    text = ("Brazil: Brazil court suspends Brazil mining license in Amazon reserve", "en")
+    topics = "economy football weather politics music health travel energy science cinema".split()
+    context = [(f"Brazil {topic} news from Brazil today", "en") for topic in topics * 2]
+
+    (alone,) = keyword_util.extract_keywords_batch([text], top_n=3)
+    with_context, empty = keyword_util.extract_keywords_batch([text, ("", "en")], top_n=3, context=context)
+
+    assert alone[0] == "Brazil"
+    assert with_context[0] == "Amazon" and "Brazil" in with_context
+    # Context stories get no keywords, and don't leak into the batch's own
+    assert empty == ()
@@ -0,0 +1,55 @@
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+from website_scripts import language_util
+
+
+def test_prior_needs_enough_confident_history():
+    resolver = language_util.LanguageResolver()
+    resolver.observe(1, "pt", language_util.PRIOR_MIN_STORIES - 1)
+    assert resolver.prior(1) is None
+
+    resolver.observe(1, "pt")
+    assert resolver.prior(1) == "pt"
+
+
+def test_mixed_language_publisher_has_no_prior():
+    resolver = language_util.LanguageResolver.from_history([(1, "en", 50), (1, "es", 50)])
+    assert resolver.prior(1) is None
+    assert resolver.resolve(1, "Some text") is None
+
+
+def test_resolve_uses_prior_then_memo():
+    resolver = language_util.LanguageResolver.from_history([(1, "de", 100)])
+    assert resolver.resolve(1, "Irgendein Text") == "de"
+    assert resolver.stats["prior_hits"] == 1
+
+    assert resolver.resolve(2, "Some text") is None
+    resolver.remember(2, "Some text", "en")
+    assert resolver.resolve(2, "Some text") == "en"
+    assert resolver.stats == {"prior_hits": 1, "memo_hits": 1, "detected": 1}
+
+
+def test_memo_is_bounded():
+    resolver = language_util.LanguageResolver(memo_size=2)
+    for text in ("a", "b", "c"):
+        resolver.remember(1, text, "en")
+
+    assert resolver.resolve(1, "a") is None
+    assert resolver.resolve(1, "c") == "en"
+
+
+@pytest.mark.parametrize(
+    "text,expected",
+    [
+        ("Esse é um texto que está escrito em português, sobre política e economia.", "pt"),
+        ("This is a sentence written in English about politics and the economy.", "en"),
+        ("", "en"),
+    ],
+)
+def test_detect_languages(text, expected):
+    assert language_util.detect_languages([text]) == [expected]
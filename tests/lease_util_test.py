@@ -0,0 +1,96 @@
+import asyncio
+import pytest
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+from website_scripts import lease_util
+
+
+@pytest.fixture
+def store(tmp_path):
+    return lease_util.LocalLeaseStore(str(tmp_path / "leases.json"))
+
+
+@pytest.mark.parametrize(
+    "category_id,publisher_id,shards_per_category,expected",
+    [(5, 17, 4, "5.1"), (5, 17, 1, "5.0"), (5, 17, 0, "5.0"), (12, 40, 8, "12.0")],
+)
+def test_shard_of(category_id, publisher_id, shards_per_category, expected):
+    assert lease_util.shard_of(category_id, publisher_id, shards_per_category) == expected
+
+
+def test_only_one_node_holds_a_shard(store):
+    a = lease_util.ShardLeases(store, "a")
+    b = lease_util.ShardLeases(store, "b")
+
+    assert asyncio.run(a.claim("1.0"))
+    assert asyncio.run(a.claim("1.0"))
+    assert not asyncio.run(b.claim("1.0"))
+    assert asyncio.run(b.claim("1.1"))
+    assert a.held == {"1.0"} and b.held == {"1.1"}
+
+
+def test_dead_node_is_taken_over(store):
+    a = lease_util.ShardLeases(store, "a", ttl=0.05)
+    b = lease_util.ShardLeases(store, "b", ttl=0.05)
+    asyncio.run(a.claim("1.0"))
+
+    time.sleep(0.1)
+    assert asyncio.run(b.claim("1.0"))
+    # a comes back and learns it lost the shard
+    assert asyncio.run(a.renew()) == 1
+    assert not a.holds("1.0") and a.lost == 1
+    assert asyncio.run(b.renew()) == 0
+
+
+def test_heartbeat_keeps_leases(store):
+    a = lease_util.ShardLeases(store, "a", ttl=0.15)
+    b = lease_util.ShardLeases(store, "b", ttl=0.15)
+
+    async def run():
+        await a.claim("1.0")
+        heartbeat = asyncio.ensure_future(a.heartbeat())
+        await asyncio.sleep(0.4)
+        taken = await b.claim("1.0")
+        heartbeat.cancel()
+        return taken
+
+    assert not asyncio.run(run())
+    assert a.holds("1.0")
+
+
+def test_finished_shards_cool_down(store):
+    a = lease_util.ShardLeases(store, "a", ttl=0.05, cooldown=60)
+    b = lease_util.ShardLeases(store, "b", ttl=0.05, cooldown=60)
+    asyncio.run(a.claim("1.0"))
+    asyncio.run(a.finish_all())
+
+    time.sleep(0.1)
+    assert not a.held
+    assert not asyncio.run(b.claim("1.0"))
+    assert not asyncio.run(a.claim("1.0"))
+
+
+def test_released_shards_are_free(store):
+    a = lease_util.ShardLeases(store, "a")
+    b = lease_util.ShardLeases(store, "b")
+    asyncio.run(a.claim("1.0"))
+    asyncio.run(a.release_all())
+
+    assert asyncio.run(b.claim("1.0"))
+    # Only the holder may release
+    asyncio.run(a.store.release(lease_util.KEY_PREFIX + "1.0", "a"))
+    assert not asyncio.run(a.claim("1.0"))
+
+
+def test_claim_task_runs_once_per_ttl(store):
+    a = lease_util.ShardLeases(store, "a")
+    b = lease_util.ShardLeases(store, "b")
+
+    assert asyncio.run(a.claim_task("prune", 60))
+    assert not asyncio.run(b.claim_task("prune", 60))
+    assert not asyncio.run(a.claim_task("prune", 60))
@@ -0,0 +1,87 @@
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+from website_scripts import minhash_util
+
+STORY = (
+    "Central bank keeps interest rates unchanged as inflation slows. "
+    "The decision was expected by most analysts polled last week."
+)
+
+
+def test_signature_is_stable_and_sized():
+    signature = minhash_util.signature(STORY)
+    assert len(signature) == minhash_util.SIGNATURE_SIZE
+    assert minhash_util.signature(STORY.upper()) == signature
+
+
+@pytest.mark.parametrize("text", ["", None, "Live updates", "one two three four five"])
+def test_short_texts_have_no_signature(text):
+    assert minhash_util.signature(text) is None
+
+
+@pytest.mark.parametrize(
+    "other,near_duplicate",
+    [
+        (STORY + " - Reuters", True),
+        ("Central bank keeps interest rates unchanged as inflation slows. The decision was expected.", True),
+        ("Police arrest three suspects after robbery at a downtown jewelry store on Monday", False),
+    ],
+)
+def test_index_finds_near_duplicates(other, near_duplicate):
+    index = minhash_util.MinHashIndex()
+    index.add(minhash_util.signature(STORY), cluster_id=42, publisher_id=1)
+    match = index.find(minhash_util.signature(other))
+    assert (match is not None and match[:2] == (42, 1)) is near_duplicate
+
+
+def test_index_returns_most_similar_cluster():
+    index = minhash_util.MinHashIndex(min_similarity=0.3)
+    index.add(minhash_util.signature(STORY + " Markets rallied after the announcement"), cluster_id=1)
+    index.add(minhash_util.signature(STORY), cluster_id=2)
+    assert index.find(minhash_util.signature(STORY)) == (2, None, 1.0)
+    assert len(index) == 2
+
+
+def test_same_text_similarity_needs_the_same_words():
+    reposted = minhash_util.similarity(
+        minhash_util.signature(STORY), minhash_util.signature(f"  {STORY.upper()}!")
+    )
+    templated = minhash_util.similarity(
+        minhash_util.signature("Lottery results for draw 2871: 04 18 23 35 41 52"),
+        minhash_util.signature("Lottery results for draw 2872: 09 11 23 30 44 58"),
+    )
+    assert reposted >= minhash_util.SAME_TEXT_SIMILARITY > templated
+
+
+def test_assign_clusters_within_batch():
+    index = minhash_util.MinHashIndex()
+    index.add(minhash_util.signature(STORY), cluster_id=42, publisher_id=1)
+    other = "Police arrest three suspects after robbery at a downtown jewelry store on Monday"
+    items = [
+        (minhash_util.signature(STORY + " - Reuters"), 2, 100),
+        (minhash_util.signature(other), 2, 101),
+        (minhash_util.signature(other + "!"), 2, 102),
+        (minhash_util.signature(other), 3, 103),
+    ]
+    assert minhash_util.assign_clusters(index, items) == [(42, True), (101, False), None, (101, True)]
+    assert len(index) == 1
+
+
+def test_failed_write_is_retried_and_still_inserted():
+    """A batch whose insert failed is fetched again and must not match itself."""
+    index = minhash_util.MinHashIndex()
+    items = [(minhash_util.signature(STORY), 1, 7)]
+
+    first = minhash_util.assign_clusters(index, items)
+    # The write failed: nothing is filed, and the retry keeps the story
+    retry = minhash_util.assign_clusters(index, items)
+    assert first == retry == [(7, False)]
+
+    # The retry was stored; a republication by the same publisher is dropped now
+    index.add(items[0][0], 7, 1)
+    assert minhash_util.assign_clusters(index, items) == [None]
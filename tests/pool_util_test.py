@@ -0,0 +1,42 @@
+import asyncio
+import os
+import signal
+import sys
+
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+from website_scripts import pool_util
+
+
+def test_healthy_pool_is_kept():
+    pool = ProcessPoolExecutor(max_workers=1)
+    try:
+        assert asyncio.run(pool_util.is_healthy(pool))
+        assert asyncio.run(pool_util.replace_if_broken(pool, 1)) is None
+    finally:
+        pool.shutdown()
+
+
+def test_pool_with_a_killed_worker_is_replaced():
+    pool = ProcessPoolExecutor(max_workers=1)
+    os.kill(pool.submit(os.getpid).result(), signal.SIGKILL)
+
+    # Every later task fails, however many cycles run
+    with pytest.raises(BrokenProcessPool):
+        pool.submit(abs, -1).result()
+    assert not asyncio.run(pool_util.is_healthy(pool))
+
+    # The next cycle starts on a new pool
+    replacement = asyncio.run(pool_util.replace_if_broken(pool, 2))
+    try:
+        assert replacement is not None and replacement is not pool
+        assert list(replacement.map(abs, [-1, -2])) == [1, 2]
+        assert asyncio.run(pool_util.replace_if_broken(replacement, 2)) is None
+    finally:
+        replacement.shutdown()
@@ -0,0 +1,124 @@
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+from website_scripts import preview_util
+
+BASE = "https://news.example/world/story-1"
+
+
+def scan(page: bytes, chunk_size: int = 7, content_type: str = "text/html", max_bytes: int = preview_util.HEAD_MAX_BYTES):
+    scanner = preview_util.HeadScanner(BASE, content_type, max_bytes=max_bytes)
+    for i in range(0, len(page), chunk_size):
+        if scanner.scan(page[i:i + chunk_size]):
+            break
+    scanner.finish()
+    return scanner
+
+
+def test_tags_split_across_chunks():
+    page = (
+        b'<html><head><meta property="og:image" content="https://cdn.example/a.jpg">'
+        b'<link rel="shortcut icon" href="/fav.ico"></head><body>' + b"<p>text</p>" * 1000
+    )
+    for chunk_size in (1, 3, 64):
+        scanner = scan(page, chunk_size)
+        assert scanner.image == "https://cdn.example/a.jpg"
+        assert scanner.favicon == "https://news.example/fav.ico"
+        assert scanner.done and scanner.bytes_read <= preview_util.CHARSET_SNIFF_SIZE + chunk_size
+
+
+@pytest.mark.parametrize(
+    "head,image",
+    [
+        (b'<meta name="twitter:image" content="/tw.jpg"><meta property="og:image" content="/og.jpg">', "https://news.example/og.jpg"),
+        (b'<meta name="twitter:image:src" content="/tw.jpg">', "https://news.example/tw.jpg"),
+        (b'<link rel="image_src" href="//cdn.example/src.jpg">', "https://cdn.example/src.jpg"),
+        (b'<base href="https://static.example/assets/"><meta property="OG:IMAGE" content="a.jpg">', "https://static.example/assets/a.jpg"),
+        (b'<meta property="og:image" content="data:image/png;base64,AAAA">', None),
+        (b'<meta property="og:image" content="  ">', None),
+        (b"", None),
+    ],
+)
+def test_image_candidates(head, image):
+    assert scan(b"<html><head>" + head + b"</head><body></body></html>").image == image
+
+
+def test_icon_preference():
+    scanner = scan(
+        b'<head><link rel="apple-touch-icon" href="/touch.png"><link rel="Shortcut  Icon" href="/s.ico">'
+        b'<link rel="icon" href="/icon.png"></head>'
+    )
+    assert scanner.favicon == "https://news.example/icon.png"
+
+
+def test_stops_at_body_content_without_closing_head():
+    scanner = scan(b'<html><meta property="og:image" content="/a.jpg"><div class="page">' + b"x" * 50000, chunk_size=2048)
+    assert scanner.done and scanner.image == "https://news.example/a.jpg"
+    assert scanner.bytes_read == 2048
+
+
+def test_ignores_noscript_and_scripts():
+    scanner = scan(
+        b'<head><noscript><img src="https://tracker.example/px.gif"></noscript>'
+        b'<script>var s = "<body><meta property=\\"og:image\\" content=\\"/fake.jpg\\">";</script>'
+        b'<meta property="og:image" content="/real.jpg"></head>'
+    )
+    assert scanner.images == ["https://news.example/real.jpg"]
+
+
+def test_byte_cap():
+    scanner = scan(b"<head><script>" + b"x" * 5000, chunk_size=1000, max_bytes=2500)
+    assert scanner.done and scanner.bytes_read == 2500 and scanner.image is None
+
+
+@pytest.mark.parametrize(
+    "content_type,head",
+    [
+        ("text/html; charset=ISO-8859-1", b""),
+        ("text/html", b'<meta charset="iso-8859-1">'),
+        ("text/html; charset=bogus", None),
+    ],
+)
+def test_page_encoding(content_type, head):
+    if head is None:
+        scanner = scan(b'<head><meta property="og:image" content="/caf\xc3\xa9.jpg"></head>', content_type=content_type)
+    else:
+        scanner = scan(b"<head>" + head + b'<meta property="og:image" content="/caf\xe9.jpg"></head>', content_type=content_type)
+    assert scanner.image == "https://news.example/caf\u00e9.jpg"
+
+
+@pytest.mark.parametrize(
+    "head,image_format",
+    [
+        (b"\xff\xd8\xff\xe0\x00\x10JFIF\x00\x01\x01\x00\x00\x01", "jpeg"),
+        (b"GIF89a\x01\x00\x01\x00\x80\x00\x00\x00\x00\x00", "gif"),
+        (b"RIFF\x24\x00\x00\x00WEBPVP8 ", "webp"),
+        (b"\x00\x00\x00\x1cftypavif\x00\x00\x00\x00", "avif"),
+        (b"\x00\x00\x00\x1cftypisom\x00\x00\x00\x00", None),
+        (b"\x00\x00\x01\x00\x01\x00\x10\x10\x00\x00\x01\x00 \x00", "ico"),
+        (b'{"error": "not found"}', None),
+        (b"", None),
+    ],
+)
+def test_sniff_image(head, image_format):
+    assert preview_util.sniff_image(head) == image_format
+
+
+@pytest.mark.parametrize(
+    "content_type,rejected",
+    [
+        ("image/webp", False),
+        ("application/octet-stream", False),
+        ("", False),
+        (None, False),
+        (" Text/HTML; charset=utf-8", True),
+        ("application/json", True),
+        ("video/mp4", True),
+    ],
+)
+def test_is_non_image_type(content_type, rejected):
+    assert preview_util.is_non_image_type(content_type) is rejected
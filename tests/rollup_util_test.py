@@ -0,0 +1,122 @@
+import pytest
+import sys
+import os
+
+from datetime import date, datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+from website_scripts import rollup_util
+
+
+class RecordingSession:
+    """Collects what count_engagement would execute."""
+
+    def __init__(self, rows=()):
+        self.executed = []
+        self.rows = list(rows)
+
+    def execute(self, statement, params=None):
+        self.executed.append((str(statement), params))
+        return self
+
+    def all(self):
+        return self.rows
+
+
+def test_story_day_counts_groups_by_day_and_category():
+    rows = rollup_util.story_day_counts([
+        ("2026-10-17 08:00:00", 3),
+        (datetime(2026, 10, 17, 21, 15), 3),
+        (date(2026, 10, 17), 1),
+        ("2026-10-16 23:59:59", 3),
+    ])
+    assert rows == [
+        (date(2026, 10, 16), 3, 1),
+        (date(2026, 10, 17), 1, 1),
+        (date(2026, 10, 17), 3, 2),
+    ]
+
+
+def test_daily_series_fills_missing_days():
+    counts = {date(2026, 10, 11): 4, date(2026, 10, 13): 1, date(2026, 10, 1): 9}
+    assert rollup_util.daily_series(counts, date(2026, 10, 11), 4) == [4, 0, 1, 0]
+
+
+def test_top_countries_folds_categories():
+    raw = [("br_general", 3), ("us_general", 5), ("br_sports", 4), ("fr_general", 1), ("de_general", None)]
+    assert rollup_util.top_countries(raw, limit=2) == [
+        {"country": "BR", "count": 7},
+        {"country": "US", "count": 5},
+    ]
+
+
+@pytest.mark.parametrize("action,metric", [("like", "likes"), ("dislike", "dislikes")])
+def test_count_reaction(action, metric):
+    session = RecordingSession()
+    rollup_util.count_reaction(session, action, datetime(2026, 10, 17, 12), -1)
+
+    (statement, params), = session.executed
+    assert f"{metric} = {metric} +" in statement
+    assert params == {"day": date(2026, 10, 17), "delta": -1}
+
+
+def test_uncounted_reactions_and_metrics():
+    session = RecordingSession()
+    rollup_util.count_reaction(session, "report", date(2026, 10, 17))
+    assert not session.executed
+
+    with pytest.raises(ValueError):
+        rollup_util.count_engagement(session, "views; DROP TABLE stories", date(2026, 10, 17))
+
+
+def test_uncount_user_subtracts_per_day():
+    session = RecordingSession(rows=[
+        (date(2026, 10, 16), "like", 2),
+        (date(2026, 10, 16), "report", 1),
+        (date(2026, 10, 17), "comment", 3),
+        (None, "bookmark", 1),
+    ])
+    rollup_util.uncount_user(session, user_id=7)
+
+    updates = [params for _, params in session.executed[1:]]
+    assert updates == [
+        {"day": date(2026, 10, 16), "delta": -2},
+        {"day": date(2026, 10, 17), "delta": -3},
+    ]
+    assert "likes = likes" in session.executed[1][0]
+    assert "comments = comments" in session.executed[2][0]
+
+
+def test_group_by_day_orders_like_story_day_counts():
+    stories = [
+        ("2026-10-17 08:00:00", 3, "a"),
+        (datetime(2026, 10, 16, 12), 3, "b"),
+        (date(2026, 10, 17), 1, "c"),
+        ("2026-10-17 22:00:00", 3, "d"),
+    ]
+    groups = rollup_util.group_by_day(stories)
+
+    assert groups == {
+        (date(2026, 10, 16), 3): ["b"],
+        (date(2026, 10, 17), 1): ["c"],
+        (date(2026, 10, 17), 3): ["a", "d"],
+    }
+    counts = rollup_util.story_day_counts((pub_date, category_id) for pub_date, category_id, _ in stories)
+    assert [(day, category_id, len(items)) for (day, category_id), items in groups.items()] == counts
+
+
+def test_engagement_day_counts_subtracts_counted_kinds():
+    rows = [
+        (date(2026, 10, 17), "like", 3),
+        (date(2026, 10, 16), "dislike", 1),
+        (date(2026, 10, 17), "bookmark", 2),
+        (date(2026, 10, 17), "report", 5),
+        (None, "like", 7),
+    ]
+    assert rollup_util.engagement_day_counts(rows, sign=-1) == [
+        (date(2026, 10, 16), 0, -1, 0, 0),
+        (date(2026, 10, 17), -3, 0, 0, -2),
+    ]
+    assert rollup_util.engagement_day_counts([]) == []
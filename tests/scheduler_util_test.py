@@ -0,0 +1,80 @@
+import pytest
+import sys
+import os
+
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+from website_scripts import scheduler_util
+
+
+def test_estimate_publish_interval_uses_median_gap():
+    base = datetime(2025, 1, 1)
+    dates = [base, base + timedelta(hours=1), base + timedelta(hours=2), base + timedelta(hours=10)]
+    assert scheduler_util.estimate_publish_interval(dates) == 3600.0
+
+
+@pytest.mark.parametrize(
+    "dates",
+    [
+        [],
+        [datetime(2025, 1, 1)],
+        [datetime(2025, 1, 1), datetime(2025, 1, 1)],  # Duplicates collapse
+        [datetime.now() + timedelta(days=1), datetime.now() + timedelta(days=2)],  # Future dates ignored
+    ],
+)
+def test_estimate_publish_interval_needs_two_dates(dates):
+    assert scheduler_util.estimate_publish_interval(dates) is None
+
+
+def test_hot_feed_is_clamped_to_minimum():
+    interval = scheduler_util.compute_poll_interval(None, 60, 0.9)
+    assert interval == scheduler_util.MIN_POLL_INTERVAL
+
+
+def test_monthly_feed_is_clamped_to_maximum():
+    interval = scheduler_util.compute_poll_interval(None, 30 * 24 * 3600, 0.1)
+    assert interval == scheduler_util.MAX_POLL_INTERVAL
+
+
+def test_unchanged_feed_backs_off():
+    interval = scheduler_util.compute_poll_interval(3600, None, 0.0)
+    assert interval > 3600
+
+
+def test_mostly_new_items_polls_faster():
+    interval = scheduler_util.compute_poll_interval(7200, None, 0.8)
+    assert interval < 7200
+
+
+def test_new_item_ratio_moving_average():
+    assert scheduler_util.update_new_item_ratio(None, 0, 0) == 0.0
+    assert scheduler_util.update_new_item_ratio(None, 3, 4) == 0.75
+    assert scheduler_util.update_new_item_ratio(1.0, 0, 4) == pytest.approx(0.7)
+
+
+def test_next_due_within_jitter():
+    now = datetime(2025, 1, 1)
+    due = scheduler_util.compute_next_due(1000, now=now, jitter=0.1)
+    assert now + timedelta(seconds=900) <= due <= now + timedelta(seconds=1100)
+
+
+def test_latency_ewma_moves_towards_new_samples():
+    assert scheduler_util.update_latency_ewma(None, 3.0) == 3.0
+    assert 1.0 < scheduler_util.update_latency_ewma(1.0, 10.0) < 10.0
+
+
+def test_failure_backoff_doubles_and_is_capped():
+    backoffs = [scheduler_util.compute_failure_backoff(n) for n in range(1, 6)]
+    assert backoffs == [scheduler_util.MIN_POLL_INTERVAL * 2 ** i for i in range(5)]
+    assert scheduler_util.compute_failure_backoff(1000) == scheduler_util.MAX_FAILURE_BACKOFF
+
+
+@pytest.mark.parametrize(
+    "failures,expected",
+    [(0, False), (scheduler_util.CIRCUIT_BREAKER_THRESHOLD - 1, False), (scheduler_util.CIRCUIT_BREAKER_THRESHOLD, True)],
+)
+def test_circuit_opens_after_threshold(failures, expected):
+    assert scheduler_util.is_circuit_open(failures) is expected
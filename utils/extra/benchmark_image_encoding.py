@@ -0,0 +1,122 @@
+"""
+Benchmark story image encoding for search_news_images: the old path
+(Image.thumbnail, AVIF at the encoder's default speed, in a pool of at most 8
+threads) against encode_util in a process pool, for each --avif-tier.
+
+Images are processed the way the worker gets them: as downloaded bytes, all
+submitted at once. Synthetic photo-like JPEGs of typical news image sizes are
+used unless --images points at a directory of saved images. --variants also
+times the default tier with the srcset variants (and --webp copies) and reports
+the bytes of each stored size.
+
+Usage:
+    python -m utils.extra.benchmark_image_encoding --images-count 40
+    python -m utils.extra.benchmark_image_encoding --images saved_images/ --workers 4
+    python -m utils.extra.benchmark_image_encoding --variants --webp --skip-baseline
+"""
+import argparse
+import os
+import time
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from io import BytesIO
+from pathlib import Path
+from random import Random
+
+from PIL import Image, ImageDraw, ImageFilter
+
+from website_scripts import encode_util
+
+# Source sizes seen on news sites' og:image and feed media
+SOURCE_SIZES = ((1200, 630), (1600, 900), (2048, 1152), (3000, 2000), (4000, 2667))
+
+
+def build_image(rng: Random) -> bytes:
+    """A JPEG with gradients, shapes and grain, which compresses like a photo."""
+    width, height = rng.choice(SOURCE_SIZES)
+    image = Image.linear_gradient("L").resize((width, height)).convert("RGB")
+    draw = ImageDraw.Draw(image)
+    for _ in range(rng.randint(20, 60)):
+        x, y = rng.randrange(width), rng.randrange(height)
+        radius = rng.randint(width // 40, width // 6)
+        color = tuple(rng.randrange(256) for _ in range(3))
+        draw.ellipse((x - radius, y - radius, x + radius, y + radius), fill=color)
+    image = image.filter(ImageFilter.GaussianBlur(3))
+    grain = Image.effect_noise((width, height), 24).convert("RGB")
+    image = Image.blend(image, grain, 0.15)
+
+    buffer = BytesIO()
+    image.save(buffer, format="JPEG", quality=85)
+    return buffer.getvalue()
+
+
+def encode_baseline(content: bytes) -> bytes:
+    """process_image_sync as it was before encode_util."""
+    image = Image.open(BytesIO(content))
+    image.thumbnail(encode_util.STORY_IMAGE_SIZE)
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+    output = BytesIO()
+    image.save(output, format="AVIF", optimize=True, quality=60, method=6)
+    return output.getvalue()
+
+
+def run(executor, func, images: list, *args) -> tuple:
+    start = time.perf_counter()
+    results = list(executor.map(func, images, *[[arg] * len(images) for arg in args]))
+    return time.perf_counter() - start, sum(len(result) for result in results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images-count", type=int, default=40, help="Synthetic images to generate")
+    parser.add_argument("--images", help="Directory of saved .jpg/.png/.webp images to use instead")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4, help="Encoding processes (default: CPU count)")
+    parser.add_argument("--tiers", nargs="+", choices=tuple(encode_util.AVIF_TIERS), default=list(encode_util.AVIF_TIERS))
+    parser.add_argument("--skip-baseline", action="store_true", help="Only benchmark the encode_util tiers")
+    parser.add_argument("--variants", action="store_true", help="Also encode the srcset variants")
+    parser.add_argument("--webp", action="store_true", help="With --variants, also encode WebP copies")
+    args = parser.parse_args()
+
+    if args.images:
+        images = [
+            path.read_bytes() for path in sorted(Path(args.images).iterdir())
+            if path.suffix.lower() in (".jpg", ".jpeg", ".png", ".webp")
+        ]
+    else:
+        rng = Random(0)
+        images = [build_image(rng) for _ in range(args.images_count)]
+    if not images:
+        parser.error("no images to benchmark")
+
+    count = len(images)
+    print(f"{count} images, {sum(len(image) for image in images) / count / 1024:.0f} KB on average, {args.workers} processes")
+    print(f"{'':<32}{'images/s':>10}{'KB/image':>10}")
+
+    if not args.skip_baseline:
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            elapsed, output = run(executor, encode_baseline, images)
+        print(f"{'old path, 8 threads':<32}{count / elapsed:>10.2f}{output / count / 1024:>10.1f}")
+
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        # Start the workers before timing
+        list(executor.map(encode_util.fit_size, [(1, 1)] * args.workers, [(1, 1)] * args.workers))
+        for tier in args.tiers:
+            elapsed, output = run(executor, encode_util.encode_story_image, images, tier)
+            label = f"{tier} (speed {encode_util.AVIF_TIERS[tier]['speed']})"
+            print(f"{label:<32}{count / elapsed:>10.2f}{output / count / 1024:>10.1f}")
+
+        if args.variants:
+            tier = encode_util.DEFAULT_AVIF_TIER
+            widths = [tuple(encode_util.VARIANT_BITS)] * count
+            start = time.perf_counter()
+            results = list(executor.map(encode_util.encode_story_variants, images, [tier] * count, widths, [args.webp] * count))
+            elapsed = time.perf_counter() - start
+            print(f"{tier + ' + variants':<32}{count / elapsed:>10.2f}")
+            for suffix in encode_util.variant_suffixes(max(variants for variants, _, _ in results)):
+                sizes = [len(files[suffix]) for _, _, files in results if suffix in files]
+                print(f"  {suffix:<30}{'':>10}{sum(sizes) / len(sizes) / 1024:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
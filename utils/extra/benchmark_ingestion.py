@@ -0,0 +1,517 @@
+"""
+Offline throughput benchmark for utils/search_news.py.
+
+Starts a local aiohttp "feed farm" serving thousands of synthetic RSS/Atom feeds,
+points search_news at it through a fake DNS resolver, swaps the MySQL layer for an
+in-memory stand-in, and runs the real async_main pipeline. Reports stories/sec,
+feed latency percentiles, CPU per stage (event loop and process pool) and peak RSS.
+
+Every run is seeded, so results are comparable between commits on one machine.
+
+Usage:
+    python -m utils.extra.benchmark_ingestion --feeds 2000 --items 30
+    python -m utils.extra.benchmark_ingestion --compare streaming category
+    python -m utils.extra.benchmark_ingestion --feeds 500 -- --keyword-engine tfidf
+
+Arguments after "--" are passed to search_news.py. Each run starts from an empty
+store and is followed by --runs - 1 repeat runs, in which --churn of the feeds
+publish new items and the rest should come back as 304 Not Modified.
+"""
+import argparse
+import asyncio
+import contextvars
+import copy
+import io
+import os
+import random
+import resource
+import socket
+import sys
+import tempfile
+import time
+
+from collections import defaultdict
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from datetime import datetime, timedelta
+from email.utils import format_datetime
+
+import aiohttp
+
+from aiohttp import web
+from aiohttp.abc import AbstractResolver
+from rich.console import Console
+from rich.table import Table
+
+from website_scripts import language_util, minhash_util
+
+FARM_HOST = "127.0.0.1"
+FARM_DOMAIN = "bench.test"
+
+WORDS = (
+    "government economy election minister market inflation climate border court police "
+    "energy health football league president protest trade bank strike storm summit "
+    "budget tariff ceasefire university vaccine drought harvest oil shares parliament"
+).split()
+
+# Stage a piece of work belongs to, for CPU accounting
+current_stage = contextvars.ContextVar("current_stage", default="other")
+
+# search_news globals replaced while a benchmark runs
+PATCHED = (
+    "console", "URL_HASH_INDEX_PATH", "CHECKPOINT_PATH", "ProcessPoolExecutor",
+    "init_db_pool", "fetch_categories_from_database", "fetch_due_publishers_from_database",
+    "seed_publish_intervals", "save_fetch_states", "get_existing_url_hashes",
+    "rebuild_url_hash_index", "load_language_resolver", "insert_stories_to_database",
+    "download_feed", "parse_feed", "filter_new_stories", "enrich_stories",
+    "save_publisher_health", "load_cluster_index",
+)
+
+# Process-pool functions of search_news, by the stage that calls them
+POOL_STAGES = {
+    "_parse_feed_sync": "parse",
+    "_sanitize_stories_sync": "enrich",
+    "detect_languages": "enrich",
+    "_extract_yake_batch_sync": "enrich",
+    "extract_keywords_batch": "enrich",
+}
+
+
+class FeedFarm:
+    """
+    aiohttp app serving /feed/<n> for n in [0, feeds). Feed contents are a pure
+    function of (seed, n, generation), so repeated runs are reproducible.
+    """
+
+    def __init__(self, args):
+        self.args = args
+        self.generation = defaultdict(int)  # Bumped for feeds that publish new items
+        self.requests = 0
+
+    def publish(self, share: float, rng: random.Random):
+        for n in range(self.args.feeds):
+            if rng.random() < share:
+                self.generation[n] += 1
+
+    def item_links(self, n: int, generation: int, rng: random.Random) -> list:
+        links = []
+        for j in range(self.args.items):
+            if rng.random() < self.args.duplicate_rate:
+                # Syndicated story also carried by another feed
+                other = rng.randrange(self.args.feeds)
+                links.append(f"https://feed{other}.{FARM_DOMAIN}/story/{other}-{j}")
+            else:
+                links.append(f"https://feed{n}.{FARM_DOMAIN}/story/{n}-{generation * self.args.items + j}")
+        return links
+
+    def render(self, n: int) -> bytes:
+        generation = self.generation[n]
+        rng = random.Random(f"{self.args.seed}-{n}-{generation}")
+        atom = rng.random() < self.args.atom_share
+        now = datetime(2025, 1, 1) + timedelta(hours=generation)
+
+        entries = []
+        for j, link in enumerate(self.item_links(n, generation, rng)):
+            title = " ".join(rng.choice(WORDS) for _ in range(8)).capitalize()
+            description = " ".join(rng.choice(WORDS) for _ in range(self.args.description_words))
+            published = now - timedelta(minutes=17 * j)
+            if atom:
+                entries.append(
+                    f"<entry><title>{title}</title><link href=\"{link}\"/><id>{link}</id>"
+                    f"<updated>{published.isoformat()}Z</updated><summary>{description}</summary></entry>"
+                )
+            else:
+                entries.append(
+                    f"<item><title>{title}</title><link>{link}</link>"
+                    f"<pubDate>{format_datetime(published)}</pubDate><description>{description}</description></item>"
+                )
+
+        if atom:
+            body = (
+                '<?xml version="1.0" encoding="utf-8"?><feed xmlns="http://www.w3.org/2005/Atom">'
+                f"<title>Feed {n}</title><link href=\"https://feed{n}.{FARM_DOMAIN}/\"/>{''.join(entries)}</feed>"
+            )
+        else:
+            body = (
+                '<?xml version="1.0" encoding="utf-8"?><rss version="2.0"><channel>'
+                f"<title>Feed {n}</title><link>https://feed{n}.{FARM_DOMAIN}/</link>{''.join(entries)}</channel></rss>"
+            )
+        return body.encode()
+
+    async def handle(self, request):
+        self.requests += 1
+        n = int(request.match_info["n"])
+        rng = random.Random(f"{self.args.seed}-latency-{n}-{self.requests}")
+
+        delay = max(0.0, rng.gauss(self.args.latency_ms, self.args.jitter_ms)) / 1000
+        await asyncio.sleep(delay)
+        if rng.random() < self.args.error_rate:
+            return web.Response(status=503)
+
+        etag = f'"{n}-{self.generation[n]}"'
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304)
+        return web.Response(body=self.render(n), content_type="application/xml", headers={"ETag": etag})
+
+    async def start(self, port: int):
+        app = web.Application()
+        app.router.add_get("/feed/{n}", self.handle)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        await web.TCPSite(self.runner, FARM_HOST, port).start()
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+
+class FarmResolver(AbstractResolver):
+    """Resolves every *.bench.test host to the local feed farm."""
+
+    def __init__(self, port: int):
+        self.port = port
+
+    async def resolve(self, host, port=0, family=socket.AF_INET):
+        return [{
+            "hostname": host, "host": FARM_HOST, "port": self.port,
+            "family": socket.AF_INET, "proto": 0, "flags": 0,
+        }]
+
+    async def close(self):
+        pass
+
+
+class MemoryDatabase:
+    """In-memory stand-in for the MySQL functions search_news calls."""
+
+    def __init__(self, args, categories: int = 20):
+        self.args = args
+        self.categories = [(i + 1, f"bench_{i}") for i in range(categories)]
+        self.stories = {}
+        self.fetch_states = {}
+
+    async def fetch_categories(self):
+        return self.categories
+
+    async def fetch_due_publishers(self, ignore_schedule: bool = False, retry_dead: bool = False):
+        publishers = []
+        for n in range(self.args.feeds):
+            state = self.fetch_states.get(n + 1, {})
+            publishers.append({
+                "id": n + 1,
+                "name": f"Feed {n}",
+                "category_id": self.categories[n % len(self.categories)][0],
+                "feed_url": f"http://feed{n}.{FARM_DOMAIN}/feed/{n}",
+                "etag": state.get("etag"),
+                "last_modified": state.get("last_modified"),
+                "content_hash": state.get("content_hash"),
+                "poll_interval": state.get("poll_interval"),
+                "next_due_at": state.get("next_due_at"),
+                "new_item_ratio": state.get("new_item_ratio"),
+                "consecutive_failures": state.get("consecutive_failures"),
+                "latency_ewma": state.get("latency_ewma"),
+            })
+        return publishers
+
+    async def existing_url_hashes(self, url_hashes):
+        await asyncio.sleep(self.args.db_latency_ms / 1000)
+        return {url_hash for url_hash in url_hashes if url_hash in self.stories}
+
+    async def insert_stories(self, stories):
+        await asyncio.sleep(self.args.db_latency_ms / 1000)
+        for story in stories:
+            self.stories.setdefault(story["story_url_hash"], story["publisher_id"])
+        return 0
+
+    async def save_fetch_states(self, fetch_states):
+        for state in fetch_states:
+            self.fetch_states[state["publisher_id"]] = state
+
+    async def save_publisher_health(self, publishers):
+        for publisher in publishers:
+            state = self.fetch_states.setdefault(publisher["id"], {})
+            state["consecutive_failures"] = publisher["consecutive_failures"]
+            state["latency_ewma"] = publisher.get("latency_ewma")
+
+    async def noop(self, *args, **kwargs):
+        return None
+
+
+class TimedPool(Executor):
+    """ProcessPoolExecutor that reports the CPU time each task used in its worker."""
+
+    def __init__(self, cpu: dict, rss: dict, *args, **kwargs):
+        self.pool = ProcessPoolExecutor(*args, **kwargs)
+        self.cpu = cpu
+        self.rss = rss
+
+    def submit(self, fn, *args, **kwargs):
+        outer = Future()
+        stage = POOL_STAGES.get(getattr(fn, "__name__", ""), "other")
+
+        def done(inner):
+            try:
+                result, cpu_seconds = inner.result()
+            except BaseException as e:
+                outer.set_exception(e)
+                return
+            self.cpu[f"{stage} (pool)"] += cpu_seconds
+            outer.set_result(result)
+
+        self.pool.submit(_timed_call, fn, *args, **kwargs).add_done_callback(done)
+        return outer
+
+    def shutdown(self, wait=True, **kwargs):
+        for pid in list(getattr(self.pool, "_processes", {}) or {}):
+            self.rss["pool"] = max(self.rss["pool"], _peak_rss_kb(pid))
+        self.pool.shutdown(wait=wait, **kwargs)
+
+
+def _timed_call(fn, *args, **kwargs):
+    start = time.process_time()
+    result = fn(*args, **kwargs)
+    return result, time.process_time() - start
+
+
+def _peak_rss_kb(pid: int) -> int:
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def percentile(values: list, share: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(share * (len(values) - 1))))]
+
+
+class Benchmark:
+    """Wires search_news to the farm and the stand-in database and collects metrics."""
+
+    def __init__(self, sn, args, search_news_args: list):
+        self.sn = sn
+        self.args = args
+        self.search_news_args = search_news_args
+        self.database = MemoryDatabase(args)
+        self.cpu = defaultdict(float)
+        self.rss = {"pool": 0}
+        self.latencies = []
+        self.saved = {}
+
+    def stage(self, name, func):
+        """Wrap a search_news coroutine so CPU spent in it is charged to `name`."""
+        async def wrapper(*args, **kwargs):
+            token = current_stage.set(name)
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                current_stage.reset(token)
+        return wrapper
+
+    def timed_download(self, func):
+        async def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                self.latencies.append(time.perf_counter() - start)
+        return wrapper
+
+    def install(self, tmp_dir: str):
+        sn, db = self.sn, self.database
+        self.saved = {name: getattr(sn, name) for name in PATCHED}
+        self.initial_stats = copy.deepcopy(sn.stats)
+        sn.console = Console(file=io.StringIO()) if not self.args.show_output else sn.console
+        sn.URL_HASH_INDEX_PATH = os.path.join(tmp_dir, "story_url_hashes.bin")
+        sn.CHECKPOINT_PATH = os.path.join(tmp_dir, "search_news_checkpoint.json")
+
+        # Stand-in database layer
+        sn.init_db_pool = db.noop
+        sn.fetch_categories_from_database = db.fetch_categories
+        sn.fetch_due_publishers_from_database = db.fetch_due_publishers
+        sn.seed_publish_intervals = db.noop
+        sn.save_fetch_states = self.stage("write", db.save_fetch_states)
+        sn.save_publisher_health = db.save_publisher_health
+        sn.get_existing_url_hashes = db.existing_url_hashes
+        sn.rebuild_url_hash_index = self.rebuild_url_hash_index
+
+        async def load_language_resolver():
+            sn.language_resolver = language_util.LanguageResolver()
+            sn.language_resolver.stats = sn.stats["languages"]
+        sn.load_language_resolver = load_language_resolver
+
+        async def load_cluster_index():
+            sn.cluster_index = minhash_util.MinHashIndex()
+        sn.load_cluster_index = load_cluster_index
+
+        # Per-stage accounting
+        sn.download_feed = self.stage("fetch", self.timed_download(sn.download_feed))
+        sn.parse_feed = self.stage("parse", sn.parse_feed)
+        sn.filter_new_stories = self.stage("dedup", sn.filter_new_stories)
+        sn.enrich_stories = self.stage("enrich", sn.enrich_stories)
+        sn.insert_stories_to_database = self.stage("write", db.insert_stories)
+        sn.ProcessPoolExecutor = lambda *a, **kw: TimedPool(self.cpu, self.rss, *a, **kw)
+
+    def uninstall(self):
+        for name, value in self.saved.items():
+            setattr(self.sn, name, value)
+        self.sn.stats.clear()
+        self.sn.stats.update(self.initial_stats)
+
+    async def rebuild_url_hash_index(self):
+        self.sn.url_hash_index.rebuild(self.database.stories)
+
+    async def run_once(self) -> dict:
+        sn = self.sn
+        sn.stats.clear()
+        sn.stats.update(copy.deepcopy(self.initial_stats))
+        sn.shutdown_requested = False
+        self.cpu.clear()
+        self.latencies.clear()
+
+        sys.argv = ["search_news", "--ignore-schedule", "--skip-prune", "--quiet", *self.search_news_args]
+        start, cpu_start = time.perf_counter(), time.process_time()
+        await sn.async_main()
+        elapsed = time.perf_counter() - start
+
+        loop_cpu = time.process_time() - cpu_start
+        self.cpu["event loop total"] = loop_cpu
+        return {
+            "elapsed": elapsed,
+            "stories": sn.stats["total_articles"],
+            "feeds": len(self.latencies),
+            "unchanged": sn.stats["feeds_unchanged"],
+            "errors": sum(sn.stats["error_types"].values()),
+            "p50": percentile(self.latencies, 0.50),
+            "p99": percentile(self.latencies, 0.99),
+            "cpu": dict(self.cpu),
+            "rss_main": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+            "rss_pool": self.rss["pool"],
+        }
+
+
+def install_cpu_accounting():
+    """
+    Charge the CPU time of every event loop callback to the stage that was
+    running in it (see current_stage). Costs a few microseconds per callback.
+    """
+    totals = defaultdict(float)
+    original_run = asyncio.events.Handle._run
+
+    def _run(handle):
+        start = time.thread_time()
+        try:
+            original_run(handle)
+        finally:
+            context = getattr(handle, "_context", None)
+            stage = context.get(current_stage, "other") if context is not None else "other"
+            totals[stage] += time.thread_time() - start
+
+    asyncio.events.Handle._run = _run
+    return totals
+
+
+def print_report(console: Console, label: str, results: list):
+    table = Table(title=f"Ingestion benchmark: {label}")
+    for column in ("Run", "Feeds", "Stories", "Stories/s", "Unchanged", "Errors", "p50 ms", "p99 ms", "Time s"):
+        table.add_column(column, justify="right")
+    for index, result in enumerate(results):
+        table.add_row(
+            str(index), str(result["feeds"]), str(result["stories"]),
+            f"{result['stories'] / result['elapsed']:.0f}",
+            str(result["unchanged"]), str(result["errors"]),
+            f"{result['p50'] * 1000:.0f}", f"{result['p99'] * 1000:.0f}",
+            f"{result['elapsed']:.2f}",
+        )
+    console.print(table)
+
+    first = results[0]
+    cpu_table = Table(title="CPU seconds by stage (first run)")
+    cpu_table.add_column("Stage")
+    cpu_table.add_column("CPU s", justify="right")
+    for stage, seconds in sorted(first["cpu"].items(), key=lambda item: -item[1]):
+        cpu_table.add_row(stage, f"{seconds:.2f}")
+    console.print(cpu_table)
+    console.print(
+        f"Peak RSS: main {first['rss_main'] / 1024:.0f} MiB, "
+        f"largest pool worker {first['rss_pool'] / 1024:.0f} MiB\n"
+    )
+
+
+async def benchmark(args, search_news_args: list, label: str, loop_cpu: dict) -> list:
+    import utils.search_news as sn
+
+    farm = FeedFarm(args)
+    await farm.start(args.port)
+    resolver = FarmResolver(args.port)
+    original_connector = aiohttp.TCPConnector
+    aiohttp.TCPConnector = lambda **kwargs: original_connector(resolver=resolver, **kwargs)
+
+    bench = Benchmark(sn, args, search_news_args)
+    results = []
+    rng = random.Random(args.seed)
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            bench.install(tmp_dir)
+            for run in range(args.runs):
+                if run:
+                    farm.publish(args.churn, rng)
+                loop_cpu.clear()
+                result = await bench.run_once()
+                for stage, seconds in loop_cpu.items():
+                    result["cpu"][f"{stage} (loop)"] = seconds
+                results.append(result)
+    finally:
+        bench.uninstall()
+        aiohttp.TCPConnector = original_connector
+        await farm.stop()
+
+    return results
+
+
+def parse_arguments():
+    argv = sys.argv[1:]
+    search_news_args = []
+    if "--" in argv:
+        split = argv.index("--")
+        argv, search_news_args = argv[:split], argv[split + 1:]
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--feeds", type=int, default=2000, help="Feeds in the farm (default: 2000)")
+    parser.add_argument("--items", type=int, default=30, help="Items per feed (default: 30)")
+    parser.add_argument("--description-words", type=int, default=60, help="Words per item description (default: 60)")
+    parser.add_argument("--atom-share", type=float, default=0.3, help="Share of Atom feeds (default: 0.3)")
+    parser.add_argument("--latency-ms", type=float, default=80, help="Mean response latency (default: 80)")
+    parser.add_argument("--jitter-ms", type=float, default=60, help="Latency standard deviation (default: 60)")
+    parser.add_argument("--error-rate", type=float, default=0.02, help="Share of 503 responses (default: 0.02)")
+    parser.add_argument("--duplicate-rate", type=float, default=0.1, help="Share of items syndicated from other feeds (default: 0.1)")
+    parser.add_argument("--db-latency-ms", type=float, default=2, help="Simulated round-trip per stand-in DB call (default: 2)")
+    parser.add_argument("--runs", type=int, default=2, help="Runs per pipeline, the first from an empty store (default: 2)")
+    parser.add_argument("--churn", type=float, default=0.2, help="Share of feeds with new items before each repeat run (default: 0.2)")
+    parser.add_argument("--compare", nargs="+", choices=("streaming", "category"), help="Benchmark these --pipeline modes")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--show-output", action="store_true", help="Keep search_news console output")
+    return parser.parse_args(argv), search_news_args
+
+
+def main():
+    args, search_news_args = parse_arguments()
+    console = Console()
+    loop_cpu = install_cpu_accounting()
+
+    variants = [("default", search_news_args)]
+    if args.compare:
+        variants = [(mode, [*search_news_args, "--pipeline", mode]) for mode in args.compare]
+
+    for label, variant_args in variants:
+        results = asyncio.run(benchmark(args, variant_args, label, loop_cpu))
+        print_report(console, f"{label} {' '.join(variant_args)}".strip(), results)
+
+
+if __name__ == "__main__":
+    main()
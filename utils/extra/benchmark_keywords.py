@@ -0,0 +1,154 @@
+"""
+Compare the YAKE and TF-IDF keyword engines of search_news.py on a fixed corpus.
+
+The corpus is a JSONL file with one {"text": ..., "lang": ...} object per line.
+Export one from the stories table first, so every comparison runs on the same data:
+
+    python -m utils.extra.benchmark_keywords --export 5000 --corpus /tmp/keyword_corpus.jsonl
+    python -m utils.extra.benchmark_keywords --corpus /tmp/keyword_corpus.jsonl
+
+Quality is reported as agreement with YAKE, the engine in production: the share of
+TF-IDF tags that exactly match a YAKE tag of the same story, and the share that
+share at least one word with one.
+
+TF-IDF is run the way the streaming pipeline runs it: stories arrive in small
+batches per category (--batch-size, the new stories of a category in one writer
+flush), each tagged with the category's last CONTEXT_SIZE stories as context.
+The same batches without context, and whole categories at once (the category
+pipeline), are reported for comparison.
+"""
+import argparse
+import json
+import time
+
+from collections import defaultdict, deque
+
+from website_scripts import keyword_util
+
+
+def export_corpus(path: str, limit: int):
+    """Dump the newest `limit` stories (title + description, lang) to `path`."""
+    import pymysql
+
+    from website_scripts import config
+
+    connection = pymysql.connect(
+        host=config.MYSQL_HOST,
+        user=config.MYSQL_USERNAME,
+        password=config.MYSQL_PASSWORD,
+        database=config.MYSQL_DATABASE,
+        charset="utf8mb4",
+    )
+    with connection, connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT category_id, title, description, lang FROM stories ORDER BY id DESC LIMIT %s",
+            (limit,),
+        )
+        rows = cursor.fetchall()
+
+    with open(path, "w", encoding="utf-8") as f:
+        for category_id, title, description, lang in rows:
+            record = {"category_id": category_id, "text": f"{title} {description or ''}", "lang": lang}
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    print(f"Exported {len(rows)} stories to {path}")
+
+
+def load_corpus(path: str) -> list:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def run_yake(corpus: list) -> tuple:
+    import yake
+
+    extractors = {}
+    start = time.perf_counter()
+    results = []
+    for record in corpus:
+        lang = record["lang"]
+        if lang not in extractors:
+            extractors[lang] = yake.KeywordExtractor(lan=lang, n=2, top=5)
+        try:
+            results.append(tuple(kw for kw, _ in extractors[lang].extract_keywords(record["text"])))
+        except Exception:
+            results.append(tuple())
+    return results, time.perf_counter() - start
+
+
+def run_tfidf(corpus: list, batch_size: int = 0, with_context: bool = True) -> tuple:
+    """
+    Tag `corpus` like search_news.tag_stories: per category, `batch_size` stories
+    at a time in arrival order (0 for the whole category), with the category's
+    recent stories as context unless `with_context` is False.
+    """
+    categories = defaultdict(list)
+    for index, record in enumerate(corpus):
+        categories[record.get("category_id")].append(index)
+
+    start = time.perf_counter()
+    results = [tuple()] * len(corpus)
+    for indexes in categories.values():
+        context = deque(maxlen=keyword_util.CONTEXT_SIZE)
+        size = batch_size or len(indexes)
+        for offset in range(0, len(indexes), size):
+            batch = indexes[offset:offset + size]
+            texts = [(corpus[i]["text"], corpus[i]["lang"]) for i in batch]
+            keywords = keyword_util.extract_keywords_batch(texts, context=list(context) if with_context else ())
+            for i, tags in zip(batch, keywords):
+                results[i] = tags
+            context.extend(texts)
+    return results, time.perf_counter() - start
+
+
+def agreement(reference: list, candidate: list) -> tuple:
+    """(exact, partial) share of candidate tags that agree with the reference tags."""
+    exact = partial = total = 0
+    for reference_tags, candidate_tags in zip(reference, candidate):
+        reference_lower = {tag.lower() for tag in reference_tags}
+        reference_words = {word for tag in reference_lower for word in tag.split()}
+        for tag in candidate_tags:
+            total += 1
+            exact += tag.lower() in reference_lower
+            partial += bool(reference_words.intersection(tag.lower().split()))
+    return (exact / total, partial / total) if total else (0.0, 0.0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", required=True, help="JSONL corpus path")
+    parser.add_argument("--export", type=int, metavar="N", help="Export the newest N stories to --corpus and exit")
+    parser.add_argument("--examples", type=int, default=5, help="Stories to print side by side")
+    parser.add_argument("--batch-size", type=int, default=20, help="New stories of a category per write batch")
+    args = parser.parse_args()
+
+    if args.export:
+        export_corpus(args.corpus, args.export)
+        return
+
+    # Exports are newest first; replay them in arrival order
+    corpus = load_corpus(args.corpus)[::-1]
+    yake_tags, yake_time = run_yake(corpus)
+    runs = {
+        f"tfidf, batches of {args.batch_size} + context": run_tfidf(corpus, args.batch_size),
+        f"tfidf, batches of {args.batch_size}": run_tfidf(corpus, args.batch_size, with_context=False),
+        "tfidf, whole categories": run_tfidf(corpus),
+    }
+
+    print(f"{len(corpus)} stories")
+    print(f"{'':<36}{'stories/s':>10}{'exact':>8}{'word':>8}")
+    print(f"{'yake':<36}{len(corpus) / yake_time:>10.0f}")
+    for label, (tags, elapsed) in runs.items():
+        exact, partial = agreement(yake_tags, tags)
+        print(f"{label:<36}{len(corpus) / elapsed:>10.0f}{exact:>8.0%}{partial:>8.0%}")
+    print("exact/word: share of tfidf tags matching a yake tag, or sharing a word with one")
+
+    tfidf_tags = next(iter(runs.values()))[0]
+
+    for record, yake_keywords, tfidf_keywords in list(zip(corpus, yake_tags, tfidf_tags))[:args.examples]:
+        print(f"\n{record['text'][:100]}")
+        print(f"  yake:  {', '.join(yake_keywords)}")
+        print(f"  tfidf: {', '.join(tfidf_keywords)}")
+
+
+if __name__ == "__main__":
+    main()
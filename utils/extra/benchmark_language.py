@@ -0,0 +1,123 @@
+"""
+Benchmark story language resolution: per-story langdetect (the old ingestion path)
+against LanguageResolver with publisher priors, the text memo and batched detection
+in a process pool.
+
+Usage:
+    python -m utils.extra.benchmark_language --stories 2000 --publishers 50
+"""
+import argparse
+import time
+
+from concurrent.futures import ProcessPoolExecutor
+from random import Random
+
+from website_scripts import language_util, qol_util
+
+SAMPLE_SENTENCES = {
+    "en": [
+        "The government announced new measures to fight inflation this week.",
+        "Thousands of people gathered in the capital to protest the reform.",
+        "The central bank kept interest rates unchanged on Thursday.",
+        "Scientists warn that the heatwave could last until next month.",
+    ],
+    "pt": [
+        "O governo anunciou novas medidas para combater a inflação nesta semana.",
+        "Milhares de pessoas se reuniram na capital para protestar contra a reforma.",
+        "O banco central manteve a taxa de juros inalterada na quinta-feira.",
+        "Cientistas alertam que a onda de calor pode durar até o próximo mês.",
+    ],
+    "es": [
+        "El gobierno anunció nuevas medidas para combatir la inflación esta semana.",
+        "Miles de personas se reunieron en la capital para protestar contra la reforma.",
+        "El banco central mantuvo sin cambios los tipos de interés el jueves.",
+        "Los científicos advierten que la ola de calor podría durar hasta el próximo mes.",
+    ],
+    "fr": [
+        "Le gouvernement a annoncé de nouvelles mesures contre l'inflation cette semaine.",
+        "Des milliers de personnes se sont rassemblées dans la capitale contre la réforme.",
+        "La banque centrale a maintenu ses taux d'intérêt inchangés jeudi.",
+        "Les scientifiques préviennent que la canicule pourrait durer jusqu'au mois prochain.",
+    ],
+}
+
+
+def build_stories(story_count: int, publisher_count: int, mixed_share: float, seed: int = 0) -> list:
+    """(publisher_id, text) pairs. A `mixed_share` of publishers write in two languages."""
+    rng = Random(seed)
+    langs = list(SAMPLE_SENTENCES)
+    publishers = []
+    for publisher_id in range(publisher_count):
+        if rng.random() < mixed_share:
+            publishers.append((publisher_id, rng.sample(langs, 2)))
+        else:
+            publishers.append((publisher_id, [rng.choice(langs)]))
+
+    stories = []
+    for index in range(story_count):
+        publisher_id, publisher_langs = rng.choice(publishers)
+        sentences = SAMPLE_SENTENCES[rng.choice(publisher_langs)]
+        # The number keeps texts distinct, like real headlines, without hinting a language
+        text = f"{' '.join(rng.sample(sentences, 2))} {seed}{index}"
+        stories.append((publisher_id, text))
+    return stories
+
+
+def run_baseline(stories: list) -> float:
+    start = time.perf_counter()
+    for _, text in stories:
+        qol_util.detect_language(text)
+    return time.perf_counter() - start
+
+
+def run_resolver(stories: list, history: list, pool, chunk_size: int) -> tuple:
+    start = time.perf_counter()
+    resolver = language_util.LanguageResolver.from_history(history)
+
+    pending = {}
+    for publisher_id, text in stories:
+        if not resolver.resolve(publisher_id, text):
+            pending.setdefault(text, publisher_id)
+
+    texts = list(pending)
+    chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+    langs = [lang for chunk in pool.map(language_util.detect_languages, chunks) for lang in chunk]
+    for text, lang in zip(texts, langs):
+        resolver.remember(pending[text], text, lang)
+
+    return time.perf_counter() - start, resolver.stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stories", type=int, default=2000)
+    parser.add_argument("--publishers", type=int, default=50)
+    parser.add_argument("--mixed-share", type=float, default=0.1, help="Share of bilingual publishers")
+    parser.add_argument("--workers", type=int, default=4, help="Process pool size")
+    parser.add_argument("--chunk-size", type=int, default=100)
+    args = parser.parse_args()
+
+    stories = build_stories(args.stories, args.publishers, args.mixed_share)
+
+    # Yesterday's stories stand in for the stories.lang history loaded at startup
+    history_stories = build_stories(args.stories, args.publishers, args.mixed_share, seed=1)
+    history = {}
+    for publisher_id, text in history_stories:
+        key = (publisher_id, qol_util.detect_language(text))
+        history[key] = history.get(key, 0) + 1
+    history = [(publisher_id, lang, count) for (publisher_id, lang), count in history.items()]
+
+    baseline = run_baseline(stories)
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        pool.submit(language_util.detect_languages, ["warm up"]).result()
+        cold, _ = run_resolver(stories, [], pool, args.chunk_size)
+        warm, warm_stats = run_resolver(stories, history, pool, args.chunk_size)
+
+    print(f"{len(stories)} stories, {args.publishers} publishers")
+    print(f"{'per-story langdetect':<28}{len(stories) / baseline:>10.0f} stories/s")
+    print(f"{'resolver, no history':<28}{len(stories) / cold:>10.0f} stories/s")
+    print(f"{'resolver, with history':<28}{len(stories) / warm:>10.0f} stories/s  {warm_stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Benchmark og:image extraction for search_news_images: reading the whole article
+and parsing it with BeautifulSoup (the old path) against streaming the page
+through preview_util.HeadScanner, which stops at </head>.
+
+Pages are fed in the chunks the image worker reads them in. Bytes are what each
+path consumed from the response, i.e. what had to be downloaded. Synthetic
+article pages are used unless --pages points at a directory of saved .html files.
+
+Usage:
+    python -m utils.extra.benchmark_link_preview --pages-count 200
+    python -m utils.extra.benchmark_link_preview --pages saved_articles/
+"""
+import argparse
+import time
+
+from pathlib import Path
+from random import Random
+
+from bs4 import BeautifulSoup
+
+from website_scripts import preview_util
+
+CHUNK_SIZE = 16 * 1024
+
+WORDS = (
+    "government market election minister report city police economy court health "
+    "climate energy school team season prices week officials said according year"
+).split()
+
+
+def build_page(rng: Random, index: int) -> bytes:
+    """An article page shaped like a news site's: a busy <head>, a long body."""
+    metas = "".join(
+        f'<meta name="tag-{i}" content="{" ".join(rng.choices(WORDS, k=6))}">' for i in range(rng.randint(20, 60))
+    )
+    script = "var config = {" + ",".join(f'"k{i}": {rng.random()}' for i in range(rng.randint(200, 1500))) + "};"
+    nav = '<a href="/section">Section</a>' * 40
+    paragraphs = "".join(
+        f"<p>{' '.join(rng.choices(WORDS, k=60))}</p>" for _ in range(rng.randint(150, 600))
+    )
+    return (
+        "<!DOCTYPE html><html lang=\"en\"><head><meta charset=\"utf-8\">"
+        f"<title>Story {index}</title>{metas}"
+        f'<meta property="og:image" content="https://cdn.example.com/{index}.jpg">'
+        f'<meta name="twitter:image" content="https://cdn.example.com/{index}-tw.jpg">'
+        '<link rel="icon" href="/favicon.png">'
+        f"<script>{script}</script><style>body{{margin:0}}</style></head>"
+        f"<body><header><nav>{nav}</nav></header>"
+        f"<article><h1>Story {index}</h1>{paragraphs}</article></body></html>"
+    ).encode()
+
+
+def chunks(page: bytes):
+    for i in range(0, len(page), CHUNK_SIZE):
+        yield page[i:i + CHUNK_SIZE]
+
+
+def run_baseline(pages: list) -> tuple:
+    """response.text() + BeautifulSoup(lxml), as extract_image_from_response did."""
+    consumed = 0
+    found = []
+    start = time.process_time()
+    for url, page in pages:
+        body = b"".join(chunks(page))
+        consumed += len(body)
+        soup = BeautifulSoup(body.decode("utf-8", "replace"), "lxml")
+        image = soup.find("meta", {"property": "og:image"})
+        soup.find("link", rel="icon")
+        found.append(image.get("content", "").strip() if image else None)
+    return time.process_time() - start, consumed, found
+
+
+def run_streaming(pages: list) -> tuple:
+    consumed = 0
+    found = []
+    start = time.process_time()
+    for url, page in pages:
+        head = preview_util.HeadScanner(url, "text/html; charset=utf-8")
+        for chunk in chunks(page):
+            if head.scan(chunk):
+                break
+        head.finish()
+        consumed += head.bytes_read
+        found.append(head.image)
+    return time.process_time() - start, consumed, found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages-count", type=int, default=200, help="Synthetic pages to generate")
+    parser.add_argument("--pages", help="Directory of saved .html article pages to use instead")
+    args = parser.parse_args()
+
+    if args.pages:
+        pages = [(f"https://example.com/{path.name}", path.read_bytes()) for path in sorted(Path(args.pages).glob("*.html"))]
+    else:
+        rng = Random(0)
+        pages = [(f"https://example.com/news/{i}", build_page(rng, i)) for i in range(args.pages_count)]
+    if not pages:
+        parser.error("no pages to benchmark")
+
+    baseline_cpu, baseline_bytes, baseline_found = run_baseline(pages)
+    streaming_cpu, streaming_bytes, streaming_found = run_streaming(pages)
+    agree = sum(a == b for a, b in zip(baseline_found, streaming_found))
+
+    count = len(pages)
+    print(f"{count} pages, {sum(len(page) for _, page in pages) / count / 1024:.0f} KB on average")
+    print(f"{'':<28}{'KB/story':>10}{'CPU ms/story':>14}")
+    print(f"{'full body + BeautifulSoup':<28}{baseline_bytes / count / 1024:>10.1f}{baseline_cpu / count * 1000:>14.2f}")
+    print(f"{'streaming <head> scan':<28}{streaming_bytes / count / 1024:>10.1f}{streaming_cpu / count * 1000:>14.2f}")
+    print(f"Same og:image on {agree}/{count} pages")
+
+
+if __name__ == "__main__":
+    main()
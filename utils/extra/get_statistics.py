@@ -37,8 +37,10 @@ def get_statistics() -> dict:
             cursor.execute("SELECT COUNT(*) FROM publishers")
             total_feeds = cursor.fetchone()["COUNT(*)"]
 
-            cursor.execute("SELECT COUNT(*) FROM stories")
-            total_news = cursor.fetchone()["COUNT(*)"]
+            # Stories and comments come from the daily rollups (one row per day or
+            # day and category) instead of counting the tables themselves
+            cursor.execute("SELECT SUM(stories) AS total FROM story_daily_counts")
+            total_news = int(cursor.fetchone()["total"] or 0)
 
             cursor.execute("SELECT SUM(views) FROM story_stats")
             total_clicks = cursor.fetchone()["SUM(views)"] or 0
@@ -46,8 +48,8 @@ def get_statistics() -> dict:
             cursor.execute("SELECT COUNT(*) FROM users")
             total_users = cursor.fetchone()["COUNT(*)"]
 
-            cursor.execute("SELECT COUNT(*) FROM comments")
-            total_comments = cursor.fetchone()["COUNT(*)"]
+            cursor.execute("SELECT SUM(comments) AS total FROM engagement_daily_counts")
+            total_comments = int(cursor.fetchone()["total"] or 0)
 
             # Calculate last updated message
             if saved_timestamp:
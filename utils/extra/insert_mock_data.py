@@ -43,7 +43,7 @@ from sqlalchemy.exc import IntegrityError
 
 from app import app
 from website_scripts.extensions import db
-from website_scripts import models, security_util, hashing_util
+from website_scripts import models, security_util, hashing_util, url_util, rollup_util
 
 
 def parse_args():
@@ -354,7 +354,7 @@ def create_mock_stories(categories: list, publishers: list) -> list:
         fake_url = (
             f"https://example-news.com/article/{i + 1}-{random.randint(10000, 99999)}"
         )
-        url_hash = hashing_util.string_to_md5_binary(fake_url)
+        url_hash = hashing_util.string_to_md5_binary(url_util.url_key(fake_url))
         story_data.append((fake_url, url_hash))
 
     # Fetch existing stories by url_hash in bulk
@@ -1083,6 +1083,11 @@ def main():
         create_mock_notifications(users, comments, friendships)
         create_mock_bookmarks_messages_views(users, stories)
 
+        # Mock rows bypass the API paths that keep the dashboard rollups current
+        print("\nRebuilding dashboard rollups...")
+        rollup_util.rebuild(db.session)
+        db.session.commit()
+
         # Summary
         print("\n" + "=" * 60)
         print("Mock Data Generation Complete!")
@@ -0,0 +1,38 @@
+"""
+Recompute the story_daily_counts and engagement_daily_counts rollups from
+stories, story_reactions, comments and bookmarks.
+
+The rollups are updated incrementally by ingestion, pruning and the API. Run
+this after bulk changes that bypass them (manual deletes, imports) to repair
+any drift.
+
+Usage:
+    python -m utils.extra.rebuild_rollups
+"""
+
+import pymysql
+
+from website_scripts import config, rollup_util
+
+db_params = {
+    "host": config.MYSQL_HOST,
+    "user": config.MYSQL_USERNAME,
+    "password": config.MYSQL_PASSWORD,
+    "database": config.MYSQL_DATABASE,
+    "charset": "utf8mb4",
+    "cursorclass": pymysql.cursors.DictCursor,
+}
+
+
+def rebuild_rollups():
+    with pymysql.connect(**db_params) as connection:
+        with connection.cursor() as cursor:
+            # One transaction: readers never see an emptied rollup
+            for statement in rollup_util.REBUILD_STATEMENTS:
+                cursor.execute(statement)
+        connection.commit()
+
+
+if __name__ == "__main__":
+    rebuild_rollups()
+    print("Rollups rebuilt.")
@@ -0,0 +1,352 @@
+"""
+One-off migration to canonical story URLs (see website_scripts/url_util.py).
+
+Stories used to be hashed by their raw feed link, so the same article with other
+tracking parameters, scheme or trailing slash was stored several times. This
+tool rewrites every story's url and url_hash to the canonical form. Stories that
+turn out to be the same article are merged into the first one re-hashed:
+
+- views are added up, reactions, bookmarks and reading history move over (one
+  per user), likes and dislikes are recounted from the reactions
+- comments move over, with their page_hash and links updated
+- a missing gpt_summary or image is taken from the merged story
+- the merged story, and the reactions and bookmarks dropped as duplicates, are
+  subtracted from the story_daily_counts and engagement_daily_counts rollups
+
+Story images (and their srcset variants) are stored under the url_hash, so they
+are copied to their new keys.
+Safe to run again; already canonical stories are skipped. Run search_news.py
+afterwards, it rebuilds its url_hash index from the new hashes.
+
+Usage:
+    python -m utils.extra.rehash_story_urls --dry-run
+    python -m utils.extra.rehash_story_urls
+"""
+import argparse
+import os
+import shutil
+
+from pathlib import Path
+
+import pymysql
+
+from website_scripts import config, encode_util, hashing_util, rollup_util, url_util
+
+db_params = {
+    "host": config.MYSQL_HOST,
+    "user": config.MYSQL_USERNAME,
+    "password": config.MYSQL_PASSWORD,
+    "database": config.MYSQL_DATABASE,
+    "charset": "utf8mb4",
+    "cursorclass": pymysql.cursors.DictCursor,
+}
+
+# Same file as search_news.URL_HASH_INDEX_PATH
+URL_HASH_INDEX_PATH = f"{config.WEBSITE_ROOT}/cache/story_url_hashes.bin"
+LOCAL_STORAGE_PATH = Path("/app/static/local_uploads")
+BUCKET_NAME = "infomundi"
+
+
+class Storage:
+    """Copies and deletes story images in R2, or in local storage without R2 credentials."""
+
+    def __init__(self):
+        self.s3_client = None
+        if getattr(config, "R2_ENDPOINT", None) and getattr(config, "R2_ACCESS_KEY", None):
+            import boto3
+
+            self.s3_client = boto3.client(
+                "s3",
+                endpoint_url=config.R2_ENDPOINT,
+                aws_access_key_id=config.R2_ACCESS_KEY,
+                aws_secret_access_key=config.R2_SECRET,
+                region_name="auto",
+            )
+
+    def copy(self, source_key: str, object_key: str) -> bool:
+        try:
+            if self.s3_client:
+                self.s3_client.copy_object(
+                    Bucket=BUCKET_NAME,
+                    CopySource={"Bucket": BUCKET_NAME, "Key": source_key},
+                    Key=object_key,
+                )
+            else:
+                (LOCAL_STORAGE_PATH / object_key).parent.mkdir(parents=True, exist_ok=True)
+                shutil.copyfile(LOCAL_STORAGE_PATH / source_key, LOCAL_STORAGE_PATH / object_key)
+            return True
+        except Exception as e:
+            print(f"   Could not copy {source_key} to {object_key}: {e}")
+            return False
+
+    def delete(self, object_key: str):
+        try:
+            if self.s3_client:
+                self.s3_client.delete_object(Bucket=BUCKET_NAME, Key=object_key)
+            else:
+                (LOCAL_STORAGE_PATH / object_key).unlink(missing_ok=True)
+        except Exception as e:
+            print(f"   Could not delete {object_key}: {e}")
+
+
+def image_keys(category_name: str, url_hash: bytes, variants: int) -> list:
+    """Storage keys of a story image and its srcset variants (see Story.get_image_url)."""
+    path = f"stories/{category_name}/{hashing_util.binary_to_md5_hex(url_hash)}"
+    return [path + suffix for suffix in encode_util.variant_suffixes(variants)]
+
+
+def copy_image(storage, source_keys: list, target_keys: list) -> bool:
+    return all([storage.copy(source, target) for source, target in zip(source_keys, target_keys)])
+
+
+def comment_page_hash(url_hash: bytes) -> bytes:
+    """page_hash of a story's comments: the MD5 of its public ID."""
+    return hashing_util.string_to_md5_binary(hashing_util.binary_to_md5_hex(url_hash))
+
+
+def rename_story(cursor, storage, story: dict, url: str, url_hash: bytes, dry_run: bool):
+    """Give a story its canonical url and url_hash, moving its image and comments along."""
+    if dry_run:
+        return
+
+    old_keys = image_keys(story["category_name"], story["url_hash"], story["image_variants"])
+    new_keys = image_keys(story["category_name"], url_hash, story["image_variants"])
+    has_image = bool(story["has_image"]) and copy_image(storage, old_keys, new_keys)
+
+    cursor.execute(
+        "UPDATE stories SET url = %s, url_hash = %s, has_image = %s WHERE id = %s",
+        (url, url_hash, has_image, story["id"]),
+    )
+    cursor.execute(
+        """
+        UPDATE comments
+        SET page_hash = %s, url = REPLACE(url, %s, %s)
+        WHERE page_hash = %s
+        """,
+        (
+            comment_page_hash(url_hash),
+            hashing_util.binary_to_md5_hex(story["url_hash"]),
+            hashing_util.binary_to_md5_hex(url_hash),
+            comment_page_hash(story["url_hash"]),
+        ),
+    )
+    cursor.connection.commit()
+
+    if story["has_image"] and has_image:
+        for key in old_keys:
+            storage.delete(key)
+
+
+def merge_story(cursor, storage, story: dict, target: dict, dry_run: bool):
+    """Fold `story` into `target`, the stored copy of the same article, and delete it."""
+    if dry_run:
+        return
+
+    source_id, target_id = story["id"], target["id"]
+
+    # Reactions and bookmarks: one per user, the target's own win. The ones
+    # dropped leave the engagement rollup.
+    cursor.execute(
+        """
+        SELECT DATE(r.created_at) AS day, r.action AS kind, COUNT(*) AS n
+        FROM story_reactions AS r
+        WHERE r.story_id = %s AND EXISTS (
+            SELECT 1 FROM story_reactions AS t WHERE t.story_id = %s AND t.user_id = r.user_id
+        )
+        GROUP BY day, kind
+        UNION ALL
+        SELECT DATE(b.created_at), 'bookmark', COUNT(*)
+        FROM bookmarks AS b
+        WHERE b.story_id = %s AND EXISTS (
+            SELECT 1 FROM bookmarks AS t WHERE t.story_id = %s AND t.user_id = b.user_id
+        )
+        GROUP BY DATE(b.created_at)
+        """,
+        (source_id, target_id, source_id, target_id),
+    )
+    engagement = rollup_util.engagement_day_counts(
+        ((row["day"], row["kind"], row["n"]) for row in cursor.fetchall()), sign=-1
+    )
+    if engagement:
+        cursor.executemany(rollup_util.ENGAGEMENT_COUNTS_UPSERT, engagement)
+
+    cursor.execute(
+        """
+        DELETE r FROM story_reactions AS r
+        JOIN story_reactions AS t ON t.user_id = r.user_id AND t.story_id = %s
+        WHERE r.story_id = %s
+        """,
+        (target_id, source_id),
+    )
+    cursor.execute("UPDATE story_reactions SET story_id = %s WHERE story_id = %s", (target_id, source_id))
+    cursor.execute(
+        """
+        DELETE b FROM bookmarks AS b
+        JOIN bookmarks AS t ON t.user_id = b.user_id AND t.story_id = %s
+        WHERE b.story_id = %s
+        """,
+        (target_id, source_id),
+    )
+    cursor.execute("UPDATE bookmarks SET story_id = %s WHERE story_id = %s", (target_id, source_id))
+    cursor.execute("UPDATE user_story_views SET story_id = %s WHERE story_id = %s", (target_id, source_id))
+
+    # Views add up; likes and dislikes follow the merged reactions
+    cursor.execute("INSERT IGNORE INTO story_stats (story_id) VALUES (%s)", (target_id,))
+    cursor.execute(
+        """
+        UPDATE story_stats AS t
+        LEFT JOIN story_stats AS s ON s.story_id = %s
+        SET t.views = COALESCE(t.views, 0) + COALESCE(s.views, 0),
+            t.likes = (SELECT COUNT(*) FROM story_reactions WHERE story_id = %s AND action = 'like'),
+            t.dislikes = (SELECT COUNT(*) FROM story_reactions WHERE story_id = %s AND action = 'dislike')
+        WHERE t.story_id = %s
+        """,
+        (source_id, target_id, target_id, target_id),
+    )
+
+    cursor.execute(
+        """
+        UPDATE comments
+        SET story_id = %s, page_hash = %s, url = REPLACE(url, %s, %s)
+        WHERE page_hash = %s
+        """,
+        (
+            target_id,
+            comment_page_hash(target["url_hash"]),
+            hashing_util.binary_to_md5_hex(story["url_hash"]),
+            hashing_util.binary_to_md5_hex(target["url_hash"]),
+            comment_page_hash(story["url_hash"]),
+        ),
+    )
+
+    # Keep whatever the target is missing
+    cursor.execute(
+        """
+        UPDATE stories AS t
+        JOIN stories AS s ON s.id = %s
+        SET t.gpt_summary = COALESCE(t.gpt_summary, s.gpt_summary)
+        WHERE t.id = %s
+        """,
+        (source_id, target_id),
+    )
+    story_keys = image_keys(story["category_name"], story["url_hash"], story["image_variants"])
+    if story["has_image"] and not target["has_image"]:
+        if copy_image(
+            storage,
+            story_keys,
+            image_keys(target["category_name"], target["url_hash"], story["image_variants"]),
+        ):
+            cursor.execute(
+                "UPDATE stories SET has_image = 1, image_variants = %s, image_width = %s WHERE id = %s",
+                (story["image_variants"], story["image_width"], target_id),
+            )
+            target["has_image"] = 1
+            target["image_variants"] = story["image_variants"]
+            target["image_width"] = story["image_width"]
+
+    cursor.execute("DELETE FROM tags WHERE story_id = %s", (source_id,))
+    cursor.execute("DELETE FROM stories WHERE id = %s", (source_id,))
+    if story["pub_date"] is not None:
+        cursor.executemany(
+            rollup_util.STORY_COUNTS_UPSERT,
+            [
+                (day, category_id, -count)
+                for day, category_id, count in rollup_util.story_day_counts([(story["pub_date"], story["category_id"])])
+            ],
+        )
+    cursor.connection.commit()
+
+    if story["has_image"]:
+        for key in story_keys:
+            storage.delete(key)
+
+
+def fetch_story_by_hash(cursor, url_hash: bytes):
+    cursor.execute(
+        """
+        SELECT s.id, s.url_hash, s.has_image, s.image_variants, s.image_width, c.name AS category_name
+        FROM stories AS s
+        JOIN categories AS c ON c.id = s.category_id
+        WHERE s.url_hash = %s
+        """,
+        (url_hash,),
+    )
+    return cursor.fetchone()
+
+
+def rehash_stories(batch_size: int, dry_run: bool) -> dict:
+    counts = {"checked": 0, "unchanged": 0, "renamed": 0, "merged": 0, "failed": 0}
+    storage = Storage()
+    planned = {}  # new url_hash -> story id, only used in dry runs
+
+    with pymysql.connect(**db_params) as connection:
+        with connection.cursor() as cursor:
+            last_id = 0
+            while True:
+                cursor.execute(
+                    """
+                    SELECT s.id, s.url, s.url_hash, s.has_image, s.image_variants, s.image_width, s.pub_date,
+                           s.category_id, c.name AS category_name
+                    FROM stories AS s
+                    JOIN categories AS c ON c.id = s.category_id
+                    WHERE s.id > %s
+                    ORDER BY s.id
+                    LIMIT %s
+                    """,
+                    (last_id, batch_size),
+                )
+                stories = cursor.fetchall()
+                if not stories:
+                    break
+                last_id = stories[-1]["id"]
+
+                for story in stories:
+                    counts["checked"] += 1
+                    story["url_hash"] = bytes(story["url_hash"])
+                    url = url_util.canonicalize_url(story["url"])
+                    url_hash = hashing_util.string_to_md5_binary(url_util.url_key(url))
+                    if url == story["url"] and url_hash == story["url_hash"]:
+                        counts["unchanged"] += 1
+                        continue
+
+                    try:
+                        if dry_run:
+                            target_id = planned.setdefault(url_hash, story["id"])
+                            target = None if target_id == story["id"] else {"id": target_id}
+                        else:
+                            target = fetch_story_by_hash(cursor, url_hash)
+
+                        if target and target["id"] != story["id"]:
+                            target["url_hash"] = bytes(target.get("url_hash") or url_hash)
+                            merge_story(cursor, storage, story, target, dry_run)
+                            counts["merged"] += 1
+                        else:
+                            rename_story(cursor, storage, story, url, url_hash, dry_run)
+                            counts["renamed"] += 1
+                    except Exception as e:
+                        connection.rollback()
+                        counts["failed"] += 1
+                        print(f"   Story {story['id']} failed: {e}")
+
+                print(f"   {counts['checked']} stories checked ({counts['renamed']} renamed, {counts['merged']} merged)")
+
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=1000, help="Stories read per query (default: 1000)")
+    parser.add_argument("--dry-run", action="store_true", help="Only count what would change")
+    args = parser.parse_args()
+
+    counts = rehash_stories(args.batch_size, args.dry_run)
+    print(f"{'[DRY-RUN] ' if args.dry_run else ''}{counts}")
+
+    if not args.dry_run and (counts["renamed"] or counts["merged"]) and os.path.exists(URL_HASH_INDEX_PATH):
+        # Holds the old hashes; search_news rebuilds it on its next run
+        os.remove(URL_HASH_INDEX_PATH)
+        print(f"Removed {URL_HASH_INDEX_PATH}")
+
+
+if __name__ == "__main__":
+    main()
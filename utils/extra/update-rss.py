@@ -1,35 +1,33 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 """
-backfill_feed_urls.py — Find and store real RSS/Atom feed URLs for publishers missing feed_url.
+update-rss.py — Find and store real RSS/Atom feed URLs for publishers missing feed_url.
 
-- Uses your rss_finder_i18n.py discovery+validation logic (no generated feeds).
-- Respects your default user-agent and timeouts inside the finder.
+- Uses search_news.discover_feeds: the feeds a homepage advertises, then the
+  usual endpoints, probed concurrently through one shared connector.
+- Only existing feeds that parse into entries are accepted (no generated feeds).
+- Domains without a feed are remembered for a week, so reruns skip them.
 - Safe to run multiple times; only updates rows with NULL/empty feed_url.
 
 Usage:
-  pip install pymysql requests beautifulsoup4
-  python backfill_feed_urls.py --workers 8 --dry-run   # preview only
-  python backfill_feed_urls.py --workers 8             # write updates
+  python -m utils.extra.update-rss --workers 50 --dry-run   # preview only
+  python -m utils.extra.update-rss --workers 50             # write updates
 """
 
 import argparse
+import asyncio
 import sys
-import threading
-from typing import Optional, Tuple, List
+from typing import Optional, List
 
 import pymysql
 
-# Import your finder module (must be importable on PYTHONPATH or same folder)
-import rss_finder_i18n as finder
+from utils import search_news
+from website_scripts import config
 
 # ---- DB helpers -------------------------------------------------------------
 
 
 def get_db_connection():
-    # Uses your exact pattern; requires a config module with credentials.
-    from website_scripts import config  # noqa: F401 (must exist in your project)
-
     db_params = {
         "host": config.MYSQL_HOST,
         "user": config.MYSQL_USERNAME,
@@ -49,7 +47,6 @@ def fetch_publishers_missing_feed(conn, limit: Optional[int] = None) -> List[dic
         WHERE (feed_url IS NULL OR feed_url = '')
           AND site_url IS NOT NULL AND site_url <> ''
         ORDER BY id ASC
-        LIMIT 10
     """
     if limit is not None:
         sql += " LIMIT %s"
@@ -67,72 +64,21 @@ def update_feed_url(conn, pub_id: int, feed_url: str):
         cur.execute(sql, (feed_url, pub_id))
 
 
-# ---- Feed discovery using your finder --------------------------------------
-
-DEFAULT_UA = finder.DEFAULT_UA  # reuse your UA string
-
-
-def normalize_root(url: str) -> Optional[str]:
-    try:
-        return finder._norm_url(url)  # your helper; raises on bad URL
-    except Exception:
-        return None
-
-
-def discover_valid_feed(root_url: str) -> Optional[str]:
-    """
-    Return the first valid feed URL for root_url, or None.
-    Only accepts *existing* feeds discovered by your logic.
-    """
-    s = finder._session(DEFAULT_UA)  # fresh requests.Session with UA
-    root = normalize_root(root_url)
-    if not root:
-        return None
-
-    candidates = finder.discover_feeds(root, s)
-    # Try each candidate; accept only those that validate and whose entries live on same domain
-    for cand in candidates:
-        ok, _ftype = finder.validate_feed(cand, s, root)
-        if ok:
-            return cand
-    return None
-
-
-# ---- Worker logic (optional concurrency) -----------------------------------
-
-
-def process_one(
-    pub_row: dict, verbose: bool = False
-) -> Tuple[int, Optional[str], Optional[str]]:
-    """
-    Returns (publisher_id, site_url, found_feed_url or None)
-    """
-    pub_id = pub_row["id"]
-    site = pub_row.get("site_url") or ""
-    feed = None
-    if site:
-        try:
-            feed = discover_valid_feed(site)
-        except Exception as e:
-            if verbose:
-                print(f"[warn] id={pub_id} site={site} error={e}", file=sys.stderr)
-    if verbose:
-        print(f"[check] id={pub_id} site={site} -> feed={feed}", file=sys.stderr)
-    return pub_id, site, feed
-
-
 # ---- Main -------------------------------------------------------------------
 
 
 def main():
     ap = argparse.ArgumentParser(
-        description="Backfill publishers.feed_url using rss_finder_i18n discovery."
+        description="Backfill publishers.feed_url using feed autodiscovery."
     )
     ap.add_argument(
         "--limit", type=int, default=None, help="Max number of publishers to process"
     )
     ap.add_argument(
-        "--workers", type=int, default=8, help="Concurrency for network checks"
+        "--workers", type=int, default=50, help="Sites searched concurrently"
+    )
+    ap.add_argument(
+        "--timeout", type=int, default=5, help="Seconds per request (default: 5)"
     )
     ap.add_argument("--dry-run", action="store_true", help="Do not write DB updates")
     ap.add_argument("--verbose", action="store_true", help="Verbose logging to stderr")
@@ -144,42 +90,29 @@ def main():
     if args.verbose:
         print(f"[start] candidates={total}", file=sys.stderr)
 
-    # Concurrency: thread pool, but we’ll keep DB writes on the main thread.
-    from concurrent.futures import ThreadPoolExecutor, as_completed
-
-    results: List[Tuple[int, Optional[str], Optional[str]]] = []
-
-    # Protect stdout/stderr formatting in verbose mode
-    print_lock = threading.Lock()
-
-    def _task(row):
-        res = process_one(row, verbose=args.verbose)
-        # serialize logs if needed
-        if args.verbose:
-            with print_lock:
-                pass
-        return res
-
-    if args.workers and args.workers > 1:
-        with ThreadPoolExecutor(max_workers=args.workers) as ex:
-            futs = [ex.submit(_task, r) for r in pubs]
-            for f in as_completed(futs):
-                results.append(f.result())
-    else:
-        for r in pubs:
-            results.append(_task(r))
+    # Network work is async; DB writes stay on the main thread afterwards
+    feeds = asyncio.run(
+        search_news.discover_feeds(
+            [row["site_url"] for row in pubs], workers=args.workers, timeout=args.timeout
+        )
+    )
 
     # Apply updates
     updated = 0
-    for pub_id, _site, feed in results:
+    found = 0
+    for row in pubs:
+        feed = feeds.get(row["site_url"])
+        if args.verbose:
+            print(f"[check] id={row['id']} site={row['site_url']} -> feed={feed}", file=sys.stderr)
         if not feed:
             continue
+        found += 1
         if args.dry_run:
             print(
-                f"[dry-run] UPDATE publishers SET feed_url='{feed}' WHERE id={pub_id};"
+                f"[dry-run] UPDATE publishers SET feed_url='{feed}' WHERE id={row['id']};"
             )
         else:
-            update_feed_url(conn, pub_id, feed)
+            update_feed_url(conn, row["id"], feed)
             updated += 1
 
     if not args.dry_run:
@@ -188,7 +121,7 @@ def main():
 
     # Summary
     print(
-        f"Processed: {total} | Found feeds: {sum(1 for _, _, f in results if f)} | Updated: {updated}{' (dry-run)' if args.dry_run else ''}"
+        f"Processed: {total} | Found feeds: {found} | Updated: {updated}{' (dry-run)' if args.dry_run else ''}"
     )
 
 
@@ -1,9 +1,13 @@
 import asyncio
 import argparse
+import copy
 import logging
 import os
 import signal
 import sys
+import time
+
+from collections import Counter, defaultdict, deque
 
 import aiohttp
 import aiomysql
@@ -13,21 +17,34 @@ import yake
 
 from bs4 import BeautifulSoup
 from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from contextlib import asynccontextmanager
 from datetime import datetime, timedelta
+from functools import lru_cache, partial
 from random import shuffle, choice
 from rich import box
 from rich.console import Console
 from rich.progress import Progress, SpinnerColumn, BarColumn, TextColumn, TimeElapsedColumn, MofNCompleteColumn
 from rich.table import Table
-from urllib.parse import urljoin
+from urllib.parse import urljoin, urlsplit
 
 from website_scripts import (
+    checkpoint_util,
     config,
+    feed_util,
     input_sanitization,
     immutable,
+    json_util,
     hashing_util,
-    qol_util,
+    hash_index_util,
+    keyword_util,
+    language_util,
+    lease_util,
+    minhash_util,
+    pool_util,
+    rollup_util,
+    scheduler_util,
+    url_util,
 )
 
 # Database connection parameters
@@ -42,9 +59,27 @@ db_params = {
 # Async database pool (initialized in main)
 db_pool = None
 
-# Process pool for CPU-bound YAKE extraction
+# Process pool for CPU-bound work (feed parsing, sanitization, YAKE)
 process_pool = None
 
+# Memory-mapped index of known story url_hashes (loaded in main)
+url_hash_index = None
+
+# Per-publisher language priors and detection memo (loaded in main)
+language_resolver = None
+
+# MinHash LSH index of recent stories, for near-duplicate clustering (loaded in main)
+cluster_index = None
+
+# Recently tagged (text, lang_code) pairs per category_id, the context of TF-IDF tagging
+keyword_context = defaultdict(lambda: deque(maxlen=keyword_util.CONTEXT_SIZE))
+
+# Progress of the current run, for --resume (see run_cycle); None in dry runs
+checkpoint = None
+
+# Shard leases of this node, with --shard (see run_streaming_pipeline)
+shard_leases = None
+
 # Rich console for colored output
 console = Console()
 
@@ -52,6 +87,12 @@ console = Console()
 log_dir = f"{config.WEBSITE_ROOT}/logs"
 os.makedirs(log_dir, exist_ok=True)
 
+# Local cache directory (url_hash index, ...)
+cache_dir = f"{config.WEBSITE_ROOT}/cache"
+URL_HASH_INDEX_PATH = f"{cache_dir}/story_url_hashes.bin"
+CHECKPOINT_PATH = f"{cache_dir}/search_news_checkpoint.json"
+LOCAL_LEASES_PATH = f"{cache_dir}/shard_leases.json"  # --lease-store local
+
 # Setup logging
 logging.basicConfig(
     filename=f"{log_dir}/create_cache.log",
@@ -62,6 +103,56 @@ logging.basicConfig(
 # Configuration
 MAX_WORKERS = 25  # Limit concurrent threads (increased for better I/O parallelization)
 REQUEST_TIMEOUT = 5  # Seconds (reduced from 5 for faster failure detection)
+YAKE_CHUNK_SIZE = 50  # Stories per process-pool task
+TFIDF_CHUNK_SIZE = 1000  # Stories per TF-IDF task; larger batches give better IDF values
+KEYWORD_ENGINE = "yake"  # "yake" or "tfidf", see --keyword-engine
+SANITIZE_CHUNK_SIZE = 100  # Stories per process-pool task
+LANG_CHUNK_SIZE = 100  # Texts per language-detection task
+
+# Feed bodies
+MAX_FEED_SIZE = 2 * 1024 * 1024  # Bytes read per feed; larger feeds keep their first entries, see --max-feed-kb
+MAX_PAGE_SIZE = 512 * 1024  # Bytes of a homepage searched for feed links (find_rss_feed)
+READ_CHUNK_SIZE = 64 * 1024  # Bytes per streamed read
+
+# Feed autodiscovery (find_rss_feed, discover_feeds)
+FEED_CANDIDATES = (
+    "rss",
+    "index.xml",
+    "feed/index.php",
+    "feed.xml",
+    "feed.atom",
+    "feed.rss",
+    "feed.json",
+    "feed.php",
+    "feed.asp",
+    "posts.rss",
+    "blog.xml",
+    "atom.xml",
+    "podcasts.xml",
+    "main.atom",
+    "main.xml",
+)
+DISCOVERY_PER_HOST = 4  # Concurrent probes per host
+DISCOVERY_MISS_TTL = 7 * 24 * 3600  # Seconds a domain without a feed is skipped by discover_feeds
+DISCOVERY_MISSES_PATH = f"{cache_dir}/feed_discovery_misses"  # .json, see json_util
+
+# Near-duplicate clustering
+CLUSTER_WINDOW_DAYS = 2  # Stories this recent are candidates for a new story's cluster
+
+# Pruning
+PRUNE_BATCH_SIZE = 1000  # Stories deleted per transaction
+PRUNE_PAUSE = 0.2  # Seconds between prune batches, so web queries get the locks
+
+# Streaming pipeline
+WRITE_BATCH_SIZE = 500  # Stories per writer flush
+WRITE_FLUSH_INTERVAL = 2.0  # Seconds before a partial batch is flushed anyway
+
+# Daemon mode
+CYCLE_INTERVAL = 60  # Seconds between the starts of two ingestion cycles
+DAEMON_PRUNE_INTERVAL = 3600  # Seconds between pruning passes
+
+# Marks the end of a stage's input in the streaming pipeline
+_STAGE_END = object()
 
 # Global state for graceful shutdown
 shutdown_requested = False
@@ -70,10 +161,24 @@ shutdown_requested = False
 stats = {
     "total_articles": 0,
     "total_errors": 0,
+    "feeds_unchanged": 0,
+    "feeds_truncated": 0,
+    "publishers_due": 0,
+    # Per-stage story counts: parsed -> new (after dedup) -> enriched -> inserted
+    "stages": {"parsed": 0, "new": 0, "enriched": 0, "inserted": 0},
+    # How story languages were resolved (see resolve_languages)
+    "languages": {"prior_hits": 0, "memo_hits": 0, "detected": 0},
+    # Near-duplicates of recent stories (see assign_clusters)
+    "near_duplicates": {"clustered": 0, "dropped": 0},
+    # Shards this node claimed, or found taken by other nodes (--shard)
+    "shards": {"claimed": 0, "skipped": 0},
     "category_stats": {},
-    "error_types": {"timeouts": 0, "invalid_feeds": 0, "db_errors": 0, "other": 0},
+    "error_types": {"timeouts": 0, "http_errors": 0, "invalid_feeds": 0, "db_errors": 0, "other": 0},
+    # Publishers fetched this run that are failing or slow, worst first
+    "worst_publishers": [],
     "start_time": None,
 }
+_INITIAL_STATS = copy.deepcopy(stats)
 
 
 async def init_db_pool():
@@ -89,6 +194,8 @@ async def init_db_pool():
         maxsize=20,
         autocommit=False,
         cursorclass=aiomysql.DictCursor,
+        # Replace idle connections before MySQL's wait_timeout drops them (--daemon)
+        pool_recycle=3600,
     )
     return db_pool
 
@@ -106,48 +213,108 @@ async def get_db_connection():
             raise
 
 
-async def prune_old_stories(days: int = 7) -> dict:
+async def prune_old_stories(days: int = 7, batch_size: int = PRUNE_BATCH_SIZE, pause: float = PRUNE_PAUSE) -> dict:
     """
-    Delete stories older than `days` and any associated tags.
+    Delete stories older than `days` and any associated tags. The stories are
+    subtracted from the story_daily_counts rollup, and their reactions and
+    bookmarks, which cascade, from engagement_daily_counts.
+
+    Works in batches of `batch_size` stories, picked by primary key from the
+    idx_stories_pub_date index, and commits after each batch, sleeping `pause`
+    seconds in between. No single statement holds row locks for long, so the
+    website's story queries keep running during a large prune.
     Returns counts of deleted rows.
     """
+    stories_deleted = tags_deleted = 0
+    cutoff = (datetime.utcnow() - timedelta(days=days)).strftime(
+        "%Y-%m-%d %H:%M:%S"
+    )
+
     try:
-        cutoff = (datetime.utcnow() - timedelta(days=days)).strftime(
-            "%Y-%m-%d %H:%M:%S"
-        )
+        while not shutdown_requested:
+            async with get_db_connection() as db_connection:
+                async with db_connection.cursor() as cursor:
+                    await cursor.execute(
+                        """
+                        SELECT id, pub_date, category_id FROM stories
+                        WHERE pub_date < %s
+                        ORDER BY pub_date
+                        LIMIT %s
+                        """,
+                        (cutoff, batch_size),
+                    )
+                    rows = await cursor.fetchall()
+                    story_ids = tuple(row["id"] for row in rows)
+                    if not story_ids:
+                        break
 
-        async with get_db_connection() as db_connection:
-            async with db_connection.cursor() as cursor:
-                # 1) Remove tags for stories older than cutoff
-                delete_tags_sql = """
-                    DELETE t
-                    FROM tags AS t
-                    JOIN stories AS s ON s.id = t.story_id
-                    WHERE s.pub_date < %s
-                """
-                await cursor.execute(delete_tags_sql, (cutoff,))
-                tags_deleted = cursor.rowcount
+                    placeholders = ",".join(["%s"] * len(story_ids))
 
-                # 2) Remove the old stories
-                delete_stories_sql = """
-                    DELETE FROM stories
-                    WHERE pub_date < %s
-                """
-                await cursor.execute(delete_stories_sql, (cutoff,))
-                stories_deleted = cursor.rowcount
+                    # 1) Take the reactions and bookmarks that cascade out of the engagement rollup
+                    await cursor.execute(
+                        rollup_util.STORY_ENGAGEMENT_SELECT.format(ids=placeholders), story_ids * 2
+                    )
+                    engagement = rollup_util.engagement_day_counts(
+                        ((row["day"], row["kind"], row["n"]) for row in await cursor.fetchall()), sign=-1
+                    )
+                    if engagement:
+                        await cursor.executemany(rollup_util.ENGAGEMENT_COUNTS_UPSERT, engagement)
+
+                    # 2) Remove the batch's tags
+                    await cursor.execute(
+                        f"DELETE FROM tags WHERE story_id IN ({placeholders})", story_ids
+                    )
+                    tags_deleted += cursor.rowcount
+
+                    # 3) Remove the stories; other dependents cascade
+                    await cursor.execute(
+                        f"DELETE FROM stories WHERE id IN ({placeholders})", story_ids
+                    )
+                    stories_deleted += cursor.rowcount
+
+                    # 4) Take them out of the story rollup
+                    await cursor.executemany(
+                        rollup_util.STORY_COUNTS_UPSERT,
+                        [
+                            (day, category_id, -count)
+                            for day, category_id, count in rollup_util.story_day_counts(
+                                (row["pub_date"], row["category_id"]) for row in rows
+                            )
+                        ],
+                    )
+
+                await db_connection.commit()
 
-            await db_connection.commit()
+            if len(story_ids) < batch_size:
+                break
+            await asyncio.sleep(pause)
 
         log_message(
             f"Pruned {stories_deleted} stories and {tags_deleted} tags older than {days} days.",
             level="success"
         )
-        return {"stories_deleted": stories_deleted, "tags_deleted": tags_deleted}
 
     except Exception as e:
         log_message(f"Error pruning old stories: {e}", level="error")
         stats["error_types"]["db_errors"] += 1
-        return {"stories_deleted": 0, "tags_deleted": 0}
+
+    # Pruned hashes must not stay "known", so rebuild the index from what's left
+    if url_hash_index is not None and stories_deleted:
+        try:
+            await rebuild_url_hash_index()
+        except Exception as e:
+            log_message(f"Error rebuilding url_hash index: {e}", level="error")
+
+    return {"stories_deleted": stories_deleted, "tags_deleted": tags_deleted}
+
+
+@lru_cache(maxsize=None)
+def get_yake_extractor(lang_code: str, top_n: int = 5) -> yake.KeywordExtractor:
+    """
+    YAKE extractor for a language, built once per process. Building one loads the
+    language's stopword list, so pool workers keep theirs across tasks.
+    """
+    return yake.KeywordExtractor(lan=lang_code, n=2, top=top_n)
 
 
 def extract_yake_sync(text: str, lang_code: str = "en", top_n: int = 5) -> tuple:
@@ -155,12 +322,35 @@ def extract_yake_sync(text: str, lang_code: str = "en", top_n: int = 5) -> tuple
     Extract keywords using YAKE (synchronous, for use in process pool).
     """
     try:
-        kw_extractor = yake.KeywordExtractor(lan=lang_code, n=2, top=top_n)
+        kw_extractor = get_yake_extractor(lang_code, top_n)
         return tuple(kw for kw, score in kw_extractor.extract_keywords(text))
     except Exception:
         return tuple()
 
 
+async def extract_keywords_batch(texts_with_langs: list, context: list = ()) -> list:
+    """
+    Extract keywords with the engine selected by --keyword-engine.
+    texts_with_langs: list of (text, lang_code) tuples
+    context: recent (text, lang_code) tuples of the same category, which only
+        count towards TF-IDF document frequencies (ignored by YAKE)
+    Returns: list of keyword tuples
+    """
+    if KEYWORD_ENGINE == "tfidf":
+        if not texts_with_langs:
+            return []
+        try:
+            extract = partial(keyword_util.extract_keywords_batch, context=list(context))
+            return await map_in_process_pool(extract, texts_with_langs, TFIDF_CHUNK_SIZE)
+        except BrokenProcessPool:
+            raise
+        except Exception as e:
+            log_message(f"TF-IDF keyword extraction error: {e}")
+            return [tuple() for _ in texts_with_langs]
+
+    return await extract_yake_batch(texts_with_langs)
+
+
 async def extract_yake_batch(texts_with_langs: list) -> list:
     """
     Extract keywords for multiple texts using process pool for CPU-bound work.
@@ -170,31 +360,42 @@ async def extract_yake_batch(texts_with_langs: list) -> list:
     if not texts_with_langs:
         return []
 
-    loop = asyncio.get_event_loop()
-
     # Run CPU-bound YAKE extraction in process pool
     try:
-        results = await loop.run_in_executor(
-            process_pool,
-            _extract_yake_batch_sync,
-            texts_with_langs
-        )
-        return results
+        return await map_in_process_pool(_extract_yake_batch_sync, texts_with_langs, YAKE_CHUNK_SIZE)
+    except BrokenProcessPool:
+        raise
     except Exception as e:
         log_message(f"YAKE batch extraction error: {e}")
         return [tuple() for _ in texts_with_langs]
 
 
+async def map_in_process_pool(batch_func, items: list, chunk_size: int) -> list:
+    """
+    Run `batch_func` over `items` in the process pool, `chunk_size` items per task,
+    so a large batch spreads across the pool workers. `batch_func` takes a list and
+    returns one result per item; results come back in the original order.
+
+    Raises BrokenProcessPool once a pool worker has died. Callers let it through
+    instead of falling back or blaming the publisher: the feed or stories are
+    dropped without saving their fetch state, so the next cycle, on a new pool
+    (see run_daemon), picks them up again.
+    """
+    loop = asyncio.get_event_loop()
+    chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+    chunk_results = await asyncio.gather(*[
+        loop.run_in_executor(process_pool, batch_func, chunk)
+        for chunk in chunks
+    ])
+    return [result for chunk in chunk_results for result in chunk]
+
+
 def _extract_yake_batch_sync(texts_with_langs: list) -> list:
     """Synchronous batch extraction for process pool."""
     results = []
-    # Cache extractors by language within this batch
-    extractors = {}
     for text, lang_code in texts_with_langs:
         try:
-            if lang_code not in extractors:
-                extractors[lang_code] = yake.KeywordExtractor(lan=lang_code, n=2, top=5)
-            kw_extractor = extractors[lang_code]
+            kw_extractor = get_yake_extractor(lang_code)
             keywords = tuple(kw for kw, score in kw_extractor.extract_keywords(text))
             results.append(keywords)
         except Exception:
@@ -202,6 +403,22 @@ def _extract_yake_batch_sync(texts_with_langs: list) -> list:
     return results
 
 
+def _warm_up_worker(lang_code: str) -> int:
+    """Build a YAKE extractor in a pool worker, so the first real task doesn't pay for it."""
+    get_yake_extractor(lang_code)
+    return os.getpid()
+
+
+async def warm_process_pool(workers: int):
+    """Start every process pool worker up front instead of on the first batch."""
+    loop = asyncio.get_event_loop()
+    pids = await asyncio.gather(*[
+        loop.run_in_executor(process_pool, _warm_up_worker, "en")
+        for _ in range(workers)
+    ])
+    log_message(f"Process pool warmed up ({len(set(pids))} workers)", level="success")
+
+
 def log_message(message, level="info", style=None):
     """
     Log message with rich console colors.
@@ -219,6 +436,25 @@ def log_message(message, level="info", style=None):
     logging.info(message)
 
 
+async def rebuild_url_hash_index():
+    """
+    Rebuild the on-disk url_hash index from the stories table.
+    Streams rows with a server-side cursor so the table never sits in memory twice.
+    """
+    url_hashes = []
+    async with get_db_connection() as db_connection:
+        async with db_connection.cursor(aiomysql.SSCursor) as cursor:
+            await cursor.execute("SELECT url_hash FROM stories")
+            while True:
+                rows = await cursor.fetchmany(10000)
+                if not rows:
+                    break
+                url_hashes.extend(row[0] for row in rows)
+
+    url_hash_index.rebuild(url_hashes)
+    log_message(f"Rebuilt url_hash index with {len(url_hash_index)} stories", level="success")
+
+
 async def get_existing_url_hashes(url_hashes: list) -> set:
     """
     Query existing URL hashes to avoid processing duplicates.
@@ -244,10 +480,16 @@ async def get_existing_url_hashes(url_hashes: list) -> set:
             return {row["url_hash"] for row in rows}
 
 
-async def insert_stories_to_database(stories, category_name, category_id):
+async def insert_stories_to_database(stories):
     """
-    Bulk-inserts stories and tags for a given category.
-    Uses async database connection from pool.
+    Bulk-inserts stories, their tags and empty story_stats rows in one transaction.
+    Stories may belong to different categories.
+
+    Story IDs never travel back to the client: the batch's url_hashes and tags go
+    into a per-connection staging table, and tags and story_stats are filled with
+    set-based INSERT ... SELECT joins against stories.url_hash. The stories
+    actually inserted are added to the story_daily_counts rollup in the same
+    transaction.
     Returns the number of exceptions encountered (should be zero).
     """
     if not stories:
@@ -259,15 +501,45 @@ async def insert_stories_to_database(stories, category_name, category_id):
     async with get_db_connection() as db_connection:
         async with db_connection.cursor() as cursor:
             try:
-                # 1) Bulk-insert all stories in batches
+                # Temporary tables are private to the connection and don't commit
+                # implicitly. MEMORY rows survive a rollback, hence the DELETE.
+                await cursor.execute(
+                    """
+                    CREATE TEMPORARY TABLE IF NOT EXISTS story_batch (
+                        url_hash BINARY(16) NOT NULL,
+                        tag VARCHAR(30) NULL
+                    ) ENGINE=MEMORY
+                    """
+                )
+                await cursor.execute("DELETE FROM story_batch")
+
+                # 1) Stage the batch: one row per story (tag NULL) plus one per tag
+                batch_values = []
+                for s in stories:
+                    batch_values.append((s["story_url_hash"], None))
+                    # tags.tag is VARCHAR(30)
+                    for tag in dict.fromkeys(tag.strip()[:30].strip() for tag in s["story_tags"]):
+                        if tag:
+                            batch_values.append((s["story_url_hash"], tag))
+
+                for i in range(0, len(batch_values), BATCH_SIZE):
+                    batch = batch_values[i:i + BATCH_SIZE]
+                    await cursor.executemany(
+                        "INSERT INTO story_batch (url_hash, tag) VALUES (%s, %s)", batch
+                    )
+
+                # 2) Bulk-insert all stories, one rollup row (day, category) at a time.
+                # INSERT IGNORE only counts the rows it inserted, so stories already
+                # stored, including ones another node inserts concurrently, aren't counted.
                 story_sql = """
                   INSERT IGNORE INTO stories
-                    (title, lang, author, description, url, url_hash, pub_date, category_id, publisher_id)
-                  VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+                    (title, lang, author, description, url, url_hash, pub_date,
+                     feed_image_url, minhash, cluster_id, category_id, publisher_id)
+                  VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
                 """
 
-                story_values = [
-                    (
+                story_groups = rollup_util.group_by_day(
+                    (s["story_pubdate"], s["category_id"], (
                         s["story_title"],
                         s["story_lang"],
                         s["story_author"],
@@ -275,54 +547,55 @@ async def insert_stories_to_database(stories, category_name, category_id):
                         s["story_url"],
                         s["story_url_hash"],
                         s["story_pubdate"],
-                        category_id,
+                        s.get("story_image_url"),
+                        s.get("story_minhash"),
+                        s.get("story_cluster_id"),
+                        s["category_id"],
                         s["publisher_id"],
-                    )
+                    ))
                     for s in stories
-                ]
-
-                # Insert in batches
-                for i in range(0, len(story_values), BATCH_SIZE):
-                    batch = story_values[i:i + BATCH_SIZE]
-                    await cursor.executemany(story_sql, batch)
-
-                # 2) Fetch IDs for all inserted stories
-                url_hashes = [s["story_url_hash"] for s in stories]
-                if len(url_hashes) == 1:
-                    url_hashes = (url_hashes[0], url_hashes[0])
-                else:
-                    url_hashes = tuple(url_hashes)
+                )
 
-                placeholders = ",".join(["%s"] * len(url_hashes))
+                inserted = 0
+                day_counts = []
+                for (day, category_id), story_values in story_groups.items():
+                    group_inserted = 0
+                    for i in range(0, len(story_values), BATCH_SIZE):
+                        batch = story_values[i:i + BATCH_SIZE]
+                        group_inserted += await cursor.executemany(story_sql, batch) or 0
+                    if group_inserted:
+                        day_counts.append((day, category_id, group_inserted))
+                    inserted += group_inserted
+
+                # 3) Tags and story_stats, resolved to story IDs on the server
                 await cursor.execute(
-                    f"SELECT id, url_hash FROM stories WHERE url_hash IN ({placeholders})",
-                    url_hashes,
+                    """
+                    INSERT IGNORE INTO tags (story_id, tag)
+                    SELECT stories.id, story_batch.tag
+                    FROM story_batch
+                    JOIN stories ON stories.url_hash = story_batch.url_hash
+                    WHERE story_batch.tag IS NOT NULL
+                    """
+                )
+                await cursor.execute(
+                    """
+                    INSERT IGNORE INTO story_stats (story_id)
+                    SELECT stories.id
+                    FROM story_batch
+                    JOIN stories ON stories.url_hash = story_batch.url_hash
+                    WHERE story_batch.tag IS NULL
+                    """
                 )
-                rows = await cursor.fetchall()
-                id_map = {row["url_hash"]: row["id"] for row in rows}
-
-                # 3) Bulk-insert all tags in batches
-                tag_sql = """
-                  INSERT IGNORE INTO tags (story_id, tag)
-                  VALUES (%s, %s)
-                """
-                tag_values = []
-                for s in stories:
-                    sid = id_map.get(s["story_url_hash"])
-                    if not sid:
-                        continue
-                    for tag in s["story_tags"]:
-                        tag = tag.strip()
-                        if tag:
-                            tag_values.append((sid, tag))
 
-                if tag_values:
-                    for i in range(0, len(tag_values), BATCH_SIZE):
-                        batch = tag_values[i:i + BATCH_SIZE]
-                        await cursor.executemany(tag_sql, batch)
+                # 4) Rollup for the dashboard and site statistics
+                if day_counts:
+                    await cursor.executemany(rollup_util.STORY_COUNTS_UPSERT, day_counts)
 
                 await db_connection.commit()
 
+                if inserted < len(stories):
+                    log_message(f"{len(stories) - inserted} stories were already stored", level="info")
+
             except Exception as e:
                 await db_connection.rollback()
                 log_message(f"Error bulk inserting stories/tags: {e}", level="error")
@@ -332,16 +605,88 @@ async def insert_stories_to_database(stories, category_name, category_id):
     return exceptions
 
 
+async def save_fetch_states(fetch_states: list):
+    """
+    Persist the HTTP validators (ETag/Last-Modified) and body hash of each fetched feed,
+    so the next run can send conditional requests and skip unchanged feeds.
+    """
+    if not fetch_states:
+        return
+
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    values = [
+        (
+            state["publisher_id"],
+            state["etag"],
+            state["last_modified"],
+            state["content_hash"],
+            now,
+            state.get("poll_interval"),
+            state["next_due_at"].strftime("%Y-%m-%d %H:%M:%S") if state.get("next_due_at") else None,
+            state.get("new_item_ratio"),
+        )
+        for state in fetch_states
+    ]
+
+    async with get_db_connection() as db_connection:
+        async with db_connection.cursor() as cursor:
+            try:
+                await cursor.executemany(
+                    """
+                    INSERT INTO publisher_fetch_state
+                      (publisher_id, etag, last_modified, content_hash, last_fetched_at,
+                       poll_interval, next_due_at, new_item_ratio)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+                    ON DUPLICATE KEY UPDATE
+                      etag = VALUES(etag),
+                      last_modified = VALUES(last_modified),
+                      content_hash = VALUES(content_hash),
+                      last_fetched_at = VALUES(last_fetched_at),
+                      poll_interval = VALUES(poll_interval),
+                      next_due_at = VALUES(next_due_at),
+                      new_item_ratio = VALUES(new_item_ratio)
+                    """,
+                    values,
+                )
+                await db_connection.commit()
+            except Exception as e:
+                await db_connection.rollback()
+                log_message(f"Error saving feed fetch state: {e}", level="error")
+                stats["error_types"]["db_errors"] += 1
+
+
 async def fetch_feed(session: aiohttp.ClientSession, publisher: dict, news_filter: str):
     """
     Fetch RSS feed asynchronously and return processed news items.
     Uses aiohttp for non-blocking I/O.
     """
+    download = await download_feed(session, publisher)
+    if not download or download.get("unchanged"):
+        return download
+
+    return await parse_feed(publisher, download, news_filter)
+
+
+async def download_feed(session: aiohttp.ClientSession, publisher: dict) -> dict:
+    """
+    Download a publisher's feed body.
+
+    Sends the publisher's stored ETag/Last-Modified as a conditional request. A 304
+    response, or a body identical to the last one we saw, skips parsing entirely and
+    returns {"unchanged": True, "items": []}. Otherwise returns {"content": bytes}
+    plus the new fetch state, or {} on failure.
+    """
     publisher_url = publisher.get("feed_url")
     if not input_sanitization.is_valid_url(publisher_url):
         log_message(f"Invalid url: {publisher_url}")
+        record_fetch_outcome(publisher, "invalid_url")
         return {}
 
+    started = asyncio.get_event_loop().time()
+
+    def elapsed():
+        return asyncio.get_event_loop().time() - started
+
     try:
         # Use separate timeouts like requests did - more generous for real-world feeds
         timeout = aiohttp.ClientTimeout(
@@ -353,314 +698,1012 @@ async def fetch_feed(session: aiohttp.ClientSession, publisher: dict, news_filte
             "User-Agent": choice(immutable.USER_AGENTS),
             "Referer": "www.google.com",
         }
+        if publisher.get("etag"):
+            headers["If-None-Match"] = publisher["etag"]
+        if publisher.get("last_modified"):
+            headers["If-Modified-Since"] = publisher["last_modified"]
+
+        fetch_state = None
         async with session.get(publisher_url, timeout=timeout, headers=headers) as response:
-            content = await response.read()
-            feed = feedparser.parse(content)
+            if response.status == 304:
+                record_fetch_outcome(publisher, latency=elapsed())
+                stats["feeds_unchanged"] += 1
+                fetch_state = {
+                    "publisher_id": publisher["id"],
+                    "etag": publisher.get("etag"),
+                    "last_modified": publisher.get("last_modified"),
+                    "content_hash": publisher.get("content_hash"),
+                }
+                return {"unchanged": True, "items": [], "fetch_state": fetch_state}
+
+            if not 200 <= response.status < 300:
+                record_fetch_outcome(publisher, f"http_{response.status}", elapsed())
+                stats["error_types"]["http_errors"] += 1
+                log_message(f"HTTP {response.status} fetching {publisher_url}", level="warning")
+                return {}
+
+            body = await read_feed_body(response)
+            if "error" in body:
+                record_fetch_outcome(publisher, body["error"], elapsed())
+                stats["error_types"]["invalid_feeds"] += 1
+                log_message(f"Not reading {publisher_url}: {body['error']}", level="warning")
+                return {}
+
+            content = body["content"]
+            if body["truncated"]:
+                stats["feeds_truncated"] += 1
+                log_message(f"Feed {publisher_url} is over {MAX_FEED_SIZE} bytes, keeping its first entries", level="warning")
+
+            fetch_state = {
+                "publisher_id": publisher["id"],
+                "etag": (response.headers.get("ETag") or "")[:255] or None,
+                "last_modified": (response.headers.get("Last-Modified") or "")[:64] or None,
+                "content_hash": hashing_util.bytes_to_md5_binary(content),
+            }
+            record_fetch_outcome(publisher, latency=elapsed())
+
+        # Fallback for servers that ignore conditional requests
+        if fetch_state["content_hash"] == publisher.get("content_hash"):
+            stats["feeds_unchanged"] += 1
+            return {"unchanged": True, "items": [], "fetch_state": fetch_state}
+
+        return {"content": content, "fetch_state": fetch_state}
 
     except (asyncio.TimeoutError, aiohttp.ServerTimeoutError):
+        record_fetch_outcome(publisher, "timeout", elapsed())
         stats["error_types"]["timeouts"] += 1
         log_message(f"Timeout fetching {publisher_url}", level="warning")
         return {}
     except aiohttp.ClientError as e:
+        record_fetch_outcome(publisher, "connection", elapsed())
         stats["error_types"]["other"] += 1
         log_message(f"Connection error fetching {publisher_url}: {e}", level="warning")
         return {}
     except Exception as e:
+        record_fetch_outcome(publisher, "exception", elapsed())
         stats["error_types"]["other"] += 1
         log_message(f"Exception fetching {publisher_url}: {e}", level="error")
         return {}
 
-    try:
-        data = {
-            "title": getattr(feed.feed, "title", "Unknown Publisher").strip(),
-            "link": getattr(feed.feed, "link", "Unknown Link").strip(),
-            "items": [],
-            "texts_for_yake": [],  # Collect texts for batch YAKE processing
-        }
 
-        # First pass: collect all story data without YAKE extraction
-        pending_stories = []
-        for story in feed.entries:
-            story_title = input_sanitization.sanitize_html(
-                input_sanitization.decode_html_entities(story.get("title"))
-            )
-            story_description = input_sanitization.sanitize_html(
-                input_sanitization.decode_html_entities(
-                    story.get("description") or story.get("summary")
-                )
-            )
+async def read_feed_body(response: aiohttp.ClientResponse, max_bytes: int = None) -> dict:
+    """
+    Stream a feed response body, reading at most `max_bytes` (default MAX_FEED_SIZE).
 
-            story_author = input_sanitization.sanitize_html(
-                input_sanitization.decode_html_entities(story.get("author"))
-            )
-            if story_author == "None":
-                story_author = None
+    The first feed_util.SNIFF_SIZE bytes decide whether the body can be a feed at
+    all; HTML pages, images and the like are dropped right there. A feed over the
+    limit is cut after its last complete entry (feed_util.truncate_feed). Returns
+    {"content": bytes, "truncated": bool}, or {"error": "not_a_feed" | "too_large"}.
+    """
+    max_bytes = max_bytes or MAX_FEED_SIZE
+    content_type = response.headers.get("Content-Type", "")
+    body = bytearray()
+    root = None
+
+    async for chunk in response.content.iter_chunked(READ_CHUNK_SIZE):
+        body += chunk
+        if root is None and len(body) >= feed_util.SNIFF_SIZE:
+            root = feed_util.sniff_feed(bytes(body[:feed_util.SNIFF_SIZE]), content_type)
+            if root is None:
+                return {"error": "not_a_feed"}
+        if len(body) > max_bytes:
+            break
+
+    if root is None:
+        root = feed_util.sniff_feed(bytes(body), content_type)
+        if root is None:
+            return {"error": "not_a_feed"}
+
+    if len(body) <= max_bytes:
+        return {"content": bytes(body), "truncated": False}
+
+    content = feed_util.truncate_feed(bytes(body[:max_bytes]), root)
+    if content is None:
+        return {"error": "too_large"}
+    return {"content": content, "truncated": True}
+
+
+def record_fetch_outcome(publisher: dict, error: str = None, latency: float = None):
+    """
+    Remember how this run's fetch of a publisher went (error=None means it worked).
+    A later stage may overwrite it, e.g. when a downloaded body turns out not to be
+    a feed. Folded into the publisher's health by update_publisher_health.
+    """
+    if latency is None:
+        latency = (publisher.get("fetch_outcome") or {}).get("latency")
+    publisher["fetch_outcome"] = {"error": error, "latency": latency}
 
-            if not story_title:
-                continue
 
-            story_title = input_sanitization.gentle_cut_text(250, story_title)
-            story_description = input_sanitization.gentle_cut_text(
-                500, story_description
+def update_publisher_health(publishers: list) -> list:
+    """
+    Update the health fields of every publisher fetched in this run: consecutive
+    failures, last success, latency moving average and the circuit breaker.
+    Failing publishers get an exponential backoff as their next due time. Returns
+    the updated publishers.
+    """
+    now = datetime.now()
+    updated = []
+    for publisher in publishers:
+        outcome = publisher.get("fetch_outcome")
+        if not outcome:
+            continue
+
+        if outcome["latency"] is not None:
+            publisher["latency_ewma"] = scheduler_util.update_latency_ewma(
+                publisher.get("latency_ewma"), outcome["latency"]
             )
 
-            story_categories = [tag.term for tag in story.get("tags", [])]
+        if outcome["error"] is None:
+            publisher["consecutive_failures"] = 0
+            publisher["last_success_at"] = now
+            publisher["last_error"] = None
+            publisher["circuit_open_until"] = None
+            publisher["backoff_until"] = None
+        else:
+            failures = (publisher.get("consecutive_failures") or 0) + 1
+            backoff_until = now + timedelta(seconds=scheduler_util.compute_failure_backoff(failures))
+            publisher["consecutive_failures"] = failures
+            publisher["last_error"] = outcome["error"][:32]
+            publisher["backoff_until"] = backoff_until
+            publisher["circuit_open_until"] = (
+                backoff_until if scheduler_util.is_circuit_open(failures) else None
+            )
 
-            story_url = story.get("link")
-            if not input_sanitization.is_valid_url(story_url) or len(story_url) > 512:
-                continue
+        updated.append(publisher)
+    return updated
 
-            pubdate = (
-                story.get("published_parsed")
-                or story.get("published")
-                or story.get("updated")
-            )
 
-            story_pubdate = format_date(pubdate).get(
-                "datetime", datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            )
+async def save_publisher_health(publishers: list):
+    """
+    Persist the health fields set by update_publisher_health. A failing
+    publisher's next_due_at is pushed back to the end of its backoff; successful
+    ones keep the next_due_at planned by plan_next_polls.
+    """
+    if not publishers:
+        return
+
+    def to_sql(value):
+        return value.strftime("%Y-%m-%d %H:%M:%S") if value else None
+
+    values = [
+        (
+            publisher["id"],
+            publisher["consecutive_failures"],
+            to_sql(publisher.get("last_success_at")),
+            publisher["last_error"],
+            publisher.get("latency_ewma"),
+            to_sql(publisher["circuit_open_until"]),
+            to_sql(publisher["backoff_until"]),
+        )
+        for publisher in publishers
+    ]
 
-            combined_text = f"{story_title} {story_description}"
-            story_lang = qol_util.detect_language(combined_text)
-
-            pending_stories.append({
-                "story_title": story_title,
-                "story_categories": story_categories,
-                "story_lang": story_lang,
-                "story_author": story_author,
-                "story_description": story_description,
-                "story_pubdate": story_pubdate,
-                "story_url_hash": hashing_util.string_to_md5_binary(story_url),
-                "story_url": story_url,
-                "publisher_id": publisher["id"],
-                "combined_text": combined_text,
-            })
+    async with get_db_connection() as db_connection:
+        async with db_connection.cursor() as cursor:
+            try:
+                await cursor.executemany(
+                    """
+                    INSERT INTO publisher_fetch_state
+                      (publisher_id, consecutive_failures, last_success_at, last_error,
+                       latency_ewma, circuit_open_until, next_due_at)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s)
+                    ON DUPLICATE KEY UPDATE
+                      consecutive_failures = VALUES(consecutive_failures),
+                      last_success_at = COALESCE(VALUES(last_success_at), last_success_at),
+                      last_error = VALUES(last_error),
+                      latency_ewma = VALUES(latency_ewma),
+                      circuit_open_until = VALUES(circuit_open_until),
+                      next_due_at = COALESCE(VALUES(next_due_at), next_due_at)
+                    """,
+                    values,
+                )
+                await db_connection.commit()
+            except Exception as e:
+                await db_connection.rollback()
+                log_message(f"Error saving publisher health: {e}", level="error")
+                stats["error_types"]["db_errors"] += 1
 
-        # Batch YAKE extraction for all stories
-        if pending_stories:
-            texts_with_langs = [
-                (s["combined_text"], s["story_lang"]) for s in pending_stories
-            ]
-            tags_list = await extract_yake_batch(texts_with_langs)
 
-            for story, tags in zip(pending_stories, tags_list):
-                story["story_tags"] = tags
-                del story["combined_text"]  # Remove temporary field
-                data["items"].append(story)
+async def parse_feed(publisher: dict, download: dict, news_filter: str) -> dict:
+    """
+    Parse a downloaded feed body into raw story records (see parse_feed_entries).
+
+    feedparser is pure-Python and slow on large feeds, so parsing runs in the process
+    pool; the event loop keeps serving other downloads meanwhile. Returns {} when the
+    body can't be parsed.
+    """
+    loop = asyncio.get_event_loop()
+    try:
+        data = await loop.run_in_executor(
+            process_pool,
+            _parse_feed_sync,
+            download["content"],
+            {"id": publisher["id"], "category_id": publisher["category_id"]},
+        )
+        data["fetch_state"] = download["fetch_state"]
 
         if data["items"]:
             log_message(f"Successfully processed feed for {publisher['name']} ({len(data['items'])} items)", level="success")
         else:
+            record_fetch_outcome(publisher, "invalid_feed")
             stats["error_types"]["invalid_feeds"] += 1
             log_message(f"No valid items in feed for {publisher['name']}", level="warning")
 
         return data
 
+    except BrokenProcessPool:
+        # Not the feed's fault, see map_in_process_pool
+        raise
     except Exception as err:
+        record_fetch_outcome(publisher, "parse_error")
         stats["error_types"]["other"] += 1
-        log_message(f"Exception processing {publisher_url} ({news_filter}): {err}", level="error")
+        log_message(f"Exception processing {publisher.get('feed_url')} ({news_filter}): {err}", level="error")
         return {}
 
 
-def format_date(date) -> dict:
+def _parse_feed_sync(content: bytes, publisher: dict) -> dict:
     """
-    Converts a date object or ISO formatted date string into MySQL DATETIME format.
+    Synchronous feed parsing for the process pool. Only plain records go back to the
+    parent, never feedparser objects, to keep pickling cheap.
     """
-    if isinstance(date, str):
-        try:
-            date = datetime.fromisoformat(date).timetuple()
-        except ValueError:
-            return {"error": "Invalid date format"}
+    feed = feedparser.parse(content)
+    return {
+        "title": getattr(feed.feed, "title", "Unknown Publisher").strip(),
+        "link": getattr(feed.feed, "link", "Unknown Link").strip(),
+        "items": parse_feed_entries(feed, publisher),
+        "publish_interval": scheduler_util.estimate_publish_interval(
+            datetime(*parsed[:6])
+            for parsed in (
+                story.get("published_parsed") or story.get("updated_parsed")
+                for story in feed.entries
+            )
+            if parsed
+        ),
+    }
 
-    if isinstance(date, tuple):
-        date = datetime(*date[:6])
 
-    if not isinstance(date, datetime):
-        return {"error": "Invalid date format"}
+def parse_feed_entries(feed, publisher: dict) -> list:
+    """
+    Stage 1 (parse): turn feed entries into raw story records.
 
-    return {"datetime": date.strftime("%Y-%m-%d %H:%M:%S")}
+    Only the cheap work happens here: URL canonicalization and validation, url_hash
+    (of url_util.url_key, so tracking parameters and such don't make a link look
+    new), pub date and the image the feed carries for the story, if any. Text
+    fields are kept raw so sanitization, language detection and YAKE can be skipped
+    for stories that already exist (see enrich_stories).
+    """
+    entries = []
+    for story in feed.entries:
+        if not story.get("title"):
+            continue
+
+        story_url = url_util.canonicalize_url(story.get("link") or "")
+        if not input_sanitization.is_valid_url(story_url) or len(story_url) > 512:
+            continue
+
+        pubdate = (
+            story.get("published_parsed")
+            or story.get("published")
+            or story.get("updated")
+        )
+
+        story_pubdate = format_date(pubdate).get(
+            "datetime", datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        )
+
+        entries.append({
+            "raw_title": story.get("title"),
+            "raw_description": story.get("description") or story.get("summary"),
+            "raw_author": story.get("author"),
+            "story_categories": [tag.term for tag in story.get("tags", [])],
+            "story_pubdate": story_pubdate,
+            "story_url_hash": hashing_util.string_to_md5_binary(url_util.url_key(story_url)),
+            "story_url": story_url,
+            "story_image_url": feed_util.feed_image_url(story, story_url),
+            "publisher_id": publisher["id"],
+            "category_id": publisher["category_id"],
+        })
 
+    return entries
 
-async def find_rss_feed(base_url, candidates=None, timeout=5):
+
+async def filter_new_stories(entries: list) -> list:
     """
-    Attempts to discover a valid RSS/Atom feed for the given base URL.
-    Uses async aiohttp for non-blocking I/O.
+    Stage 2 (dedup): drop entries repeated within this batch and entries whose
+    url_hash is already stored.
+
+    Hashes found in the local url_hash index are known without asking MySQL; only
+    the rest are confirmed with get_existing_url_hashes.
     """
-    discovered = []
-    client_timeout = aiohttp.ClientTimeout(total=timeout)
+    unique_entries = {}
+    for entry in entries:
+        unique_entries.setdefault(entry["story_url_hash"], entry)
+
+    if url_hash_index is not None:
+        existing_hashes, unknown_hashes = url_hash_index.partition(unique_entries)
+        found_hashes = await get_existing_url_hashes(unknown_hashes)
+        # Stories stored by someone else since the last rebuild
+        url_hash_index.add(found_hashes)
+        existing_hashes |= found_hashes
+    else:
+        existing_hashes = await get_existing_url_hashes(list(unique_entries))
 
-    async with aiohttp.ClientSession(timeout=client_timeout) as session:
-        try:
-            async with session.get(base_url) as resp:
-                if resp.status == 200:
-                    text = await resp.text()
-                    soup = BeautifulSoup(text, "html.parser")
-                    for link in soup.find_all(
-                        "link", rel=lambda x: x and "alternate" in x.lower()
-                    ):
-                        t = link.get("type", "").lower()
-                        if "rss" in t or "atom" in t or "xml" in t:
-                            href = link.get("href")
-                            if href:
-                                full = urljoin(base_url, href)
-                                discovered.append(full)
-        except aiohttp.ClientError:
-            pass
-
-        if candidates is None:
-            candidates = [
-                "rss",
-                "index.xml",
-                "feed/index.php",
-                "feed.xml",
-                "feed.atom",
-                "feed.rss",
-                "feed.json",
-                "feed.php",
-                "feed.asp",
-                "posts.rss",
-                "blog.xml",
-                "atom.xml",
-                "podcasts.xml",
-                "main.atom",
-                "main.xml",
-            ]
+    return [
+        entry for url_hash, entry in unique_entries.items()
+        if url_hash not in existing_hashes
+    ]
 
-        endpoints = discovered + candidates
 
-        for endpoint in endpoints:
-            feed_url = (
-                endpoint
-                if (endpoint.startswith("http") or endpoint.startswith("https"))
-                else urljoin(base_url, endpoint)
-            )
-            try:
-                async with session.get(feed_url) as resp:
-                    ct = resp.headers.get("Content-Type", "")
-                    if resp.status == 200 and "xml" in ct:
-                        content = await resp.read()
-                        parsed = feedparser.parse(content)
-                        if parsed.bozo == 0 and parsed.entries:
-                            return feed_url
-            except aiohttp.ClientError:
-                continue
+def sanitize_story(entry: dict):
+    """
+    Sanitize and trim the raw text fields of a story record in place.
+    Returns None when nothing usable is left of the title.
+    """
+    story_title = input_sanitization.sanitize_html(
+        input_sanitization.decode_html_entities(entry.pop("raw_title"))
+    )
+    story_description = input_sanitization.sanitize_html(
+        input_sanitization.decode_html_entities(entry.pop("raw_description"))
+    )
 
-    return None
+    story_author = input_sanitization.sanitize_html(
+        input_sanitization.decode_html_entities(entry.pop("raw_author"))
+    )
+    if story_author == "None":
+        story_author = None
 
+    if not story_title:
+        return None
 
-async def fetch_categories_from_database():
-    """Fetch all categories from database."""
-    log_message("Fetching categories from the database", level="info")
+    entry["story_title"] = input_sanitization.gentle_cut_text(250, story_title)
+    entry["story_description"] = input_sanitization.gentle_cut_text(
+        500, story_description
+    )
+    entry["story_author"] = story_author
+    entry["story_minhash"] = minhash_util.signature(
+        f"{entry['story_title']} {entry['story_description']}"
+    )
+    return entry
 
-    async with get_db_connection() as db_connection:
-        try:
-            async with db_connection.cursor() as cursor:
-                await cursor.execute("SELECT * FROM categories")
-                categories = await cursor.fetchall()
-        except Exception as e:
-            log_message(f"Error fetching categories: {e}", level="error")
-            stats["error_types"]["db_errors"] += 1
-            return []
 
-    # e.g. [(15, 'cl_general'), (194, 'as_general'), ...]
-    category_list = [(row["id"], row["name"]) for row in categories]
-    shuffle(category_list)
+async def sanitize_stories(entries: list) -> list:
+    """
+    Run sanitize_story over a batch of story records in the process pool.
+    Returns one record (or None) per entry, in order.
+    """
+    try:
+        return await map_in_process_pool(_sanitize_stories_sync, entries, SANITIZE_CHUNK_SIZE)
+    except BrokenProcessPool:
+        raise
+    except Exception as e:
+        log_message(f"Sanitization pool error, sanitizing inline: {e}", level="warning")
+        return _sanitize_stories_sync(entries)
 
-    log_message(f"Got {len(category_list)} categories from the database", level="success")
-    return category_list
 
+def _sanitize_stories_sync(entries: list) -> list:
+    """Synchronous batch sanitization for process pool."""
+    return [sanitize_story(entry) for entry in entries]
 
-async def fetch_publishers_from_database(category_id: int):
-    """Fetch publishers for a specific category."""
 
-    async with get_db_connection() as db_connection:
-        try:
+async def load_language_resolver():
+    """Build the language resolver from the languages of stored stories."""
+    global language_resolver
+
+    rows = []
+    try:
+        async with get_db_connection() as db_connection:
             async with db_connection.cursor() as cursor:
                 await cursor.execute(
-                    "SELECT * FROM publishers WHERE category_id = %s",
-                    (category_id,),
+                    """
+                    SELECT publisher_id, lang, COUNT(*) AS story_count
+                    FROM stories
+                    GROUP BY publisher_id, lang
+                    """
                 )
-                publishers = await cursor.fetchall()
-        except Exception as e:
-            log_message(f"Error fetching publishers: {e}", level="error")
-            stats["error_types"]["db_errors"] += 1
-            return []
+                rows = await cursor.fetchall()
+    except Exception as e:
+        # Without priors every story is detected, which is slower but correct
+        log_message(f"Error fetching publisher languages: {e}", level="error")
+        stats["error_types"]["db_errors"] += 1
 
-    return publishers
+    language_resolver = language_util.LanguageResolver.from_history(
+        (row["publisher_id"], row["lang"], row["story_count"]) for row in rows
+    )
+    # Share the counters so the summary shows how languages were resolved
+    language_resolver.stats = stats["languages"]
 
 
-async def process_category(session: aiohttp.ClientSession, category_id, category_name, category_index, total_categories, args=None):
-    """
-    Process a single category: fetch feeds from all publishers and save articles.
-    Returns the number of articles saved.
-    """
-    if config.SEARCH_NEWS_DEBUG:
-        if category_name != "br_general":
-            return 0
+async def load_cluster_index():
+    """Build the near-duplicate index from the signatures of recent stories."""
+    global cluster_index
 
-    if shutdown_requested:
-        return 0
+    cluster_index = minhash_util.MinHashIndex()
+    cutoff = (datetime.now() - timedelta(days=CLUSTER_WINDOW_DAYS)).strftime("%Y-%m-%d %H:%M:%S")
+    try:
+        async with get_db_connection() as db_connection:
+            async with db_connection.cursor() as cursor:
+                await cursor.execute(
+                    """
+                    SELECT minhash, cluster_id, publisher_id
+                    FROM stories
+                    WHERE pub_date >= %s AND minhash IS NOT NULL AND cluster_id IS NOT NULL
+                    """,
+                    (cutoff,),
+                )
+                for row in await cursor.fetchall():
+                    cluster_index.add(row["minhash"], row["cluster_id"], row["publisher_id"])
+    except Exception as e:
+        # Stories of this run still cluster among themselves
+        log_message(f"Error loading story signatures: {e}", level="error")
+        stats["error_types"]["db_errors"] += 1
+        return
 
-    # Progress tracking
-    percentage = (category_index / total_categories) * 100
-    if not args or not args.quiet:
-        log_message(f"[{round(percentage, 2)}%] Handling {category_name}...", level="info")
+    log_message(f"Loaded {len(cluster_index)} recent story signatures", level="success")
 
-    publishers = await fetch_publishers_from_database(category_id)
-    if not publishers:
-        if not args or not args.quiet:
-            log_message(f"No publishers for {category_name}", level="warning")
-        return 0
 
-    # Fetch all feeds concurrently using asyncio.gather with semaphore
-    semaphore = asyncio.Semaphore(MAX_WORKERS)
+def assign_clusters(stories: list) -> list:
+    """
+    Give each story the cluster of its closest recent near-duplicate, or start a
+    new cluster named after its own url_hash. A story whose text is all but
+    identical to a recent one by the same publisher (the same story republished
+    under another URL) is dropped. Returns the stories to keep.
+
+    Signatures only join the index once their stories are stored, see
+    remember_clusters.
+    """
+    global cluster_index
+    if cluster_index is None:
+        cluster_index = minhash_util.MinHashIndex()
+
+    signed = [story for story in stories if story.get("story_minhash") is not None]
+    assigned = minhash_util.assign_clusters(cluster_index, [
+        (story["story_minhash"], story["publisher_id"], int.from_bytes(story["story_url_hash"][:8], "big"))
+        for story in signed
+    ])
+    dropped = set()
+    for story, cluster in zip(signed, assigned):
+        if cluster is None:
+            stats["near_duplicates"]["dropped"] += 1
+            dropped.add(id(story))
+            continue
+        story["story_cluster_id"], matched = cluster
+        if matched:
+            stats["near_duplicates"]["clustered"] += 1
+
+    kept = []
+    for story in stories:
+        if id(story) in dropped:
+            continue
+        story.setdefault("story_cluster_id", None)
+        kept.append(story)
+    return kept
+
+
+def remember_clusters(stories: list):
+    """File the signatures of stored stories, so later stories cluster with them."""
+    if cluster_index is None:
+        return
+    for story in stories:
+        if story.get("story_minhash") is not None and story.get("story_cluster_id") is not None:
+            cluster_index.add(story["story_minhash"], story["story_cluster_id"], story["publisher_id"])
+
+
+async def resolve_languages(stories: list):
+    """
+    Set story_lang on each story. Publishers with a confident language prior and
+    texts already seen skip detection; the remaining distinct texts are detected
+    in batches in the process pool.
+    """
+    global language_resolver
+    if language_resolver is None:
+        language_resolver = language_util.LanguageResolver()
+        language_resolver.stats = stats["languages"]
+
+    pending = defaultdict(list)
+    for story in stories:
+        lang = language_resolver.resolve(story["publisher_id"], story["combined_text"])
+        if lang:
+            story["story_lang"] = lang
+        else:
+            pending[story["combined_text"]].append(story)
+
+    if not pending:
+        return
+
+    texts = list(pending)
+    try:
+        langs = await map_in_process_pool(language_util.detect_languages, texts, LANG_CHUNK_SIZE)
+    except BrokenProcessPool:
+        raise
+    except Exception as e:
+        log_message(f"Language detection pool error, detecting inline: {e}", level="warning")
+        langs = language_util.detect_languages(texts)
+
+    for text, lang in zip(texts, langs):
+        first, *rest = pending[text]
+        language_resolver.remember(first["publisher_id"], text, lang)
+        for story in pending[text]:
+            story["story_lang"] = lang
+        for story in rest:
+            language_resolver.observe(story["publisher_id"], lang)
+
+
+async def tag_stories(stories: list):
+    """
+    Set story_tags (see --keyword-engine). TF-IDF runs once per category, with
+    that category's recently tagged stories as context, so the IDF values hold
+    even for the few new stories a feed or a write batch brings.
+    """
+    if KEYWORD_ENGINE == "tfidf":
+        by_category = defaultdict(list)
+        for story in stories:
+            by_category[story["category_id"]].append(story)
+        groups = list(by_category.items())
+    else:
+        groups = [(None, stories)]
+
+    for category_id, group in groups:
+        texts_with_langs = [(s["combined_text"], s["story_lang"]) for s in group]
+        context = keyword_context[category_id] if category_id is not None else ()
+        tags_list = await extract_keywords_batch(texts_with_langs, context)
+
+        for story, tags in zip(group, tags_list):
+            story["story_tags"] = tags
+            del story["combined_text"]  # Remove temporary field
+        if category_id is not None:
+            context.extend(texts_with_langs)
+
+
+async def enrich_stories(entries: list, tag: bool = True) -> list:
+    """
+    Stage 3 (enrich): sanitization, near-duplicate clustering, language detection
+    and, unless `tag` is False, keyword tags (see tag_stories). Only ever called
+    with stories that passed the dedup stage.
+    """
+    stories = []
+    for story in await sanitize_stories(entries):
+        if not story:
+            continue
+
+        story["combined_text"] = f"{story['story_title']} {story['story_description']}"
+        stories.append(story)
+
+    # Before the expensive steps, so dropped near-duplicates skip them
+    stories = assign_clusters(stories)
+
+    if stories:
+        await resolve_languages(stories)
+        if tag:
+            await tag_stories(stories)
+
+    return stories
+
+
+def format_date(date) -> dict:
+    """
+    Converts a date object or ISO formatted date string into MySQL DATETIME format.
+    """
+    if isinstance(date, str):
+        try:
+            date = datetime.fromisoformat(date).timetuple()
+        except ValueError:
+            return {"error": "Invalid date format"}
+
+    if isinstance(date, tuple):
+        date = datetime(*date[:6])
+
+    if not isinstance(date, datetime):
+        return {"error": "Invalid date format"}
+
+    return {"datetime": date.strftime("%Y-%m-%d %H:%M:%S")}
+
+
+def _discovery_domain(url: str) -> str:
+    host = (urlsplit(url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def _discovery_timeout(timeout: int) -> aiohttp.ClientTimeout:
+    # Socket timeouts only: waiting for a slot under limit_per_host isn't the server's fault
+    return aiohttp.ClientTimeout(total=None, sock_connect=timeout, sock_read=timeout)
+
+
+def _is_valid_feed(content: bytes) -> bool:
+    """Whether a body parses cleanly into at least one entry (runs in the process pool)."""
+    parsed = feedparser.parse(content)
+    return parsed.bozo == 0 and bool(parsed.entries)
+
+
+async def _probe_feed(session: aiohttp.ClientSession, feed_url: str, timeout: int):
+    """feed_url if it serves a valid feed, else None."""
+    try:
+        async with session.get(feed_url, timeout=_discovery_timeout(timeout)) as resp:
+            if resp.status != 200:
+                return None
+            body = await read_feed_body(resp)
+    except (aiohttp.ClientError, asyncio.TimeoutError):
+        return None
+
+    if "content" not in body:
+        return None
+    loop = asyncio.get_event_loop()
+    return feed_url if await loop.run_in_executor(process_pool, _is_valid_feed, body["content"]) else None
+
+
+async def _first_valid_feed(session: aiohttp.ClientSession, feed_urls: list, timeout: int):
+    """Probe feed_urls concurrently. The first valid feed wins and cancels the other probes."""
+    tasks = [asyncio.ensure_future(_probe_feed(session, feed_url, timeout)) for feed_url in feed_urls]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            feed_url = await next_done
+            if feed_url:
+                return feed_url
+        return None
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def _advertised_feeds(session: aiohttp.ClientSession, base_url: str, timeout: int) -> list:
+    """Feed URLs a homepage links to with <link rel="alternate">."""
+    try:
+        async with session.get(base_url, timeout=_discovery_timeout(timeout)) as resp:
+            if resp.status != 200:
+                return []
+            # Feed links live in <head>, the start of the page is enough
+            page = await resp.content.read(MAX_PAGE_SIZE)
+    except (aiohttp.ClientError, asyncio.TimeoutError):
+        return []
+
+    discovered = []
+    soup = BeautifulSoup(page, "html.parser")
+    for link in soup.find_all("link", rel=lambda x: x and "alternate" in x.lower()):
+        t = link.get("type", "").lower()
+        if "rss" in t or "atom" in t or "xml" in t:
+            href = link.get("href")
+            if href:
+                discovered.append(urljoin(base_url, href))
+    return list(dict.fromkeys(discovered))
+
+
+async def find_rss_feed(base_url, candidates=None, timeout=5, session=None, misses=None):
+    """
+    Attempts to discover a valid RSS/Atom feed for the given base URL.
+
+    Feeds the homepage advertises are probed first, then the usual endpoints
+    (`candidates`, default FEED_CANDIDATES). Each group is probed concurrently, and
+    the first valid feed cancels the remaining probes. A shared `session` (see
+    discover_feeds) should come with a connector whose limit_per_host keeps the
+    probes from flooding one server; without one, a session is created here.
+
+    `misses` maps domains to the time their last discovery found nothing. Such
+    domains are skipped for DISCOVERY_MISS_TTL seconds, and the outcome of this
+    discovery is recorded in it.
+    """
+    domain = _discovery_domain(base_url)
+    if misses is not None and misses.get(domain, 0) > time.time() - DISCOVERY_MISS_TTL:
+        return None
+
+    if session is None:
+        connector = aiohttp.TCPConnector(limit_per_host=DISCOVERY_PER_HOST)
+        headers = {"User-Agent": choice(immutable.USER_AGENTS)}
+        async with aiohttp.ClientSession(connector=connector, headers=headers) as session:
+            return await find_rss_feed(base_url, candidates, timeout, session, misses)
+
+    advertised = await _advertised_feeds(session, base_url, timeout)
+    feed_url = await _first_valid_feed(session, advertised, timeout)
+    if not feed_url:
+        guessed = dict.fromkeys(urljoin(base_url, endpoint) for endpoint in (candidates or FEED_CANDIDATES))
+        feed_url = await _first_valid_feed(session, [url for url in guessed if url not in advertised], timeout)
+
+    if misses is not None:
+        if feed_url:
+            misses.pop(domain, None)
+        else:
+            misses[domain] = time.time()
+    return feed_url
+
+
+def load_discovery_misses() -> dict:
+    """Domains without a feed from earlier discover_feeds batches, still within DISCOVERY_MISS_TTL."""
+    if not os.path.exists(f"{DISCOVERY_MISSES_PATH}.json"):
+        return {}
+    cutoff = time.time() - DISCOVERY_MISS_TTL
+    return {
+        domain: missed_at
+        for domain, missed_at in json_util.read_json(DISCOVERY_MISSES_PATH).items()
+        if missed_at > cutoff
+    }
+
+
+def save_discovery_misses(misses: dict):
+    os.makedirs(cache_dir, exist_ok=True)
+    cutoff = time.time() - DISCOVERY_MISS_TTL
+    json_util.write_json({domain: missed_at for domain, missed_at in misses.items() if missed_at > cutoff}, DISCOVERY_MISSES_PATH)
+
+
+async def discover_feeds(site_urls, workers: int = 50, timeout: int = 5) -> dict:
+    """
+    Find the feeds of many sites at once, e.g. publishers without a feed_url
+    (utils/extra/update-rss.py).
+
+    All probes share one connector, so one connection pool and DNS cache, with
+    at most DISCOVERY_PER_HOST connections per host. `workers` sites are searched
+    at a time. Domains that had no feed in a recent batch are skipped, and this
+    batch's misses are saved for the next one. Returns {site_url: feed_url or None}.
+    """
+    misses = load_discovery_misses()
+    semaphore = asyncio.Semaphore(workers)
+    connector = aiohttp.TCPConnector(
+        limit=workers * DISCOVERY_PER_HOST,
+        limit_per_host=DISCOVERY_PER_HOST,
+        ttl_dns_cache=300,
+    )
+    headers = {"User-Agent": choice(immutable.USER_AGENTS)}
+
+    async with aiohttp.ClientSession(connector=connector, headers=headers) as session:
+        async def discover(site_url):
+            async with semaphore:
+                return site_url, await find_rss_feed(site_url, timeout=timeout, session=session, misses=misses)
+
+        results = dict(await asyncio.gather(*(discover(site_url) for site_url in dict.fromkeys(site_urls))))
+
+    save_discovery_misses(misses)
+    return results
+
+
+async def fetch_categories_from_database():
+    """Fetch all categories from database."""
+    log_message("Fetching categories from the database", level="info")
+
+    async with get_db_connection() as db_connection:
+        try:
+            async with db_connection.cursor() as cursor:
+                await cursor.execute("SELECT * FROM categories")
+                categories = await cursor.fetchall()
+        except Exception as e:
+            log_message(f"Error fetching categories: {e}", level="error")
+            stats["error_types"]["db_errors"] += 1
+            return []
+
+    # e.g. [(15, 'cl_general'), (194, 'as_general'), ...]
+    category_list = [(row["id"], row["name"]) for row in categories]
+    shuffle(category_list)
+
+    log_message(f"Got {len(category_list)} categories from the database", level="success")
+    return category_list
+
+
+# Publishers with their fetch state and health
+PUBLISHER_STATE_SELECT = """
+    SELECT p.*, fs.etag, fs.last_modified, fs.content_hash,
+           fs.poll_interval, fs.next_due_at, fs.new_item_ratio,
+           fs.consecutive_failures, fs.last_success_at, fs.last_error,
+           fs.latency_ewma, fs.circuit_open_until
+    FROM publishers AS p
+    LEFT JOIN publisher_fetch_state AS fs ON fs.publisher_id = p.id
+"""
+
+
+async def fetch_due_publishers_from_database(ignore_schedule: bool = False, retry_dead: bool = False) -> list:
+    """
+    Planning query: fetch every publisher that is due for polling, across all
+    categories, together with its fetch state and health. Publishers that were
+    never polled are always due. Publishers whose circuit breaker is open are
+    skipped even with `ignore_schedule`, unless `retry_dead` is set.
+    """
+    sql = PUBLISHER_STATE_SELECT
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    conditions, params = [], []
+    if not ignore_schedule:
+        conditions.append("(fs.next_due_at IS NULL OR fs.next_due_at <= %s)")
+        params.append(now)
+    if not retry_dead:
+        conditions.append("(fs.circuit_open_until IS NULL OR fs.circuit_open_until <= %s)")
+        params.append(now)
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions)
+
+    async with get_db_connection() as db_connection:
+        try:
+            async with db_connection.cursor() as cursor:
+                await cursor.execute(sql, tuple(params))
+                publishers = await cursor.fetchall()
+        except Exception as e:
+            log_message(f"Error fetching publishers: {e}", level="error")
+            stats["error_types"]["db_errors"] += 1
+            return []
+
+    await seed_publish_intervals(
+        [publisher for publisher in publishers if publisher["poll_interval"] is None]
+    )
+    return publishers
+
+
+async def fetch_publishers_by_id(publisher_ids: list) -> list:
+    """Publishers with their fetch state and health, whether they are due or not."""
+    if not publisher_ids:
+        return []
+
+    placeholders = ",".join(["%s"] * len(publisher_ids))
+    async with get_db_connection() as db_connection:
+        try:
+            async with db_connection.cursor() as cursor:
+                await cursor.execute(f"{PUBLISHER_STATE_SELECT} WHERE p.id IN ({placeholders})", tuple(publisher_ids))
+                return await cursor.fetchall()
+        except Exception as e:
+            log_message(f"Error fetching publishers: {e}", level="error")
+            stats["error_types"]["db_errors"] += 1
+            return []
+
+
+async def seed_publish_intervals(publishers: list):
+    """
+    Give publishers that have no learned poll interval yet a first estimate of
+    their publishing cadence, from the stories we already stored for them.
+    """
+    if not publishers:
+        return
+
+    publisher_ids = tuple(publisher["id"] for publisher in publishers)
+    placeholders = ",".join(["%s"] * len(publisher_ids))
+
+    async with get_db_connection() as db_connection:
+        try:
+            async with db_connection.cursor() as cursor:
+                await cursor.execute(
+                    f"""
+                    SELECT publisher_id,
+                           COUNT(*) AS story_count,
+                           TIMESTAMPDIFF(SECOND, MIN(pub_date), MAX(pub_date)) AS pub_span,
+                           TIMESTAMPDIFF(SECOND, MIN(created_at), MAX(created_at)) AS created_span
+                    FROM stories
+                    WHERE publisher_id IN ({placeholders})
+                    GROUP BY publisher_id
+                    """,
+                    publisher_ids,
+                )
+                rows = await cursor.fetchall()
+        except Exception as e:
+            log_message(f"Error fetching publisher history: {e}", level="error")
+            stats["error_types"]["db_errors"] += 1
+            return
+
+    history = {
+        row["publisher_id"]: scheduler_util.estimate_interval_from_history(
+            row["story_count"], row["pub_span"] or row["created_span"]
+        )
+        for row in rows
+    }
+    for publisher in publishers:
+        publisher["history_interval"] = history.get(publisher["id"])
+
+
+def checkpoint_feeds_done(publishers: list):
+    """
+    Record feeds this run is finished with (stored, unchanged or failed) in the
+    checkpoint, so --resume doesn't fetch them again.
+    """
+    if checkpoint is not None:
+        for publisher in publishers:
+            checkpoint.finish(publisher["id"], publisher.get("fetch_outcome"))
+
+
+def plan_next_polls(fetched: list, new_articles: list):
+    """
+    Compute each fetched publisher's next poll from its publishing cadence and the
+    fraction of its items that turned out to be new. The result is stored on the
+    fetch state, so it's persisted by save_fetch_states.
+
+    fetched: list of (publisher, fetch_feed result) tuples
+    """
+    new_counts = Counter(article["publisher_id"] for article in new_articles)
+
+    for publisher, rss_data in fetched:
+        fetch_state = rss_data.get("fetch_state")
+        if not fetch_state:
+            continue
+
+        new_item_ratio = scheduler_util.update_new_item_ratio(
+            publisher.get("new_item_ratio"),
+            new_counts[publisher["id"]],
+            len(rss_data.get("items", [])),
+        )
+        poll_interval = scheduler_util.compute_poll_interval(
+            publisher.get("poll_interval"),
+            rss_data.get("publish_interval") or publisher.get("history_interval"),
+            new_item_ratio,
+        )
+        fetch_state["new_item_ratio"] = new_item_ratio
+        fetch_state["poll_interval"] = poll_interval
+        fetch_state["next_due_at"] = scheduler_util.compute_next_due(poll_interval)
+
+
+async def process_category(session: aiohttp.ClientSession, category_id, category_name, publishers, category_index, total_categories, args=None):
+    """
+    Process a single category: fetch feeds from its due publishers and save articles.
+    Returns the number of articles saved.
+    """
+    if shutdown_requested:
+        return 0
+
+    # Progress tracking
+    percentage = (category_index / total_categories) * 100
+    if not args or not args.quiet:
+        log_message(f"[{round(percentage, 2)}%] Handling {category_name}...", level="info")
+
+    if not publishers:
+        if not args or not args.quiet:
+            log_message(f"No publishers for {category_name}", level="warning")
+        return 0
+
+    # Fetch all feeds concurrently using asyncio.gather with semaphore
+    semaphore = asyncio.Semaphore(MAX_WORKERS)
 
     async def fetch_with_semaphore(publisher):
         async with semaphore:
+            if checkpoint is not None:
+                checkpoint.start(publisher["id"])
             return await fetch_feed(session, publisher, category_name)
 
     tasks = [fetch_with_semaphore(publisher) for publisher in publishers]
     results = await asyncio.gather(*tasks, return_exceptions=True)
 
     # Collect successful results
-    result_list = []
-    for i, result in enumerate(results):
+    fetched = []
+    for publisher, result in zip(publishers, results):
         if isinstance(result, Exception):
-            log_message(f"Exception for {publishers[i].get('name', 'unknown')}: {result}")
+            log_message(f"Exception for {publisher.get('name', 'unknown')}: {result}")
         elif result:
-            result_list.append(result)
+            fetched.append((publisher, result))
+    result_list = [result for _, result in fetched]
 
-    # Merge all articles
+    # Merge all parsed entries
     merged_articles = []
     for rss_data in result_list:
         if rss_data and "items" in rss_data:
             merged_articles.extend(rss_data["items"])
+    stats["stages"]["parsed"] += len(merged_articles)
+
+    unchanged_count = sum(1 for rss_data in result_list if rss_data.get("unchanged"))
+    fetch_states = [
+        rss_data["fetch_state"] for rss_data in result_list if rss_data.get("fetch_state")
+    ]
+    dry_run = bool(args and args.dry_run)
 
     if not merged_articles:
         if not args or not args.quiet:
-            log_message(f"Empty cache: {category_name}", level="warning")
+            if unchanged_count:
+                log_message(f"No changes in {unchanged_count} feeds: {category_name}", level="info")
+            else:
+                log_message(f"Empty cache: {category_name}", level="warning")
+        plan_next_polls(fetched, [])
         stats["category_stats"][category_name] = {
             "articles": 0,
             "feeds_ok": len(result_list),
             "feeds_total": len(publishers),
             "errors": len(publishers) - len(result_list),
+            "unchanged": unchanged_count,
         }
+        if not dry_run:
+            await save_fetch_states(fetch_states)
+            checkpoint_feeds_done(publishers)
         return 0
 
-    # Pre-filter: check which URL hashes already exist
-    url_hashes = [article["story_url_hash"] for article in merged_articles]
-    existing_hashes = await get_existing_url_hashes(url_hashes)
-
-    # Filter out already-existing articles
-    new_articles = [
-        article for article in merged_articles
-        if article["story_url_hash"] not in existing_hashes
-    ]
+    # Dedup right after parsing, so the expensive stages only see new stories
+    new_articles = await filter_new_stories(merged_articles)
+    stats["stages"]["new"] += len(new_articles)
+    plan_next_polls(fetched, new_articles)
 
     skipped_count = len(merged_articles) - len(new_articles)
     if skipped_count > 0 and args and args.verbose:
         log_message(f"Skipped {skipped_count} existing articles for {category_name}", level="info")
 
+    if new_articles:
+        new_articles = await enrich_stories(new_articles)
+        stats["stages"]["enriched"] += len(new_articles)
+
     if not new_articles:
         if not args or not args.quiet:
             log_message(f"No new articles for {category_name}", level="info")
@@ -670,7 +1713,11 @@ async def process_category(session: aiohttp.ClientSession, category_id, category
             "feeds_total": len(publishers),
             "errors": len(publishers) - len(result_list),
             "skipped": skipped_count,
+            "unchanged": unchanged_count,
         }
+        if not dry_run:
+            await save_fetch_states(fetch_states)
+            checkpoint_feeds_done(publishers)
         return 0
 
     shuffle(new_articles)
@@ -682,10 +1729,19 @@ async def process_category(session: aiohttp.ClientSession, category_id, category
         if args.verbose:
             log_message(f"[DRY RUN] Would save {articles_saved} articles for {category_name}", level="info")
     else:
-        exceptions_count = await insert_stories_to_database(
-            new_articles, category_name, category_id
-        )
+        exceptions_count = await insert_stories_to_database(new_articles)
         articles_saved = len(new_articles) - exceptions_count
+        if exceptions_count == 0:
+            stats["stages"]["inserted"] += articles_saved
+            if url_hash_index is not None:
+                url_hash_index.add(s["story_url_hash"] for s in new_articles)
+            remember_clusters(new_articles)
+
+        # Only remember validators once the stories are safely stored, otherwise a
+        # failed insert would make the next run skip them as "unchanged".
+        if exceptions_count == 0:
+            await save_fetch_states(fetch_states)
+            checkpoint_feeds_done(publishers)
 
     # Track statistics
     stats["category_stats"][category_name] = {
@@ -694,6 +1750,7 @@ async def process_category(session: aiohttp.ClientSession, category_id, category
         "feeds_total": len(publishers),
         "errors": len(publishers) - len(result_list),
         "skipped": skipped_count,
+        "unchanged": unchanged_count,
     }
     stats["total_articles"] += articles_saved
 
@@ -703,6 +1760,299 @@ async def process_category(session: aiohttp.ClientSession, category_id, category
     return articles_saved
 
 
+async def run_category_batches(session: aiohttp.ClientSession, categories: list, publishers_by_category: dict, args, progress) -> int:
+    """
+    Per-category ingestion: each category's feeds are gathered, then merged,
+    deduplicated and inserted together. Returns the number of stories saved.
+    """
+    total_articles_saved = 0
+    category_task = progress.add_task(
+        "[cyan]Processing categories...", total=len(categories)
+    )
+
+    # Process categories in batches for controlled concurrency
+    category_semaphore = asyncio.Semaphore(args.category_workers)
+
+    async def process_with_semaphore(cat_id, cat_name, idx):
+        async with category_semaphore:
+            if shutdown_requested:
+                return 0
+            return await process_category(
+                session, cat_id, cat_name, publishers_by_category[cat_id],
+                idx, len(categories), args
+            )
+
+    # Create tasks for all categories
+    tasks = [
+        process_with_semaphore(cat_id, cat_name, idx)
+        for idx, (cat_id, cat_name) in enumerate(categories)
+    ]
+
+    # Process and collect results as they complete
+    for coro in asyncio.as_completed(tasks):
+        if shutdown_requested:
+            log_message("Shutdown in progress - cancelling remaining tasks", level="warning")
+            break
+
+        try:
+            articles_saved = await coro
+            total_articles_saved += articles_saved
+        except Exception as e:
+            log_message(f"Exception processing category: {e}", level="error")
+            stats["error_types"]["other"] += 1
+
+        progress.update(category_task, advance=1)
+
+    return total_articles_saved
+
+
+async def run_stage(name: str, handler, inbox: asyncio.Queue, outbox, concurrency: int):
+    """
+    Run `concurrency` workers that take items from `inbox`, pass them through
+    `handler` and put the result on `outbox`. Bounded queues give backpressure:
+    a worker blocks on put() while the next stage is saturated.
+
+    Handlers return None to drop an item. When the stage runs out of input, the
+    end marker is forwarded to the next stage.
+    """
+    async def worker():
+        while True:
+            item = await inbox.get()
+            if item is _STAGE_END:
+                # Let sibling workers see the end marker too
+                await inbox.put(_STAGE_END)
+                return
+
+            try:
+                result = await handler(item)
+            except Exception as e:
+                log_message(f"Exception in {name} stage: {e}", level="error")
+                stats["error_types"]["other"] += 1
+                continue
+
+            if result is not None and outbox is not None:
+                await outbox.put(result)
+
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    if outbox is not None:
+        await outbox.put(_STAGE_END)
+
+
+async def run_streaming_pipeline(session: aiohttp.ClientSession, categories: list, publishers_by_category: dict, args, on_feed_done=None) -> int:
+    """
+    Streaming ingestion: fetch -> parse -> dedup -> enrich -> write.
+
+    Every feed flows through the stages on its own, connected by bounded queues,
+    so one slow feed never holds back the rest of its category and only the feeds
+    in flight are kept in memory. A single writer batches stories from any number
+    of feeds and categories into bulk inserts. Returns the number of stories saved.
+
+    With --shard, publishers are grouped into shards (lease_util.shard_of) and a
+    shard's publishers are only queued once this node holds its lease. The next
+    shard is claimed when the fetch queue runs low, so faster nodes take more.
+    """
+    dry_run = bool(args and args.dry_run)
+    queue_size = args.queue_size
+    seen_hashes = set()  # url_hashes already claimed by a feed in this run
+    saved = 0
+
+    publisher_queue = asyncio.Queue()
+    parse_queue = asyncio.Queue(maxsize=queue_size)
+    dedup_queue = asyncio.Queue(maxsize=queue_size)
+    enrich_queue = asyncio.Queue(maxsize=queue_size)
+    write_queue = asyncio.Queue(maxsize=queue_size)
+
+    jobs = []
+    for category_id, category_name in categories:
+        publishers = publishers_by_category[category_id]
+        # With --shard, only publishers of claimed shards count (see queue_shards)
+        queued = 0 if shard_leases is not None else len(publishers)
+        stats["category_stats"][category_name] = {
+            "articles": 0,
+            "feeds_ok": 0,
+            "feeds_total": queued,
+            "errors": queued,
+            "skipped": 0,
+            "unchanged": 0,
+        }
+        jobs.extend((category_name, publisher) for publisher in publishers)
+    # Known-slow publishers last, across all categories
+    jobs.sort(key=lambda job: job[1].get("latency_ewma") or 0)
+
+    def shard(publisher):
+        return lease_util.shard_of(publisher["category_id"], publisher["id"], args.shards_per_category)
+
+    async def queue_shards():
+        jobs_by_shard = defaultdict(list)
+        for job in jobs:
+            jobs_by_shard[shard(job[1])].append(job)
+        shards = list(jobs_by_shard)
+        shuffle(shards)  # Nodes start on different shards
+
+        for shard_id in shards:
+            while publisher_queue.qsize() > args.workers and not shutdown_requested:
+                await asyncio.sleep(0.1)
+            if shutdown_requested:
+                break
+            try:
+                claimed = await shard_leases.claim(shard_id)
+            except Exception as e:
+                log_message(f"Could not claim shard {shard_id}: {e}", level="error")
+                continue
+            if claimed:
+                stats["shards"]["claimed"] += 1
+                for job in jobs_by_shard[shard_id]:
+                    category_stats = stats["category_stats"][job[0]]
+                    category_stats["feeds_total"] += 1
+                    category_stats["errors"] += 1
+                    publisher_queue.put_nowait(job)
+            else:
+                stats["shards"]["skipped"] += 1
+        publisher_queue.put_nowait(_STAGE_END)
+
+    if shard_leases is None:
+        for job in jobs:
+            publisher_queue.put_nowait(job)
+        publisher_queue.put_nowait(_STAGE_END)
+
+    async def fetch(job):
+        category_name, publisher = job
+        if shutdown_requested:
+            return None
+        if shard_leases is not None and not shard_leases.holds(shard(publisher)):
+            # Lease lost, another node has taken the shard over
+            return None
+
+        if checkpoint is not None:
+            checkpoint.start(publisher["id"])
+        download = await download_feed(session, publisher)
+        if on_feed_done:
+            on_feed_done()
+        if not download:
+            checkpoint_feeds_done([publisher])
+            return None
+
+        category_stats = stats["category_stats"][category_name]
+        category_stats["feeds_ok"] += 1
+        category_stats["errors"] -= 1
+        if download.get("unchanged"):
+            category_stats["unchanged"] += 1
+
+        download.update(publisher=publisher, category_name=category_name)
+        return download
+
+    async def parse(feed):
+        if feed.get("unchanged"):
+            return feed
+
+        data = await parse_feed(feed["publisher"], feed, feed["category_name"])
+        data.update(
+            publisher=feed["publisher"],
+            category_name=feed["category_name"],
+            fetch_state=feed["fetch_state"],
+        )
+        data.setdefault("items", [])
+        return data
+
+    async def dedup(feed):
+        entries = [entry for entry in feed["items"] if entry["story_url_hash"] not in seen_hashes]
+        seen_hashes.update(entry["story_url_hash"] for entry in entries)
+        stats["stages"]["parsed"] += len(feed["items"])
+
+        new_entries = await filter_new_stories(entries) if entries else []
+        stats["stages"]["new"] += len(new_entries)
+        stats["category_stats"][feed["category_name"]]["skipped"] += len(feed["items"]) - len(new_entries)
+
+        plan_next_polls([(feed["publisher"], feed)], new_entries)
+        feed["new_entries"] = new_entries
+        return feed
+
+    # A feed rarely brings more than a few new stories, too few for TF-IDF, so
+    # with that engine the writer tags each batch, grouped by category
+    tag_in_writer = KEYWORD_ENGINE == "tfidf"
+
+    async def enrich(feed):
+        entries = feed.pop("new_entries")
+        feed["stories"] = await enrich_stories(entries, tag=not tag_in_writer) if entries else []
+        stats["stages"]["enriched"] += len(feed["stories"])
+        return feed
+
+    async def flush(feeds):
+        try:
+            await write_feeds(feeds)
+        except Exception as e:
+            log_message(f"Exception in write stage: {e}", level="error")
+            stats["error_types"]["other"] += 1
+
+    async def write_feeds(feeds):
+        nonlocal saved
+        stories = [story for feed in feeds for story in feed["stories"]]
+        if tag_in_writer and stories:
+            await tag_stories(stories)
+
+        if dry_run:
+            exceptions_count = 0
+        else:
+            exceptions_count = await insert_stories_to_database(stories) if stories else 0
+            if exceptions_count:
+                return
+
+            stats["stages"]["inserted"] += len(stories)
+            if url_hash_index is not None:
+                url_hash_index.add(story["story_url_hash"] for story in stories)
+            remember_clusters(stories)
+            # Validators are only stored once the stories are, see save_fetch_states
+            await save_fetch_states([feed["fetch_state"] for feed in feeds if feed.get("fetch_state")])
+            checkpoint_feeds_done([feed["publisher"] for feed in feeds])
+
+        for feed in feeds:
+            stats["category_stats"][feed["category_name"]]["articles"] += len(feed["stories"])
+        stats["total_articles"] += len(stories)
+        saved += len(stories)
+
+        if stories and not args.quiet:
+            log_message(f"[{len(stories)} articles] Saved from {len(feeds)} feeds", level="success")
+
+    async def writer():
+        pending, pending_stories = [], 0
+        loop = asyncio.get_event_loop()
+        last_flush = loop.time()
+
+        while True:
+            try:
+                feed = await asyncio.wait_for(write_queue.get(), timeout=WRITE_FLUSH_INTERVAL)
+            except asyncio.TimeoutError:
+                feed = None
+
+            if feed is _STAGE_END:
+                if pending:
+                    await flush(pending)
+                return
+
+            if feed is not None:
+                feed.setdefault("stories", [])
+                pending.append(feed)
+                pending_stories += len(feed["stories"])
+
+            if pending and (
+                pending_stories >= WRITE_BATCH_SIZE
+                or loop.time() - last_flush >= WRITE_FLUSH_INTERVAL
+            ):
+                await flush(pending)
+                pending, pending_stories = [], 0
+                last_flush = loop.time()
+
+    await asyncio.gather(
+        queue_shards() if shard_leases is not None else asyncio.sleep(0),
+        run_stage("fetch", fetch, publisher_queue, parse_queue, args.workers),
+        run_stage("parse", parse, parse_queue, dedup_queue, args.parse_workers),
+        run_stage("dedup", dedup, dedup_queue, enrich_queue, args.dedup_workers),
+        run_stage("enrich", enrich, enrich_queue, write_queue, args.enrich_workers),
+        writer(),
+    )
+    return saved
+
+
 def display_summary(total_articles, execution_time, args):
     """Display a comprehensive summary table of the operation."""
     console.print("\n")
@@ -719,6 +2069,13 @@ def display_summary(total_articles, execution_time, args):
 
     table.add_row("Total Articles", str(total_articles))
     table.add_row("Total Categories", str(len(stats["category_stats"])))
+    table.add_row("Publishers Due", str(stats["publishers_due"]))
+    table.add_row("Unchanged Feeds", str(stats["feeds_unchanged"]))
+    table.add_row("Truncated Feeds", str(stats["feeds_truncated"]))
+    if shard_leases is not None:
+        table.add_row("Shards Claimed", str(stats["shards"]["claimed"]))
+        table.add_row("Shards Taken by Other Nodes", str(stats["shards"]["skipped"]))
+        table.add_row("Shard Leases Lost", str(shard_leases.lost))
     table.add_row("Execution Time", str(execution_time).split('.')[0])
 
     if total_articles > 0 and execution_time.total_seconds() > 0:
@@ -728,6 +2085,34 @@ def display_summary(total_articles, execution_time, args):
     console.print(table)
     console.print()
 
+    # Per-stage story counts, to see where stories drop out of the pipeline
+    stage_table = Table(title="Pipeline Stages", box=box.ROUNDED, show_header=True, header_style="bold blue")
+    stage_table.add_column("Stage", style="cyan", width=30)
+    stage_table.add_column("Stories", style="green", justify="right")
+
+    stage_labels = {
+        "parsed": "Parsed",
+        "new": "New (after dedup)",
+        "enriched": "Enriched (lang/YAKE)",
+        "inserted": "Inserted",
+    }
+    for stage, label in stage_labels.items():
+        stage_table.add_row(label, str(stats["stages"][stage]))
+
+    language_labels = {
+        "prior_hits": "Lang: publisher prior",
+        "memo_hits": "Lang: memoized",
+        "detected": "Lang: detected",
+    }
+    for key, label in language_labels.items():
+        stage_table.add_row(label, str(stats["languages"][key]))
+
+    stage_table.add_row("Near-duplicates: clustered", str(stats["near_duplicates"]["clustered"]))
+    stage_table.add_row("Near-duplicates: dropped", str(stats["near_duplicates"]["dropped"]))
+
+    console.print(stage_table)
+    console.print()
+
     # Error summary (if any errors occurred)
     total_errors = sum(stats["error_types"].values())
     if total_errors > 0:
@@ -742,6 +2127,29 @@ def display_summary(total_articles, execution_time, args):
         console.print(error_table)
         console.print()
 
+    # Failing and slow publishers, to spot feeds that need attention
+    if stats["worst_publishers"] and not args.quiet:
+        health_table = Table(title="Worst Publishers", box=box.ROUNDED, show_header=True, header_style="bold red")
+        health_table.add_column("Publisher", style="cyan", width=30)
+        health_table.add_column("Failures", style="red", justify="right")
+        health_table.add_column("Last Error", style="yellow")
+        health_table.add_column("Latency", style="blue", justify="right")
+        health_table.add_column("Circuit Open Until", style="magenta")
+
+        for publisher in stats["worst_publishers"]:
+            latency = publisher.get("latency_ewma")
+            circuit = publisher["circuit_open_until"]
+            health_table.add_row(
+                str(publisher.get("name") or publisher["id"])[:30],
+                str(publisher["consecutive_failures"]),
+                publisher["last_error"] or "-",
+                f"{latency:.2f}s" if latency is not None else "-",
+                circuit.strftime("%Y-%m-%d %H:%M") if circuit else "-",
+            )
+
+        console.print(health_table)
+        console.print()
+
     # Category breakdown (top 10 by article count)
     if stats["category_stats"] and not args.quiet:
         cat_table = Table(
@@ -798,7 +2206,56 @@ def parse_arguments():
         "--category-workers",
         type=int,
         default=3,
-        help="Number of categories to process in parallel (default: 3)",
+        help="Number of categories to process in parallel in 'category' pipeline mode (default: 3)",
+    )
+
+    parser.add_argument(
+        "--pipeline",
+        choices=("streaming", "category"),
+        default="streaming",
+        help="Ingestion engine: 'streaming' stage queues, or the older per-category batches (default: streaming)",
+    )
+
+    parser.add_argument(
+        "--process-workers",
+        type=int,
+        default=os.cpu_count() or 4,
+        help="Processes for CPU-bound parsing, language detection and keywords (default: CPU count)",
+    )
+
+    parser.add_argument(
+        "--keyword-engine",
+        choices=("yake", "tfidf"),
+        default="yake",
+        help="Keyword extractor for story tags: 'yake', or the much cheaper batch 'tfidf' (default: yake)",
+    )
+
+    parser.add_argument(
+        "--parse-workers",
+        type=int,
+        default=4,
+        help="Concurrent feed parsers in streaming mode (default: 4)",
+    )
+
+    parser.add_argument(
+        "--dedup-workers",
+        type=int,
+        default=4,
+        help="Concurrent url_hash lookups in streaming mode (default: 4)",
+    )
+
+    parser.add_argument(
+        "--enrich-workers",
+        type=int,
+        default=8,
+        help="Concurrent lang/YAKE enrichment tasks in streaming mode (default: 8)",
+    )
+
+    parser.add_argument(
+        "--queue-size",
+        type=int,
+        default=100,
+        help="Maximum feeds waiting between two streaming stages (default: 100)",
     )
 
     parser.add_argument(
@@ -808,6 +2265,13 @@ def parse_arguments():
         help="Request timeout in seconds (default: 30)",
     )
 
+    parser.add_argument(
+        "--max-feed-kb",
+        type=int,
+        default=MAX_FEED_SIZE // 1024,
+        help=f"Largest feed body read, in KB; larger feeds keep their first entries (default: {MAX_FEED_SIZE // 1024})",
+    )
+
     parser.add_argument(
         "--dry-run",
         action="store_true",
@@ -827,6 +2291,84 @@ def parse_arguments():
         help="Number of days to keep stories before pruning (default: 7)",
     )
 
+    parser.add_argument(
+        "--prune-batch-size",
+        type=int,
+        default=PRUNE_BATCH_SIZE,
+        help=f"Stories deleted per pruning transaction (default: {PRUNE_BATCH_SIZE})",
+    )
+
+    parser.add_argument(
+        "--prune-pause",
+        type=float,
+        default=PRUNE_PAUSE,
+        help=f"Seconds to pause between pruning batches (default: {PRUNE_PAUSE})",
+    )
+
+    parser.add_argument(
+        "--ignore-schedule",
+        action="store_true",
+        help="Poll every publisher, not only the ones due according to their learned cadence",
+    )
+
+    parser.add_argument(
+        "--retry-dead",
+        action="store_true",
+        help="Also poll publishers whose circuit breaker is open after repeated failures",
+    )
+
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue an interrupted run, skipping the publishers and categories it already finished",
+    )
+
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="Keep running, with an ingestion cycle every --cycle-interval seconds, until SIGINT/SIGTERM",
+    )
+
+    parser.add_argument(
+        "--cycle-interval",
+        type=float,
+        default=CYCLE_INTERVAL,
+        help=f"Seconds between the starts of two cycles in --daemon mode (default: {CYCLE_INTERVAL})",
+    )
+
+    parser.add_argument(
+        "--shard",
+        action="store_true",
+        help="Share the publishers with other search_news nodes through leases on shards (streaming pipeline only)",
+    )
+
+    parser.add_argument(
+        "--lease-store",
+        choices=("redis", "local"),
+        default="redis",
+        help="Where --shard keeps its leases: Redis, or a local file for nodes on one machine (default: redis)",
+    )
+
+    parser.add_argument(
+        "--node-id",
+        type=str,
+        help="Name of this node in shard leases (default: host name and process ID)",
+    )
+
+    parser.add_argument(
+        "--shards-per-category",
+        type=int,
+        default=4,
+        help="Shards each category's publishers are split into with --shard (default: 4)",
+    )
+
+    parser.add_argument(
+        "--lease-ttl",
+        type=float,
+        default=lease_util.LEASE_TTL,
+        help=f"Seconds before the shards of a node that stopped heartbeating are taken over (default: {lease_util.LEASE_TTL})",
+    )
+
     parser.add_argument(
         "--verbose",
         action="store_true",
@@ -839,7 +2381,10 @@ def parse_arguments():
         help="Minimal output - only show summary",
     )
 
-    return parser.parse_args()
+    args = parser.parse_args()
+    if args.shard and args.pipeline != "streaming":
+        parser.error("--shard requires --pipeline streaming")
+    return args
 
 
 def signal_handler(signum, frame):
@@ -853,16 +2398,272 @@ def signal_handler(signum, frame):
         sys.exit(1)
 
 
+async def run_cycle(session: aiohttp.ClientSession, args, prune: bool = True):
+    """
+    One ingestion cycle: plan the due publishers, run them through the pipeline,
+    update their health, print the summary and prune old stories.
+
+    Progress is kept in a checkpoint file. With --resume, publishers and
+    categories the previous, interrupted run already finished are skipped, and
+    categories keep that run's order.
+    """
+    global checkpoint
+    checkpoint = None if args.dry_run else checkpoint_util.RunCheckpoint.load(CHECKPOINT_PATH, resume=args.resume)
+    if checkpoint is not None and checkpoint.resumed:
+        log_message(
+            f"Resuming the run started at {checkpoint.started_at}: {len(checkpoint.done)} publishers "
+            f"and {len(checkpoint.completed_categories)} categories done, "
+            f"{len(checkpoint.in_flight)} publishers in flight are fetched again",
+            level="info",
+        )
+
+    categories = await fetch_categories_from_database()
+
+    if not categories:
+        log_message("No categories found!", level="error")
+        return
+
+    if config.SEARCH_NEWS_DEBUG:
+        categories = [(cid, cname) for cid, cname in categories if cname == "br_general"]
+
+    # Filter categories if specified
+    if args.categories:
+        category_filter = [c.strip() for c in args.categories.split(",")]
+        categories = [(cid, cname) for cid, cname in categories if cname in category_filter]
+        if not categories:
+            log_message(f"No matching categories found for: {args.categories}", level="error")
+            return
+        log_message(f"Processing {len(categories)} filtered categories", level="info")
+
+    # One planning query for the whole run, grouped by category afterwards
+    due_publishers = await fetch_due_publishers_from_database(args.ignore_schedule, args.retry_dead)
+
+    # Publishers the interrupted run already finished. Their fetch outcomes are
+    # folded into their health with this run's, unless that was saved already;
+    # the ones that aren't due anymore (most that were fetched fine) are loaded.
+    resumed_publishers = []
+    if checkpoint is not None:
+        if checkpoint.resumed:
+            categories = [
+                (cid, cname) for cid, cname in categories if cid not in checkpoint.completed_categories
+            ]
+            resumed_publishers, not_due_ids = checkpoint.resumed_outcomes(due_publishers)
+            for publisher in await fetch_publishers_by_id(not_due_ids):
+                publisher["fetch_outcome"] = checkpoint.outcome(publisher["id"])
+                resumed_publishers.append(publisher)
+            due_publishers = [p for p in due_publishers if not checkpoint.is_done(p["id"])]
+        categories = checkpoint.order_categories(categories)
+
+    # Known-slow publishers queue for the fetch semaphore last, so they don't
+    # hold connections while quick feeds wait
+    due_publishers = sorted(due_publishers, key=lambda publisher: publisher.get("latency_ewma") or 0)
+    publishers_by_category = defaultdict(list)
+    for publisher in due_publishers:
+        publishers_by_category[publisher["category_id"]].append(publisher)
+
+    categories = [
+        (cid, cname) for cid, cname in categories if publishers_by_category.get(cid)
+    ]
+    stats["publishers_due"] = sum(
+        len(publishers_by_category[cid]) for cid, _ in categories
+    )
+    log_message(
+        f"{stats['publishers_due']} publishers due across {len(categories)} categories",
+        level="info",
+    )
+    if not categories:
+        log_message("No publishers are due yet", level="success")
+        if checkpoint is not None:
+            checkpoint.clear()
+        return
+
+    if checkpoint is not None:
+        category_ids = {cid for cid, _ in categories}
+        checkpoint.plan({
+            p["id"]: p["category_id"] for p in due_publishers if p["category_id"] in category_ids
+        })
+        checkpoint.save(force=True)
+
+    if args.dry_run:
+        console.print("[yellow]DRY RUN MODE - No data will be saved to database[/yellow]\n")
+
+    total_articles_saved = 0
+
+    with Progress(
+        SpinnerColumn(),
+        TextColumn("[progress.description]{task.description}"),
+        BarColumn(),
+        MofNCompleteColumn(),
+        TextColumn("•"),
+        TimeElapsedColumn(),
+        console=console,
+        transient=False,
+    ) as progress:
+        if args.pipeline == "streaming":
+            feed_task = progress.add_task(
+                "[cyan]Fetching feeds...",
+                # Unknown with --shard, other nodes take part of them
+                total=None if shard_leases is not None else stats["publishers_due"],
+            )
+            heartbeat = asyncio.ensure_future(shard_leases.heartbeat()) if shard_leases is not None else None
+            completed = False
+            try:
+                total_articles_saved = await run_streaming_pipeline(
+                    session,
+                    categories,
+                    publishers_by_category,
+                    args,
+                    on_feed_done=lambda: progress.update(feed_task, advance=1),
+                )
+                completed = True
+            finally:
+                if heartbeat is not None:
+                    heartbeat.cancel()
+                    await return_shard_leases(completed and not shutdown_requested and not args.dry_run)
+        else:
+            total_articles_saved = await run_category_batches(
+                session, categories, publishers_by_category, args, progress
+            )
+
+    # Fold this run's fetch outcomes into each publisher's health
+    fetched = update_publisher_health(due_publishers + resumed_publishers)
+    stats["worst_publishers"] = sorted(
+        (p for p in fetched if p["consecutive_failures"] or p.get("latency_ewma")),
+        key=lambda p: (p["consecutive_failures"], p.get("latency_ewma") or 0),
+        reverse=True,
+    )[:10]
+    if not args.dry_run:
+        await save_publisher_health(fetched)
+
+    if checkpoint is not None:
+        if shutdown_requested:
+            # Health is saved, so a resumed run must not count these outcomes again
+            checkpoint.forget_outcomes(p["id"] for p in fetched)
+            checkpoint.save(force=True)
+            log_message("Run interrupted, continue it with --resume", level="warning")
+        else:
+            checkpoint.clear()
+
+    # Calculate execution time
+    execution_time = datetime.now() - stats["start_time"]
+
+    # Display summary statistics
+    display_summary(total_articles_saved, execution_time, args)
+
+    # Auto-delete anything older than specified days
+    if prune and not args.skip_prune and not args.dry_run and await claim_prune():
+        console.print(f"\n[cyan]Pruning stories older than {args.prune_days} days...[/cyan]")
+        await prune_old_stories(
+            days=args.prune_days, batch_size=args.prune_batch_size, pause=args.prune_pause
+        )
+
+    log_message("Finished!", level="success")
+
+
+async def return_shard_leases(finished: bool):
+    """
+    Hand back this node's shards after a cycle: finished ones stay claimed for
+    lease_util.SHARD_COOLDOWN, interrupted ones are released for other nodes.
+    """
+    try:
+        if finished:
+            await shard_leases.finish_all()
+        else:
+            await shard_leases.release_all()
+    except Exception as e:
+        log_message(f"Could not return shard leases: {e}", level="error")
+
+
+async def claim_prune() -> bool:
+    """With --shard, only one node prunes every DAEMON_PRUNE_INTERVAL seconds."""
+    if shard_leases is None:
+        return True
+    try:
+        return await shard_leases.claim_task("prune", DAEMON_PRUNE_INTERVAL)
+    except Exception as e:
+        log_message(f"Could not claim pruning: {e}", level="error")
+        return False
+
+
+def reset_stats():
+    """Start a fresh set of statistics for the next daemon cycle."""
+    stats.clear()
+    stats.update(copy.deepcopy(_INITIAL_STATS))
+    stats["start_time"] = datetime.now()
+    if language_resolver is not None:
+        language_resolver.stats = stats["languages"]
+
+
+async def sleep_unless_shutdown(seconds: float):
+    """Sleep for up to `seconds`, waking up early once shutdown is requested."""
+    loop = asyncio.get_event_loop()
+    deadline = loop.time() + seconds
+    while not shutdown_requested:
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            break
+        await asyncio.sleep(min(remaining, 1.0))
+
+
+async def run_daemon(session: aiohttp.ClientSession, args):
+    """
+    Run ingestion cycles every --cycle-interval seconds until SIGINT/SIGTERM,
+    reusing the database pool, HTTP connections, DNS cache, process pool and
+    language resolver across cycles. A cycle that fails is logged and the next
+    one runs as scheduled. A process pool that broke (a worker died) is replaced
+    before the next cycle.
+    """
+    global process_pool
+    loop = asyncio.get_event_loop()
+    cycle = 0
+    last_prune = None
+    log_message(f"Daemon started, one cycle every {args.cycle_interval}s", level="success")
+
+    while not shutdown_requested:
+        cycle += 1
+        started = loop.time()
+        reset_stats()
+        prune = last_prune is None or started - last_prune >= DAEMON_PRUNE_INTERVAL
+
+        try:
+            replacement = await pool_util.replace_if_broken(process_pool, args.process_workers)
+            if replacement is not None:
+                log_message("A process pool worker died, starting a new pool", level="error")
+                process_pool = replacement
+                await warm_process_pool(args.process_workers)
+            if prune and last_prune is not None:
+                # Let stories that left the window drop out of the index
+                await load_cluster_index()
+            await run_cycle(session, args, prune=prune)
+            if prune:
+                last_prune = started
+            # Only the first cycle continues an interrupted run
+            args.resume = False
+        except Exception as e:
+            log_message(f"Cycle {cycle} failed: {e}", level="error")
+
+        if url_hash_index is not None:
+            url_hash_index.save()
+
+        elapsed = loop.time() - started
+        log_message(f"Cycle {cycle} took {elapsed:.2f}s", level="info")
+        await sleep_unless_shutdown(args.cycle_interval - elapsed)
+
+    log_message("Daemon stopped", level="success")
+
+
 async def async_main():
     """Main async execution function with concurrent category processing."""
-    global stats, MAX_WORKERS, REQUEST_TIMEOUT, process_pool, db_pool
+    global stats, MAX_WORKERS, REQUEST_TIMEOUT, KEYWORD_ENGINE, MAX_FEED_SIZE, process_pool, db_pool, url_hash_index, shard_leases
 
     # Parse CLI arguments
     args = parse_arguments()
 
     # Update configuration from arguments
     MAX_WORKERS = args.workers
+    KEYWORD_ENGINE = args.keyword_engine
     REQUEST_TIMEOUT = args.timeout
+    MAX_FEED_SIZE = args.max_feed_kb * 1024
 
     # Setup signal handlers
     signal.signal(signal.SIGINT, signal_handler)
@@ -875,31 +2676,38 @@ async def async_main():
     await init_db_pool()
     log_message("Database connection pool initialized", level="success")
 
-    # Initialize process pool for CPU-bound YAKE extraction
-    process_pool = ProcessPoolExecutor(max_workers=4)
+    # Initialize process pool for CPU-bound parsing, sanitization and YAKE
+    process_pool = ProcessPoolExecutor(max_workers=args.process_workers)
 
-    try:
-        categories = await fetch_categories_from_database()
-
-        if not categories:
-            log_message("No categories found!", level="error")
-            return
+    # Load the url_hash index, building it from the database on first use
+    url_hash_index = hash_index_util.UrlHashIndex.load(URL_HASH_INDEX_PATH)
+    if not url_hash_index.exists:
+        try:
+            await rebuild_url_hash_index()
+        except Exception as e:
+            # Fall back to plain database lookups for this run
+            log_message(f"Could not build url_hash index: {e}", level="warning")
+            url_hash_index = None
+    else:
+        log_message(f"Loaded url_hash index with {len(url_hash_index)} stories", level="success")
 
-        # Filter categories if specified
-        if args.categories:
-            category_filter = [c.strip() for c in args.categories.split(",")]
-            categories = [(cid, cname) for cid, cname in categories if cname in category_filter]
-            if not categories:
-                log_message(f"No matching categories found for: {args.categories}", level="error")
-                return
-            log_message(f"Processing {len(categories)} filtered categories", level="info")
+    await load_language_resolver()
+    await load_cluster_index()
 
-        if args.dry_run:
-            console.print("[yellow]DRY RUN MODE - No data will be saved to database[/yellow]\n")
+    if args.shard:
+        if args.lease_store == "redis":
+            lease_store = lease_util.RedisLeaseStore(config.REDIS_CONNECTION_STRING)
+        else:
+            lease_store = lease_util.LocalLeaseStore(LOCAL_LEASES_PATH)
+        shard_leases = lease_util.ShardLeases(lease_store, args.node_id or lease_util.node_name(), ttl=args.lease_ttl)
+        log_message(f"Sharding as node {shard_leases.node_id} with {args.lease_store} leases", level="info")
 
-        total_articles_saved = 0
+    if args.daemon:
+        await warm_process_pool(args.process_workers)
 
-        # Create aiohttp session with connection pooling
+    try:
+        # Create aiohttp session with connection pooling. In daemon mode it lives
+        # across cycles, keeping idle connections and the DNS cache warm.
         connector = aiohttp.TCPConnector(
             limit=0,                 # No total limit (semaphore controls concurrency)
             limit_per_host=5,        # Per-host limit to avoid hammering single servers
@@ -909,70 +2717,20 @@ async def async_main():
         )
 
         async with aiohttp.ClientSession(connector=connector) as session:
-            # Process categories with progress tracking
-            with Progress(
-                SpinnerColumn(),
-                TextColumn("[progress.description]{task.description}"),
-                BarColumn(),
-                MofNCompleteColumn(),
-                TextColumn("•"),
-                TimeElapsedColumn(),
-                console=console,
-                transient=False,
-            ) as progress:
-                category_task = progress.add_task(
-                    "[cyan]Processing categories...", total=len(categories)
-                )
-
-                # Process categories in batches for controlled concurrency
-                category_semaphore = asyncio.Semaphore(args.category_workers)
-
-                async def process_with_semaphore(cat_id, cat_name, idx):
-                    async with category_semaphore:
-                        if shutdown_requested:
-                            return 0
-                        return await process_category(
-                            session, cat_id, cat_name, idx, len(categories), args
-                        )
-
-                # Create tasks for all categories
-                tasks = [
-                    process_with_semaphore(cat_id, cat_name, idx)
-                    for idx, (cat_id, cat_name) in enumerate(categories)
-                ]
-
-                # Process and collect results as they complete
-                for coro in asyncio.as_completed(tasks):
-                    if shutdown_requested:
-                        log_message("Shutdown in progress - cancelling remaining tasks", level="warning")
-                        break
-
-                    try:
-                        articles_saved = await coro
-                        total_articles_saved += articles_saved
-                    except Exception as e:
-                        log_message(f"Exception processing category: {e}", level="error")
-                        stats["error_types"]["other"] += 1
-
-                    progress.update(category_task, advance=1)
-
-        # Calculate execution time
-        execution_time = datetime.now() - stats["start_time"]
-
-        # Display summary statistics
-        display_summary(total_articles_saved, execution_time, args)
-
-        # Auto-delete anything older than specified days
-        if not args.skip_prune and not args.dry_run:
-            console.print(f"\n[cyan]Pruning stories older than {args.prune_days} days...[/cyan]")
-            await prune_old_stories(days=args.prune_days)
-
-        log_message("Finished!", level="success")
+            if args.daemon:
+                await run_daemon(session, args)
+            else:
+                await run_cycle(session, args)
 
     finally:
         # Cleanup
+        if url_hash_index is not None:
+            url_hash_index.save()
+            url_hash_index.close()
         if process_pool:
             process_pool.shutdown(wait=False)
+        if shard_leases is not None:
+            await shard_leases.close()
         if db_pool:
             db_pool.close()
             await db_pool.wait_closed()
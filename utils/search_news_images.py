@@ -5,19 +5,20 @@ import logging
 import boto3
 import time
 import argparse
+import os
+import shutil
 import signal
 import sys
+from collections import defaultdict
 from contextlib import asynccontextmanager
 from random import shuffle, choice
 from urllib.parse import urljoin
-from bs4 import BeautifulSoup
 from io import BytesIO
-from PIL import Image
 from pathlib import Path
 from os import makedirs as os_makedirs
 from dataclasses import dataclass, field
 from typing import Optional, Set, List, Dict, Any
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
 # Progress and color libraries
 try:
@@ -39,7 +40,7 @@ except ImportError:
     class Style:
         RESET_ALL = BRIGHT = ""
 
-from website_scripts import config, immutable, input_sanitization, hashing_util
+from website_scripts import config, immutable, input_sanitization, hashing_util, preview_util, encode_util
 
 
 # =============================================================================
@@ -56,6 +57,7 @@ Examples:
   %(prog)s --dry-run            # Preview without making changes
   %(prog)s -v --category Tech   # Verbose mode, single category
   %(prog)s --workers 10 -q      # 10 workers, quiet mode
+  %(prog)s --avif-tier fast     # Cheapest AVIF encoding, for catching up on a backlog
         """
     )
     parser.add_argument(
@@ -108,6 +110,35 @@ Examples:
         default=5.0,
         help='Connection timeout in seconds (default: 5.0)'
     )
+    parser.add_argument(
+        '--max-image-kb',
+        type=int,
+        default=8192,
+        help='Largest image downloaded, in KB; bigger ones are abandoned mid-download (default: 8192)'
+    )
+    parser.add_argument(
+        '--avif-tier',
+        choices=tuple(encode_util.AVIF_TIERS),
+        default=encode_util.DEFAULT_AVIF_TIER,
+        help="AVIF encoder effort: 'fast' for backlog catch-up, 'best' for the most thorough encode "
+             f"(default: {encode_util.DEFAULT_AVIF_TIER})"
+    )
+    parser.add_argument(
+        '--no-variants',
+        action='store_true',
+        help='Store only the full-size story image, without the narrower srcset copies'
+    )
+    parser.add_argument(
+        '--webp',
+        action='store_true',
+        help='Also store WebP copies of story images, for browsers without AVIF'
+    )
+    parser.add_argument(
+        '--encode-workers',
+        type=int,
+        default=os.cpu_count() or 4,
+        help='Processes that decode and encode images (default: CPU count)'
+    )
     parser.add_argument(
         '--no-proxy',
         action='store_true',
@@ -204,7 +235,12 @@ class RunStatistics:
     favicons_updated: int = 0
     downloads_failed: int = 0
     proxy_errors: int = 0
-    head_request_skips: int = 0
+    non_image_skips: int = 0
+    oversize_skips: int = 0
+    page_bytes_read: int = 0
+    images_reused: int = 0
+    feed_images: int = 0
+    feed_image_fallbacks: int = 0
 
     def elapsed_time(self) -> str:
         """Return formatted elapsed time"""
@@ -259,6 +295,8 @@ MAX_PROXY_RETRIES = 10
 MAX_BAD_PROXIES_BEFORE_CLEAR = 50
 LOCAL_STORAGE_MAX_AGE_DAYS = 30
 REQUEST_TIMEOUT = args.timeout
+READ_CHUNK_SIZE = 16 * 1024  # pages are read until their </head>, chunk by chunk
+MAX_IMAGE_SIZE = args.max_image_kb * 1024
 CONNECT_TIMEOUT = args.connect_timeout
 
 # Load and shuffle proxies (if not disabled)
@@ -300,8 +338,10 @@ LOCAL_STORAGE_PATH = None
 bucket_name = "infomundi"
 bucket_base_url = "https://bucket.infomundi.net"
 
-# Thread pool for CPU-bound image processing (PIL operations)
+# Thread pool for blocking storage I/O (boto3, local files)
 image_executor = ThreadPoolExecutor(max_workers=min(8, (WORKERS // 4) or 2))
+# Process pool for decoding and encoding images, one process per core
+encode_pool = ProcessPoolExecutor(max_workers=args.encode_workers)
 
 try:
     # Check if S3/R2 credentials are properly configured
@@ -476,6 +516,46 @@ async def fetch_categories_from_database() -> List[Dict]:
     return categories
 
 
+def story_image_path(category_name: str, url_hash: bytes) -> str:
+    """Storage path of a story's image, without extension (see Story.get_image_url)."""
+    return f"stories/{category_name}/{hashing_util.binary_to_md5_hex(url_hash)}"
+
+
+async def fetch_cluster_images(cluster_ids: Set[int]) -> Dict[int, tuple]:
+    """
+    For each near-duplicate cluster that already has an image, the storage path
+    (without extension), image_variants and image_width of one such image.
+    Stories in these clusters can reuse it instead of being scraped.
+    """
+    if not cluster_ids:
+        return {}
+
+    cluster_ids = list(cluster_ids)
+    try:
+        async with get_db_connection() as connection:
+            async with connection.cursor() as cursor:
+                sql = f"""
+                SELECT s.cluster_id, s.url_hash, s.image_variants, s.image_width, c.name AS category_name
+                FROM stories AS s
+                JOIN categories AS c
+                  ON s.category_id = c.id
+                WHERE s.cluster_id IN ({", ".join(["%s"] * len(cluster_ids))})
+                  AND s.has_image
+                """
+                await cursor.execute(sql, cluster_ids)
+                rows = await cursor.fetchall()
+    except Exception as e:
+        log_message(f"Error fetching cluster images: {e}")
+        return {}
+
+    return {
+        row["cluster_id"]: (
+            story_image_path(row["category_name"], row["url_hash"]), row["image_variants"], row["image_width"]
+        )
+        for row in rows
+    }
+
+
 async def fetch_stories_with_publishers(category_id: int, limit: int = 30) -> List[Dict]:
     """Fetch stories with nested publisher information"""
     log_message("Fetching stories with nested publisher dict...")
@@ -555,31 +635,44 @@ def mark_proxy_bad(proxy: str):
     stats.proxy_errors += 1
 
 
-async def check_content_type(session: aiohttp.ClientSession, url: str, proxy: Optional[str]) -> bool:
+async def read_image_body(response: aiohttp.ClientResponse, url: str) -> Optional[bytes]:
     """
-    Perform HEAD request to validate content-type before downloading.
-    Returns True if the URL appears to be an image or HTML page.
+    Read an image response, giving up as soon as it can't be a usable image: a
+    declared non-image Content-Type, first bytes that aren't an image format's
+    signature, or more than MAX_IMAGE_SIZE bytes. Bogus or huge bodies are never
+    downloaded in full.
+    Returns the body, or None when it was abandoned.
     """
-    try:
-        timeout = aiohttp.ClientTimeout(total=CONNECT_TIMEOUT)
-        kwargs = {
-            "timeout": timeout,
-            "allow_redirects": True
-        }
-        if proxy:
-            kwargs["proxy"] = f"http://{proxy}"
-
-        async with session.head(url, **kwargs) as response:
-            content_type = response.headers.get('Content-Type', '').lower()
-            # Accept images and HTML (for scraping og:image)
-            if any(t in content_type for t in ['image/', 'text/html', 'application/xhtml']):
-                return True
-            log_message(f"Skipping non-image/html content-type: {content_type} for {url}")
-            stats.head_request_skips += 1
-            return False
-    except Exception:
-        # If HEAD fails, proceed with GET anyway
-        return True
+    content_type = response.headers.get("Content-Type", "")
+    if preview_util.is_non_image_type(content_type):
+        log_message(f"Skipping non-image content-type: {content_type} for {url}")
+        stats.non_image_skips += 1
+        return None
+
+    if response.content_length and response.content_length > MAX_IMAGE_SIZE:
+        log_message(f"Skipping oversize image ({response.content_length} bytes) at {url}")
+        stats.oversize_skips += 1
+        return None
+
+    body = bytearray()
+    sniffed = False
+    async for chunk in response.content.iter_chunked(READ_CHUNK_SIZE):
+        body += chunk
+        if len(body) > MAX_IMAGE_SIZE:
+            log_message(f"Skipping oversize image (over {MAX_IMAGE_SIZE} bytes) at {url}")
+            stats.oversize_skips += 1
+            return None
+        if not sniffed and len(body) >= preview_util.IMAGE_SNIFF_SIZE:
+            if not preview_util.sniff_image(bytes(body[:preview_util.IMAGE_SNIFF_SIZE])):
+                log_message(f"Skipping body that isn't an image ({content_type or 'no content-type'}) at {url}")
+                stats.non_image_skips += 1
+                return None
+            sniffed = True
+
+    if not sniffed and not preview_util.sniff_image(bytes(body)):
+        stats.non_image_skips += 1
+        return None
+    return bytes(body)
 
 
 async def get_link_preview(
@@ -621,12 +714,6 @@ async def get_link_preview(
             return DEFAULT_IMAGE
 
         try:
-            # Validate content-type with HEAD request first (for download mode)
-            if source != "default":
-                is_valid = await check_content_type(session, url, chosen_proxy)
-                if not is_valid:
-                    return DEFAULT_IMAGE
-
             timeout = aiohttp.ClientTimeout(
                 total=REQUEST_TIMEOUT,
                 connect=CONNECT_TIMEOUT
@@ -645,15 +732,14 @@ async def get_link_preview(
                     log_message(f"[Invalid HTTP Response] {response.status} from {url}.")
                     return DEFAULT_IMAGE
 
-                # For download mode, return the response content
+                # For download mode, return the image bytes (one GET, checked as it arrives)
                 if source != "default":
-                    content = await response.read()
-                    return content
+                    return await read_image_body(response, url)
 
-                # For default mode, parse HTML for og:image
-                html_content = await response.text()
+                # For default mode, scan the page's <head> for og:image
+                head = await read_page_head(response)
                 return await extract_image_from_response(
-                    session, html_content, url, data, category_name
+                    session, head, url, data, category_name
                 )
 
         except aiohttp.ClientProxyConnectionError:
@@ -693,21 +779,34 @@ async def get_link_preview(
     return DEFAULT_IMAGE
 
 
+async def read_page_head(response: aiohttp.ClientResponse) -> preview_util.HeadScanner:
+    """
+    Stream a page until its <head> was scanned for preview metadata (or
+    HEAD_MAX_BYTES were read). The rest of the body is never downloaded.
+    """
+    head = preview_util.HeadScanner(str(response.url), response.headers.get("Content-Type", ""))
+    async for chunk in response.content.iter_chunked(READ_CHUNK_SIZE):
+        if head.scan(chunk):
+            break
+    head.finish()
+    stats.page_bytes_read += head.bytes_read
+    return head
+
+
 async def extract_image_from_response(
     session: aiohttp.ClientSession,
-    html_content: str,
+    head: preview_util.HeadScanner,
     url: str,
     story: dict,
     category_name: str
 ) -> Any:
     """
-    Extract image and favicon URLs from HTML content.
-    Uses lxml parser for better performance.
+    Download the image and favicon found in a page's <head>.
 
     Args:
         session: aiohttp session for downloading images
-        html_content: HTML string to parse
-        url: Source URL for resolving relative paths
+        head: Scanned <head> of the story's page (see read_page_head)
+        url: Source URL, for the /favicon.ico fallback
         story: Story dict with publisher info
         category_name: Category for directory structure
 
@@ -717,21 +816,9 @@ async def extract_image_from_response(
     log_message(f"Attempting to extract image from response for {story['id']}")
 
     try:
-        # Use lxml parser for better performance (2-5x faster than html.parser)
-        soup = BeautifulSoup(html_content, "lxml")
-
-        # Find Open Graph image
-        image = soup.find("meta", {"property": "og:image"})
-        image_url = image.get("content", "").strip() if image else DEFAULT_IMAGE
-
-        # Find favicon
-        favicon = soup.find("link", rel="icon")
-        if favicon and favicon.get("href"):
-            favicon_url = favicon["href"]
-            if not input_sanitization.is_valid_url(favicon_url):
-                favicon_url = urljoin(url, favicon["href"])
-        else:
-            favicon_url = urljoin(url, "/favicon.ico")
+        # Open Graph image, else Twitter card image
+        image_url = head.image or DEFAULT_IMAGE
+        favicon_url = head.favicon or urljoin(url, "/favicon.ico")
 
         publisher_id = story["publisher"]["id"]
 
@@ -739,7 +826,7 @@ async def extract_image_from_response(
         images = {
             "story": {
                 "url": image_url,
-                "output_path": f"stories/{category_name}/{hashing_util.binary_to_md5_hex(story['url_hash'])}",
+                "output_path": story_image_path(category_name, story["url_hash"]),
             }
         }
 
@@ -757,43 +844,46 @@ async def extract_image_from_response(
         return DEFAULT_IMAGE
 
 
-def process_image_sync(content: bytes, item_type: str, output_path: str) -> Optional[tuple]:
+async def encode_image(content: bytes, item_type: str, output_path: str) -> Optional[tuple]:
     """
-    CPU-bound image processing - runs in thread pool.
-    Returns (buffer, s3_object_key) or None on failure.
+    Decode and encode an image in the process pool: story images to AVIF at the
+    --avif-tier effort, with their srcset variants, favicons to ICO.
+    Returns (image_variants, image_width, [(buffer, s3_object_key), ...]) with
+    the full-size image first, or None on failure. Favicons have 0 for both.
     """
+    loop = asyncio.get_event_loop()
     try:
-        image = Image.open(BytesIO(content))
-
-        # Validate image dimensions
-        if image.width < 10 or image.height < 10:
-            log_message(f"Image too small ({image.width}x{image.height}), skipping")
-            return None
-
-        output_buffer = BytesIO()
-
         if item_type == "story":
-            # Process story image - optimize memory by checking mode first
-            image.thumbnail((1280, 720))
-            if image.mode != "RGB":
-                image = image.convert("RGB")
-            image.save(
-                output_buffer, format="AVIF", optimize=True, quality=60, method=6
+            result = await loop.run_in_executor(
+                encode_pool,
+                encode_util.encode_story_variants,
+                content,
+                args.avif_tier,
+                () if args.no_variants else tuple(encode_util.VARIANT_BITS),
+                args.webp,
             )
-            s3_object_key = output_path + ".avif"
+            if result is not None:
+                variants, width, files = result
+                result = (variants, width, [(data, output_path + suffix) for suffix, data in files.items()])
         else:
-            # Process favicon
-            image = image.resize((32, 32))
-            image.save(output_buffer, format="ICO")
-            s3_object_key = output_path + ".ico"
-
-        output_buffer.seek(0)
-        return (output_buffer.getvalue(), s3_object_key)
-
+            data = await loop.run_in_executor(encode_pool, encode_util.encode_favicon, content)
+            result = (0, 0, [(data, output_path + ".ico")]) if data is not None else None
     except Exception as e:
         log_message(f"Failed to process image: {e}")
         return None
 
+    if result is None:
+        log_message(f"Image too small, skipping {output_path}")
+    return result
+
+
+async def upload_files_async(files: List[tuple]) -> bool:
+    """Upload all files of an image concurrently; True only if every one was stored."""
+    results = await asyncio.gather(*[
+        upload_to_storage_async(buffer_data, object_key) for buffer_data, object_key in files
+    ])
+    return all(results)
+
 
 async def upload_to_storage_async(buffer_data: bytes, object_key: str) -> bool:
     """
@@ -843,6 +933,52 @@ def _upload_to_s3(buffer_data: bytes, object_key: str):
     s3_client.upload_fileobj(buffer, bucket_name, object_key)
 
 
+async def copy_image_async(source_path: str, output_path: str, variants: int) -> bool:
+    """
+    Copy every file of a stored story image (see encode_util.variant_suffixes)
+    to another story's path; True only if all were copied.
+    """
+    results = await asyncio.gather(*[
+        copy_in_storage_async(source_path + suffix, output_path + suffix)
+        for suffix in encode_util.variant_suffixes(variants)
+    ])
+    return all(results)
+
+
+async def copy_in_storage_async(source_key: str, object_key: str) -> bool:
+    """
+    Copy an already stored image to another key, without downloading it (S3/R2
+    copies server-side).
+    """
+    try:
+        loop = asyncio.get_event_loop()
+        if USE_LOCAL_STORAGE:
+            await loop.run_in_executor(image_executor, _copy_local_file, source_key, object_key)
+        else:
+            await loop.run_in_executor(image_executor, _copy_s3_object, source_key, object_key)
+        log.debug(f"Copied {source_key} to {object_key}")
+        return True
+    except Exception as e:
+        log_message(f"Failed to copy {source_key} to {object_key}: {e}")
+        return False
+
+
+def _copy_local_file(source_key: str, object_key: str):
+    """Synchronous local file copy for thread pool execution"""
+    local_path = LOCAL_STORAGE_PATH / object_key
+    local_path.parent.mkdir(parents=True, exist_ok=True)
+    shutil.copyfile(LOCAL_STORAGE_PATH / source_key, local_path)
+
+
+def _copy_s3_object(source_key: str, object_key: str):
+    """Synchronous S3 copy for thread pool execution"""
+    s3_client.copy_object(
+        Bucket=bucket_name,
+        CopySource={"Bucket": bucket_name, "Key": source_key},
+        Key=object_key,
+    )
+
+
 async def download_and_convert_image(session: aiohttp.ClientSession, data: dict) -> list:
     """
     Download and process images (story images and favicons) with parallel uploads.
@@ -852,12 +988,13 @@ async def download_and_convert_image(session: aiohttp.ClientSession, data: dict)
         data: Dict with image types as keys, each containing 'url' and 'output_path'
 
     Returns:
-        List of dicts with 'type' and 'path' keys for successfully uploaded images
+        List of dicts with 'type', 'path' (of the full-size file), 'variants'
+        (stories.image_variants) and 'width' keys for successfully uploaded images
     """
     # Skip actual download/processing in dry-run mode
     if args.dry_run:
         # Return mock paths with type info for statistics tracking
-        return [{"type": item_type, "path": item_data["output_path"] + (".avif" if item_type == "story" else ".ico")}
+        return [{"type": item_type, "path": item_data["output_path"] + (".avif" if item_type == "story" else ".ico"), "variants": 0, "width": 0}
                 for item_type, item_data in data.items() if item_data.get("url")]
 
     # Download all images concurrently
@@ -877,8 +1014,7 @@ async def download_and_convert_image(session: aiohttp.ClientSession, data: dict)
     # Await all downloads concurrently
     download_results = await asyncio.gather(*download_tasks, return_exceptions=True)
 
-    # Process images in thread pool (CPU-bound work)
-    loop = asyncio.get_event_loop()
+    # Process images in the process pool (CPU-bound work)
     process_tasks = []
     process_items_info = []
 
@@ -887,15 +1023,7 @@ async def download_and_convert_image(session: aiohttp.ClientSession, data: dict)
             continue
 
         item_type, item_data = items_info[i]
-        # Run PIL processing in thread pool
-        task = loop.run_in_executor(
-            image_executor,
-            process_image_sync,
-            result,
-            item_type,
-            item_data["output_path"]
-        )
-        process_tasks.append(task)
+        process_tasks.append(encode_image(result, item_type, item_data["output_path"]))
         process_items_info.append(item_type)
 
     if not process_tasks:
@@ -912,11 +1040,13 @@ async def download_and_convert_image(session: aiohttp.ClientSession, data: dict)
         if isinstance(result, Exception) or result is None:
             continue
 
-        buffer_data, s3_object_key = result
-        upload_tasks.append(upload_to_storage_async(buffer_data, s3_object_key))
+        variants, width, files = result
+        upload_tasks.append(upload_files_async(files))
         upload_items_info.append({
             "type": process_items_info[i],
-            "path": s3_object_key
+            "path": files[0][1],
+            "variants": variants,
+            "width": width,
         })
 
     if not upload_tasks:
@@ -936,7 +1066,8 @@ async def download_and_convert_image(session: aiohttp.ClientSession, data: dict)
 
 async def update_story_image_url(stories_to_update: List[tuple]):
     """
-    Batch update story has_image flags.
+    Batch update story has_image flags, with the image_variants and image_width
+    stored along.
     """
     if not stories_to_update:
         return
@@ -945,7 +1076,7 @@ async def update_story_image_url(stories_to_update: List[tuple]):
     try:
         async with get_db_connection() as connection:
             async with connection.cursor() as cursor:
-                update_query = "UPDATE stories SET has_image = 1 WHERE id = %s"
+                update_query = "UPDATE stories SET has_image = 1, image_variants = %s, image_width = %s WHERE id = %s"
                 await cursor.executemany(update_query, stories_to_update)
             await connection.commit()
             log.debug(f"Updated {len(stories_to_update)} stories in DB")
@@ -972,6 +1103,35 @@ async def update_publisher_favicon(favicon_updates: List[tuple]):
         log_message(f"Error updating publisher favicons: {e}")
 
 
+async def download_feed_image(
+    session: aiohttp.ClientSession,
+    story: dict,
+    category_name: str
+) -> list:
+    """
+    Download the image the story's feed entry carried (stories.feed_image_url),
+    without fetching and parsing the story's page. Publishers without a favicon
+    get their site's /favicon.ico along with it.
+
+    Returns:
+        List of dicts with 'type' and 'path' keys, as download_and_convert_image
+    """
+    publisher = story["publisher"]
+    images = {
+        "story": {
+            "url": story["feed_image_url"],
+            "output_path": story_image_path(category_name, story["url_hash"]),
+        }
+    }
+    if not publisher["favicon_url"]:
+        images["favicon"] = {
+            "url": urljoin(publisher.get("site_url") or story["url"], "/favicon.ico"),
+            "output_path": f"favicons/{category_name}/{publisher['id']}",
+        }
+
+    return await download_and_convert_image(session, images)
+
+
 async def process_story(
     session: aiohttp.ClientSession,
     story: dict,
@@ -980,11 +1140,32 @@ async def process_story(
 ) -> Optional[Dict]:
     """
     Process a single story with semaphore for concurrency control.
+    Uses the image from the feed when there is one and scrapes the story's
+    page for og:image only when there isn't, or it couldn't be downloaded.
     Returns result dict with paths and story info, or None on failure.
     """
     async with semaphore:
         try:
+            feed_paths = []
+            if story.get("feed_image_url"):
+                feed_paths = await download_feed_image(session, story, category_name)
+                if any(path["type"] == "story" for path in feed_paths):
+                    stats.feed_images += 1
+                    return {
+                        "story": story,
+                        "paths": feed_paths
+                    }
+
+                stats.feed_image_fallbacks += 1
+                # Don't download a favicon that was just stored again
+                for path in feed_paths:
+                    story["publisher"]["favicon_url"] = f"{bucket_base_url}/{path['path']}"
+
             images_paths = await get_link_preview(session, story, "default", category_name)
+            if isinstance(images_paths, list):
+                images_paths = feed_paths + images_paths
+            elif feed_paths:
+                images_paths = feed_paths
 
             if not isinstance(images_paths, list) or not images_paths:
                 return None
@@ -1019,6 +1200,25 @@ async def process_category(session: aiohttp.ClientSession, category: dict):
     favicons_to_update = []
     favicon_database: Set[str] = set()
 
+    # Near-duplicates (same cluster_id) share one image: copy it from a story
+    # that already has one, and scrape only the first story of each new cluster
+    cluster_images = await fetch_cluster_images(
+        {story["cluster_id"] for story in stories if story.get("cluster_id")}
+    )
+    to_scrape = []
+    to_copy = []  # (story, source storage path, image_variants, image_width)
+    waiting = defaultdict(list)  # cluster_id -> stories waiting for the scraped image
+    for story in stories:
+        cluster_id = story.get("cluster_id")
+        if cluster_id in cluster_images:
+            to_copy.append((story, *cluster_images[cluster_id]))
+        elif cluster_id and cluster_id in waiting:
+            waiting[cluster_id].append(story)
+        else:
+            if cluster_id:
+                waiting[cluster_id] = []
+            to_scrape.append(story)
+
     log.debug(f"Starting async processing with {WORKERS} concurrent tasks for {category['name']}")
 
     # Semaphore to limit concurrency
@@ -1027,7 +1227,7 @@ async def process_category(session: aiohttp.ClientSession, category: dict):
     # Create all tasks
     tasks = [
         process_story(session, story, category["name"], semaphore)
-        for story in stories
+        for story in to_scrape
     ]
 
     total_updated = 0
@@ -1075,14 +1275,36 @@ async def process_category(session: aiohttp.ClientSession, category: dict):
             image_url = f"{bucket_base_url}/{image_path}"
 
             if image_type == "story":
-                stories_to_update.append((story["id"],))
+                variants, width = image_info.get("variants", 0), image_info.get("width", 0)
+                stories_to_update.append((variants, width, story["id"]))
                 stats.stories_updated += 1
+                source_path = story_image_path(category["name"], story["url_hash"])
+                for sibling in waiting.get(story.get("cluster_id"), []):
+                    to_copy.append((sibling, source_path, variants, width))
             elif image_type == "favicon":
                 favicons_to_update.append((image_url, story["publisher"]["id"]))
                 stats.favicons_updated += 1
 
             total_updated += 1
 
+    # Images of near-duplicates, copied within storage
+    if to_copy:
+        if args.dry_run:
+            copied = to_copy
+        else:
+            results = await asyncio.gather(*[
+                copy_image_async(source_path, story_image_path(category["name"], story["url_hash"]), variants)
+                for story, source_path, variants, _ in to_copy
+            ])
+            copied = [copy for copy, ok in zip(to_copy, results) if ok]
+
+        stats.stories_processed += len(to_copy)
+        stats.stories_updated += len(copied)
+        stats.images_reused += len(copied)
+        stats.downloads_failed += len(to_copy) - len(copied)
+        stories_to_update.extend((variants, width, story["id"]) for story, _, variants, width in copied)
+        total_updated += len(copied)
+
     # Batch update database (skip in dry-run mode)
     if not args.dry_run:
         await update_story_image_url(stories_to_update)
@@ -1128,7 +1350,12 @@ def print_summary():
   Favicons updated:      {stats.favicons_updated}
   Failed downloads:      {stats.downloads_failed}
   Proxy errors:          {stats.proxy_errors}
-  HEAD request skips:    {stats.head_request_skips}
+  Non-image skips:       {stats.non_image_skips}
+  Oversize skips:        {stats.oversize_skips}
+  Page KB read:          {stats.page_bytes_read // 1024}
+  Reused from clusters:  {stats.images_reused}
+  From feed (no scrape): {stats.feed_images}
+  Feed image fallbacks:  {stats.feed_image_fallbacks}
   Success rate:          {rate_str}
   Time elapsed:          {stats.elapsed_time()}
 {'='*50}
@@ -1149,6 +1376,7 @@ async def search_images():
 
     proxy_info = f"Proxies: {len(all_proxies)}" if USE_PROXIES else "Proxies: Disabled (direct connection)"
     log.info(f"Storage: {storage_mode} | Workers: {WORKERS} | Limit: {args.limit}/category")
+    log.info(f"Encoding: {args.encode_workers} processes | AVIF tier: {args.avif_tier}")
     log.info(f"{proxy_info} | Timeouts: connect={CONNECT_TIMEOUT}s, total={REQUEST_TIMEOUT}s")
 
     # Initialize database pool
@@ -1215,8 +1443,9 @@ async def search_images():
     # Close database pool
     await close_db_pool()
 
-    # Shutdown thread pool
+    # Shutdown thread and process pools
     image_executor.shutdown(wait=True)
+    encode_pool.shutdown(wait=True)
 
     # Print summary
     print_summary()
@@ -13,6 +13,7 @@ from . import (
     qol_util,
     input_sanitization,
     cloudflare_util,
+    rollup_util,
     config,
 )
 
@@ -219,6 +220,7 @@ def delete_account(email: str, token: str) -> bool:
     # These need explicit deletion because SQLAlchemy tries to handle relationships
     # at the ORM level before database CASCADE can occur
     friends_util.delete_all_friends(user.id)
+    rollup_util.uncount_user(extensions.db.session, user.id)
     models.UserStoryView.query.filter_by(user_id=user.id).delete()
     models.StoryReaction.query.filter_by(user_id=user.id).delete()
     models.CommentReaction.query.filter_by(user_id=user.id).delete()
@@ -0,0 +1,159 @@
+import json
+import os
+import time
+
+from collections import Counter
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple
+
+# Checkpoints older than this describe a run whose publishers are due again
+MAX_AGE = 6 * 3600
+
+# Seconds between two writes of the checkpoint file, at most
+SAVE_INTERVAL = 5.0
+
+
+class RunCheckpoint:
+    """
+    Progress of an ingestion run, kept in a small JSON file so a run that gets
+    killed can be resumed without fetching everything again.
+
+    It records the order categories were processed in, the publishers whose
+    feeds are done (written to the database, or failed) with their fetch
+    outcome, the publishers still in flight and the categories that are
+    complete. Writes are throttled to one per SAVE_INTERVAL seconds and replace
+    the file atomically.
+
+    Example:
+        >>> checkpoint = RunCheckpoint.load("/tmp/checkpoint.json", resume=False)
+        >>> checkpoint.start(7)
+        >>> checkpoint.finish(7, {"error": None, "latency": 0.4})
+        >>> checkpoint.is_done(7), checkpoint.outcome(7)
+        (True, {'error': None, 'latency': 0.4})
+        >>> checkpoint.clear()
+    """
+
+    def __init__(self, path: str, data: dict = None):
+        self.path = path
+        self.resumed = data is not None
+        data = data or {}
+        self.started_at = data.get("started_at") or datetime.now().isoformat(timespec="seconds")
+        self.category_order: List[int] = data.get("category_order", [])
+        self.completed_categories = set(data.get("completed_categories", []))
+        # JSON object keys are strings, publisher IDs are ints
+        self.done = {int(publisher_id): outcome for publisher_id, outcome in data.get("done", {}).items()}
+        self.in_flight = set(data.get("in_flight", []))
+        self._category_of = {}
+        self._remaining = Counter()
+        self._last_save = 0.0
+
+    @classmethod
+    def load(cls, path: str, resume: bool = True, max_age: float = MAX_AGE) -> "RunCheckpoint":
+        """
+        The checkpoint at `path` when resuming, or a fresh one. A missing,
+        corrupt or older than `max_age` seconds file also gives a fresh one.
+        """
+        if not resume:
+            return cls(path)
+
+        try:
+            if time.time() - os.path.getmtime(path) > max_age:
+                return cls(path)
+            with open(path, encoding="utf-8") as f:
+                return cls(path, json.load(f))
+        except (OSError, ValueError, TypeError, AttributeError):
+            return cls(path)
+
+    def order_categories(self, categories: list) -> list:
+        """
+        Sort (category_id, name) pairs into the order of the run being resumed,
+        categories it didn't know last. Remembers the resulting order.
+        """
+        position = {category_id: index for index, category_id in enumerate(self.category_order)}
+        categories = sorted(categories, key=lambda category: position.get(category[0], len(position)))
+        self.category_order = [category_id for category_id, _ in categories]
+        return categories
+
+    def plan(self, publisher_categories: dict):
+        """
+        {publisher_id: category_id} of the publishers this run fetches. A category
+        is complete once all of its planned publishers are done.
+        """
+        self._category_of = dict(publisher_categories)
+        self._remaining = Counter(self._category_of.values())
+
+    def is_done(self, publisher_id: int) -> bool:
+        return publisher_id in self.done
+
+    def outcome(self, publisher_id: int) -> Optional[dict]:
+        """The fetch outcome of a done publisher, None once it was saved to its health."""
+        return self.done.get(publisher_id)
+
+    def resumed_outcomes(self, publishers: list) -> Tuple[list, List[int]]:
+        """
+        Outcomes of the resumed run that still have to be folded into publisher
+        health, split in two: the done publishers among `publishers` (the ones
+        due now), with their outcome set as "fetch_outcome", and the IDs of the
+        other done publishers that have an outcome. A publisher that was fetched
+        fine usually isn't due again yet, so it has to be loaded by ID.
+        """
+        resumed = []
+        for publisher in publishers:
+            if self.is_done(publisher["id"]):
+                if self.outcome(publisher["id"]):
+                    publisher["fetch_outcome"] = self.outcome(publisher["id"])
+                resumed.append(publisher)
+
+        listed = {publisher["id"] for publisher in publishers}
+        missing = sorted(
+            publisher_id for publisher_id, outcome in self.done.items()
+            if outcome and publisher_id not in listed
+        )
+        return resumed, missing
+
+    def start(self, publisher_id: int):
+        self.in_flight.add(publisher_id)
+
+    def finish(self, publisher_id: int, outcome: dict = None):
+        self.in_flight.discard(publisher_id)
+        self.done[publisher_id] = outcome
+
+        category_id = self._category_of.pop(publisher_id, None)
+        if category_id is not None:
+            self._remaining[category_id] -= 1
+            if not self._remaining[category_id]:
+                self.completed_categories.add(category_id)
+        self.save()
+
+    def forget_outcomes(self, publisher_ids: Iterable[int]):
+        """Keep publishers done but drop their outcomes, e.g. once their health is saved."""
+        for publisher_id in publisher_ids:
+            if publisher_id in self.done:
+                self.done[publisher_id] = None
+
+    def save(self, force: bool = False):
+        if not force and time.monotonic() - self._last_save < SAVE_INTERVAL:
+            return
+
+        data = {
+            "started_at": self.started_at,
+            "category_order": self.category_order,
+            "completed_categories": sorted(self.completed_categories),
+            "done": self.done,
+            "in_flight": sorted(self.in_flight),
+        }
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
+        self._last_save = time.monotonic()
+
+    def clear(self):
+        """Forget the run, once it finished."""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
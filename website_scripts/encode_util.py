@@ -0,0 +1,173 @@
+from io import BytesIO
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from PIL import Image
+
+# Story images are stored as AVIF no larger than this
+STORY_IMAGE_SIZE = (1280, 720)
+FAVICON_SIZE = (32, 32)
+
+# Images with a side shorter than this are tracking pixels or spacers
+MIN_IMAGE_SIDE = 10
+
+# JPEGs are decoded at a reduced scale still this many times the target size,
+# so resampling down to the target keeps its quality (Image.thumbnail's
+# reducing_gap default)
+DRAFT_GAP = 2
+
+# AVIF encoder settings per effort tier. 'speed' is libavif's 0 (slowest, most
+# thorough) to 10 (fastest). Slower speeds keep more detail at the same quality;
+# below 6 an encode costs over ten times as much CPU.
+AVIF_TIERS = {
+    "fast": {"quality": 60, "speed": 8},
+    "balanced": {"quality": 60, "speed": 6},
+    "best": {"quality": 60, "speed": 5},
+}
+DEFAULT_AVIF_TIER = "balanced"
+
+# Narrower copies of story images, for srcset. Each has a fixed bit in
+# stories.image_variants; the full-size image is always stored and has none.
+VARIANT_BITS = {320: 1, 640: 2}
+
+# stories.image_variants bit set when every stored size also has a WebP copy
+WEBP_BIT = 128
+
+WEBP_SETTINGS = {"quality": 70, "method": 4}
+
+# Encoder threads per image. Images are encoded in a process pool with one
+# process per core, so more threads per encode would only oversubscribe the CPUs.
+AVIF_THREADS = 1
+
+
+def fit_size(size: Tuple[int, int], box: Tuple[int, int]) -> Tuple[int, int]:
+    """
+    Size of an image scaled down (never up) to fit in `box`, keeping its aspect ratio.
+
+    Example:
+        >>> fit_size((4000, 3000), (1280, 720))
+        (960, 720)
+        >>> fit_size((640, 480), (1280, 720))
+        (640, 480)
+    """
+    width, height = size
+    scale = min(box[0] / width, box[1] / height, 1)
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def open_image(content: bytes, box: Tuple[int, int]) -> Optional[Image.Image]:
+    """
+    Open an image that will be scaled down to fit `box`. JPEGs are set up to
+    decode at the smallest reduced size (1/2, 1/4 or 1/8) that still covers
+    DRAFT_GAP times the scaled image, as Image.thumbnail would, and before any
+    other step (e.g. a mode conversion) can force a full decode.
+    Returns None for images with a side below MIN_IMAGE_SIDE.
+    """
+    image = Image.open(BytesIO(content))
+    if image.width < MIN_IMAGE_SIDE or image.height < MIN_IMAGE_SIDE:
+        return None
+    width, height = fit_size(image.size, box)
+    image.draft("RGB", (width * DRAFT_GAP, height * DRAFT_GAP))
+    return image
+
+
+def variant_suffix(width: Optional[int] = None, image_format: str = "avif") -> str:
+    """
+    Storage key suffix of a story image file: the full-size image for no `width`.
+
+    Example:
+        >>> variant_suffix(), variant_suffix(320), variant_suffix(640, "webp")
+        ('.avif', '-320.avif', '-640.webp')
+    """
+    return f"-{width}.{image_format}" if width else f".{image_format}"
+
+
+def variant_widths(variants: int) -> List[int]:
+    """
+    Widths of the narrower copies recorded in a stories.image_variants value.
+
+    Example:
+        >>> variant_widths(3 | WEBP_BIT), variant_widths(0)
+        ([320, 640], [])
+    """
+    return [width for width, bit in VARIANT_BITS.items() if variants & bit]
+
+
+def variant_suffixes(variants: int) -> List[str]:
+    """
+    Suffixes of every file stored for a story image, full size first.
+
+    Example:
+        >>> variant_suffixes(1 | WEBP_BIT)
+        ['.avif', '-320.avif', '.webp', '-320.webp']
+    """
+    formats = ("avif", "webp") if variants & WEBP_BIT else ("avif",)
+    return [
+        variant_suffix(width, image_format)
+        for image_format in formats
+        for width in [None] + variant_widths(variants)
+    ]
+
+
+def encode_story_variants(
+    content: bytes,
+    tier: str = DEFAULT_AVIF_TIER,
+    widths: Iterable[int] = tuple(VARIANT_BITS),
+    webp: bool = False,
+) -> Optional[Tuple[int, int, Dict[str, bytes]]]:
+    """
+    Story image as AVIF, scaled down to fit STORY_IMAGE_SIZE, plus narrower
+    copies for srcset, all from a single decode. Runs in a worker process;
+    raises for bodies Pillow can't decode.
+
+    Args:
+        content: Downloaded image bytes
+        tier: Key of AVIF_TIERS
+        widths: Variant widths to make (keys of VARIANT_BITS). Widths the
+            full-size image doesn't exceed are skipped.
+        webp: Also store a WebP copy of every size, for browsers without AVIF
+
+    Returns:
+        (stories.image_variants value, width of the full-size image,
+        {variant_suffix: encoded bytes}), or None when the image is too small to
+        be a story image
+    """
+    image = open_image(content, STORY_IMAGE_SIZE)
+    if image is None:
+        return None
+    image.thumbnail(STORY_IMAGE_SIZE)
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+
+    sizes = {None: image}
+    variants = WEBP_BIT if webp else 0
+    for width in sorted(widths):
+        if width < image.width:
+            sizes[width] = image.resize((width, max(1, round(image.height * width / image.width))))
+            variants |= VARIANT_BITS[width]
+
+    files = {}
+    for width, sized in sizes.items():
+        output = BytesIO()
+        sized.save(output, format="AVIF", max_threads=AVIF_THREADS, **AVIF_TIERS[tier])
+        files[variant_suffix(width)] = output.getvalue()
+        if webp:
+            output = BytesIO()
+            sized.save(output, format="WEBP", **WEBP_SETTINGS)
+            files[variant_suffix(width, "webp")] = output.getvalue()
+    return variants, image.width, files
+
+
+def encode_story_image(content: bytes, tier: str = DEFAULT_AVIF_TIER) -> Optional[bytes]:
+    """Full-size story image only, as AVIF (see encode_story_variants)."""
+    result = encode_story_variants(content, tier, widths=())
+    return result[2][variant_suffix()] if result else None
+
+
+def encode_favicon(content: bytes) -> Optional[bytes]:
+    """Favicon as a FAVICON_SIZE ICO, or None when the image is too small."""
+    image = open_image(content, FAVICON_SIZE)
+    if image is None:
+        return None
+    output = BytesIO()
+    image.resize(FAVICON_SIZE).save(output, format="ICO")
+    return output.getvalue()
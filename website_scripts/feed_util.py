@@ -0,0 +1,184 @@
+import re
+
+from typing import Optional
+from urllib.parse import urljoin, urlsplit
+
+# Bytes looked at to decide whether a body is a feed at all
+SNIFF_SIZE = 1024
+
+# Root elements of the formats feedparser understands (RSS 0.9x/2.0, Atom, RSS 1.0)
+FEED_ROOTS = {"rss", "feed", "rdf", "channel"}
+
+# Closing tags that make a feed cut after its last complete entry well-formed again
+ROOT_CLOSERS = {
+    "rss": b"</channel></rss>",
+    "channel": b"</channel>",
+    "rdf": b"</rdf:RDF>",
+    "feed": b"</feed>",
+}
+
+# Content types no feed is served as
+BINARY_CONTENT_TYPES = (
+    "image/", "audio/", "video/", "font/",
+    "application/pdf", "application/zip", "application/gzip", "application/x-gzip",
+)
+
+# Extensions that mark an image when media:content or an enclosure doesn't declare a type
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".gif", ".webp", ".avif")
+
+# Longest image URL kept (stories.feed_image_url)
+MAX_IMAGE_URL_LENGTH = 512
+
+_BOM = b"\xef\xbb\xbf"
+_UTF16_BOMS = (b"\xff\xfe", b"\xfe\xff")
+
+# XML declaration, processing instructions, comments and non-HTML doctypes before the root
+_PROLOG = re.compile(rb"\s*(?:<\?.*?\?>|<!--.*?-->|<!DOCTYPE\s+(?!html)[^>]*>)", re.S | re.I)
+_ROOT = re.compile(rb"\s*<([A-Za-z_][\w.:-]*)")
+_ENTRY_END = re.compile(rb"</(?:[\w.-]+:)?(?:item|entry)\s*>", re.I)
+
+
+def sniff_feed(head: bytes, content_type: str = "") -> Optional[str]:
+    """
+    Tells from the first bytes of a response whether it can be a feed, so HTML
+    pages, images and error documents are dropped without reading them whole.
+
+    Args:
+        head: The first SNIFF_SIZE bytes of the body, or all of it if shorter.
+        content_type: The response's Content-Type header.
+
+    Returns:
+        str: The feed's root element ("rss", "feed", "rdf" or "channel"), "json"
+            for JSON Feed, or "xml" when the root is past `head`. None when it
+            isn't a feed.
+
+    Example:
+        >>> sniff_feed(b'<?xml version="1.0"?>\\n<rss version="2.0"><channel>')
+        'rss'
+        >>> sniff_feed(b'<feed xmlns="http://www.w3.org/2005/Atom">', "application/atom+xml")
+        'feed'
+        >>> sniff_feed(b"<!DOCTYPE html><html><head>") is None
+        True
+        >>> sniff_feed(b"\\x89PNG\\r\\n", "image/png") is None
+        True
+    """
+    if content_type.lower().strip().startswith(BINARY_CONTENT_TYPES):
+        return None
+
+    if head.startswith(_UTF16_BOMS):
+        # Rare, and not worth decoding here; feedparser will tell
+        return "xml"
+
+    head = head[len(_BOM):] if head.startswith(_BOM) else head
+    if head.lstrip().startswith(b"{"):
+        return "json"
+
+    position = 0
+    while True:
+        prolog = _PROLOG.match(head, position)
+        if not prolog:
+            break
+        position = prolog.end()
+
+    root = _ROOT.match(head, position)
+    if not root:
+        # Only whitespace or an unfinished prolog so far
+        rest = head[position:].lstrip()
+        unfinished = rest.startswith((b"<?", b"<!--")) or (
+            rest[:9].upper() == b"<!DOCTYPE" and b"HTML" not in rest[:16].upper()
+        )
+        return "xml" if not rest or unfinished else None
+
+    name = root.group(1).decode("ascii", "replace").lower().rsplit(":", 1)[-1]
+    return name if name in FEED_ROOTS else None
+
+
+def truncate_feed(content: bytes, root: str) -> Optional[bytes]:
+    """
+    Cut a feed that exceeded the size limit after its last complete entry and
+    close it again, so it parses into its first entries.
+
+    Args:
+        content: The first bytes of the feed, up to the size limit.
+        root: Root element as returned by sniff_feed.
+
+    Returns:
+        bytes: The shortened feed, or None when it has no complete entry or is a
+            JSON feed.
+
+    Example:
+        >>> truncate_feed(b"<rss><channel><item>a</item><item>b</item><item>c", "rss")
+        b'<rss><channel><item>a</item><item>b</item></channel></rss>'
+        >>> truncate_feed(b"<rss><channel><title>Long", "rss") is None
+        True
+    """
+    if root == "json":
+        return None
+
+    last_end = None
+    for last_end in _ENTRY_END.finditer(content):
+        pass
+    if last_end is None:
+        return None
+
+    return content[:last_end.end()] + ROOT_CLOSERS.get(root, b"")
+
+
+def _width(item: dict) -> int:
+    try:
+        return int(item.get("width") or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _is_image(item: dict, url: str) -> bool:
+    if item.get("medium"):
+        return item["medium"] == "image"
+    if item.get("type"):
+        return item["type"].lower().startswith("image/")
+    return urlsplit(url).path.lower().endswith(IMAGE_EXTENSIONS)
+
+
+def feed_image_url(entry: dict, base_url: str = "") -> Optional[str]:
+    """
+    The image a feed entry carries itself, so it needn't be scraped from the
+    story's page: the widest media:content image, else an image enclosure,
+    else the widest media:thumbnail.
+
+    Args:
+        entry: A feedparser entry (or a dict shaped like one).
+        base_url: URL relative image URLs are resolved against, e.g. the story link.
+
+    Returns:
+        str: An absolute http(s) image URL, or None when the entry has none.
+
+    Example:
+        >>> feed_image_url({"media_content": [
+        ...     {"url": "https://e.com/s.jpg", "medium": "image", "width": "300"},
+        ...     {"url": "/l.jpg", "medium": "image", "width": "1200"},
+        ...     {"url": "https://e.com/v.mp4", "medium": "video", "width": "1920"}]},
+        ...     "https://e.com/story")
+        'https://e.com/l.jpg'
+        >>> feed_image_url({"enclosures": [{"href": "https://e.com/a.mp3", "type": "audio/mpeg"}]}) is None
+        True
+    """
+    contents = sorted(entry.get("media_content") or [], key=_width, reverse=True)
+    thumbnails = sorted(entry.get("media_thumbnail") or [], key=_width, reverse=True)
+    candidates = [
+        *((item.get("url"), item) for item in contents),
+        *((item.get("href"), item) for item in entry.get("enclosures") or []),
+        # A thumbnail is an image whatever it declares
+        *((item.get("url"), {"medium": "image"}) for item in thumbnails),
+    ]
+
+    for url, item in candidates:
+        if not url:
+            continue
+        url = urljoin(base_url, url.strip())
+        if (
+            urlsplit(url).scheme in ("http", "https")
+            and len(url) <= MAX_IMAGE_URL_LENGTH
+            and _is_image(item, url)
+        ):
+            return url
+    return None
@@ -0,0 +1,150 @@
+import heapq
+import mmap
+import os
+
+from typing import Iterable, Iterator, List, Set, Tuple
+
+# File layout: 8-byte magic header followed by sorted, unique 16-byte MD5 digests.
+HEADER = b"URLHIDX1"
+RECORD_SIZE = 16
+
+
+class UrlHashIndex:
+    """
+    Persistent, memory-mapped set of story url_hash values.
+
+    The file is an exact sorted array, so lookups are a binary search over the
+    mmap and cost no memory beyond the pages the OS keeps cached. Hashes added
+    during a run live in an in-memory set until save() merges them into a new
+    file, which replaces the old one atomically.
+
+    Example:
+        >>> index = UrlHashIndex.load("/tmp/url_hashes.bin")
+        >>> index.add([b"0123456789abcdef"])
+        >>> b"0123456789abcdef" in index
+        True
+        >>> index.save()
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+        self._mmap = None
+        self._count = 0
+        self._pending: Set[bytes] = set()
+
+    @classmethod
+    def load(cls, path: str) -> "UrlHashIndex":
+        """Open the index at `path`. A missing or corrupt file gives an empty index."""
+        index = cls(path)
+        index._open()
+        return index
+
+    @property
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def __len__(self) -> int:
+        return self._count + len(self._pending)
+
+    def __contains__(self, url_hash: bytes) -> bool:
+        return url_hash in self._pending or self._search(url_hash)
+
+    def partition(self, url_hashes: Iterable[bytes]) -> Tuple[Set[bytes], List[bytes]]:
+        """
+        Split hashes into (known, unknown). Known hashes are in the index; unknown
+        ones still have to be confirmed against the database.
+        """
+        known, unknown = set(), []
+        for url_hash in url_hashes:
+            if url_hash in self:
+                known.add(url_hash)
+            else:
+                unknown.append(url_hash)
+        return known, unknown
+
+    def add(self, url_hashes: Iterable[bytes]):
+        """Remember hashes in memory; they are written to disk by save()."""
+        self._pending.update(h for h in url_hashes if len(h) == RECORD_SIZE)
+
+    def save(self):
+        """Merge pending hashes into the on-disk array."""
+        if not self._pending:
+            return
+
+        pending = sorted(self._pending)
+        self._write(heapq.merge(self._iter_records(), pending))
+        self._pending.clear()
+
+    def rebuild(self, url_hashes: Iterable[bytes]):
+        """Replace the whole index with `url_hashes` (e.g. after pruning old stories)."""
+        self._pending.clear()
+        self._write(iter(sorted(set(h for h in url_hashes if len(h) == RECORD_SIZE))))
+
+    def close(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._count = 0
+
+    def _open(self):
+        self.close()
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return
+
+        payload = size - len(HEADER)
+        if payload <= 0 or payload % RECORD_SIZE:
+            return
+
+        self._file = open(self.path, "rb")
+        if self._file.read(len(HEADER)) != HEADER:
+            self.close()
+            return
+
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._count = payload // RECORD_SIZE
+
+    def _record(self, position: int) -> bytes:
+        offset = len(HEADER) + position * RECORD_SIZE
+        return self._mmap[offset:offset + RECORD_SIZE]
+
+    def _search(self, url_hash: bytes) -> bool:
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            record = self._record(middle)
+            if record < url_hash:
+                low = middle + 1
+            elif record > url_hash:
+                high = middle
+            else:
+                return True
+        return False
+
+    def _iter_records(self) -> Iterator[bytes]:
+        for position in range(self._count):
+            yield self._record(position)
+
+    def _write(self, sorted_hashes: Iterator[bytes]):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        tmp_path = f"{self.path}.tmp"
+        previous = None
+        with open(tmp_path, "wb") as f:
+            f.write(HEADER)
+            for url_hash in sorted_hashes:
+                if url_hash != previous:
+                    f.write(url_hash)
+                    previous = url_hash
+
+        # Unmap before replacing so the old file can be released
+        self.close()
+        os.replace(tmp_path, self.path)
+        self._open()
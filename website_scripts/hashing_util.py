@@ -149,6 +149,16 @@ def string_to_md5_binary(input_string: str) -> bytes:
     return hashlib.md5(input_string.encode(), usedforsecurity=False).digest()
 
 
+def bytes_to_md5_binary(data: bytes) -> bytes:
+    """Hash raw bytes (e.g. an HTTP response body) to a binary MD5 digest
+
+    Example:
+        >>> print(bytes_to_md5_binary(b"hello"))
+        b']A@*\\xbcK*v\\xb9q\\x9d\\x91\\x10\\x17\\xc5\\x92'
+    """
+    return hashlib.md5(data, usedforsecurity=False).digest()
+
+
 def string_to_md5_hex(input_string: str) -> str:
     """
 
@@ -0,0 +1,167 @@
+import os
+import re
+
+from functools import lru_cache
+from typing import List, Tuple
+
+import numpy as np
+
+# Matches tags.tag VARCHAR(30)
+TAG_MAX_LENGTH = 30
+MIN_WORD_LENGTH = 3
+
+# Score multipliers for likely names and for bigrams that occur only once
+PROPER_WEIGHT = 1.5
+BIGRAM_WEIGHT = 0.8
+
+# Recent stories of a category passed as `context` with each new batch, so the
+# IDF values cover the category even when a batch holds only a few stories
+CONTEXT_SIZE = 200
+
+# Punctuation that ends a phrase; bigrams never span it
+PHRASE_SPLIT = re.compile(r"[.,;:!?()\[\]{}\"“”«»|/\\–—]+")
+WORD = re.compile(r"[^\W\d_]+(?:['’-][^\W\d_]+)*")
+
+
+@lru_cache(maxsize=None)
+def load_stopwords(lang_code: str) -> frozenset:
+    """
+    Stopwords for a language, taken from the lists that ship with YAKE so both
+    engines agree on what is never a keyword. Unknown languages fall back to
+    YAKE's language-neutral list.
+    """
+    import yake
+
+    directory = os.path.join(os.path.dirname(yake.__file__), "core", "StopwordsList")
+    path = os.path.join(directory, f"stopwords_{(lang_code or 'en')[:2].lower()}.txt")
+    if not os.path.exists(path):
+        path = os.path.join(directory, "stopwords_noLang.txt")
+
+    try:
+        with open(path, encoding="utf-8") as f:
+            words = f.read().lower().split()
+    except UnicodeDecodeError:
+        with open(path, encoding="ISO-8859-1") as f:
+            words = f.read().lower().split()
+    except OSError:
+        words = []
+    return frozenset(words)
+
+
+def extract_candidates(text: str, stopwords: frozenset) -> List[Tuple[str, str, int, bool]]:
+    """
+    Candidate keywords of a text as (key, surface, phrase_index, proper) tuples:
+    every non-stopword and every pair of adjacent non-stopwords within a phrase.
+    `proper` marks capitalized candidates that don't just open a phrase, which
+    are likely names.
+
+    Example:
+        >>> extract_candidates("Bank of Japan raises rates", frozenset({"of", "raises"}))
+        [('bank', 'Bank', 0, False), ('japan', 'Japan', 0, True), ('rates', 'rates', 0, False)]
+    """
+    candidates = []
+    for phrase_index, phrase in enumerate(PHRASE_SPLIT.split(text)):
+        previous = None
+        for position, surface in enumerate(WORD.findall(phrase)):
+            key = surface.lower()
+            if len(key) < MIN_WORD_LENGTH or key in stopwords:
+                previous = None
+                continue
+
+            capitalized = surface[0].isupper()
+            if len(key) <= TAG_MAX_LENGTH:
+                candidates.append((key, surface, phrase_index, capitalized and position > 0))
+            if previous:
+                bigram_surface = f"{previous[1]} {surface}"
+                if len(bigram_surface) <= TAG_MAX_LENGTH:
+                    candidates.append((
+                        f"{previous[0]} {key}", bigram_surface, phrase_index,
+                        capitalized and previous[2],
+                    ))
+            previous = (key, surface, capitalized)
+    return candidates
+
+
+def extract_keywords_batch(texts_with_langs: list, top_n: int = 5, context: list = ()) -> List[tuple]:
+    """
+    Batch keyword extraction with TF-IDF over all texts at once, scored with NumPy.
+
+    A candidate's weight in a text is its term frequency, with earlier phrases
+    (usually the title) and likely names counting more, times its inverse document
+    frequency across the batch. Bigrams that recur in the batch get a bonus for how
+    often their two words appear together rather than apart. Keywords never share a
+    word with a better-scored one. Meant as a much cheaper stand-in for YAKE. IDF
+    needs many documents to be useful, so pass a whole category's stories at once,
+    or a category's recent stories as `context`.
+
+    Args:
+        texts_with_langs: list of (text, lang_code) tuples.
+        top_n: Keywords per text.
+        context: More (text, lang_code) tuples that only count towards document
+            frequencies and bigram co-occurrence. No keywords are returned for them.
+
+    Returns:
+        list: One tuple of keywords per text, best first, in the original casing.
+    """
+    vocabulary = {}
+    doc_ids, term_ids, weights = [], [], []
+    surfaces = {}
+
+    for doc_id, (text, lang_code) in enumerate(list(texts_with_langs) + list(context)):
+        for key, surface, phrase_index, proper in extract_candidates(text or "", load_stopwords(lang_code)):
+            term_id = vocabulary.setdefault(key, len(vocabulary))
+            doc_ids.append(doc_id)
+            term_ids.append(term_id)
+            weights.append((1 + 1 / (1 + phrase_index)) * (PROPER_WEIGHT if proper else 1))
+            surfaces.setdefault((doc_id, term_id), surface)
+
+    results = [tuple() for _ in texts_with_langs]
+    if not vocabulary:
+        return results
+
+    vocabulary_size = len(vocabulary)
+    doc_ids = np.asarray(doc_ids, dtype=np.int64)
+    term_ids = np.asarray(term_ids, dtype=np.int64)
+    weights = np.asarray(weights, dtype=np.float64)
+
+    # Term frequency per (doc, term) pair
+    pairs, inverse = np.unique(doc_ids * vocabulary_size + term_ids, return_inverse=True)
+    term_frequency = np.bincount(inverse, weights=weights)
+    pair_docs = pairs // vocabulary_size
+    pair_terms = pairs % vocabulary_size
+
+    document_frequency = np.bincount(pair_terms, minlength=vocabulary_size)
+    idf = np.log((1 + len(texts_with_langs) + len(context)) / (1 + document_frequency)) + 1
+
+    # Co-occurrence of recurring bigrams: count(a b) / sqrt(count(a) * count(b))
+    term_totals = np.bincount(term_ids, minlength=vocabulary_size).astype(np.float64)
+    keys = list(vocabulary)
+    boost = np.ones(vocabulary_size)
+    bigram_ids = np.array([term_id for term_id, key in enumerate(keys) if " " in key], dtype=np.int64)
+    if len(bigram_ids):
+        parts = np.array(
+            [[vocabulary[word] for word in keys[term_id].split(" ")] for term_id in bigram_ids],
+            dtype=np.int64,
+        )
+        cohesion = term_totals[bigram_ids] / np.sqrt(term_totals[parts[:, 0]] * term_totals[parts[:, 1]])
+        boost[bigram_ids] = BIGRAM_WEIGHT + cohesion * (term_totals[bigram_ids] > 1)
+
+    scores = term_frequency * idf[pair_terms] * boost[pair_terms]
+
+    # Best candidates first within each document
+    order = np.lexsort((-scores, pair_docs))
+    bounds = np.searchsorted(pair_docs[order], np.arange(len(texts_with_langs) + 1))
+
+    for doc_id, (start, end) in enumerate(zip(bounds[:-1], bounds[1:])):
+        chosen, covered = [], set()
+        for term_id in pair_terms[order[start:end]]:
+            words = keys[term_id].split(" ")
+            if covered.intersection(words):
+                continue
+            chosen.append(surfaces[(doc_id, term_id)])
+            covered.update(words)
+            if len(chosen) == top_n:
+                break
+        results[doc_id] = tuple(chosen)
+
+    return results
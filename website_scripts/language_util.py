@@ -0,0 +1,125 @@
+import hashlib
+
+from collections import Counter, OrderedDict, defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from langdetect import DetectorFactory, detect as lang_detect
+
+# langdetect is randomized by default; a fixed seed makes results repeatable
+DetectorFactory.seed = 0
+
+DEFAULT_LANGUAGE = "en"
+
+# A publisher's prior is trusted once it has this many stories...
+PRIOR_MIN_STORIES = 20
+# ...and this share of them are in its most common language
+PRIOR_MIN_SHARE = 0.95
+
+MEMO_SIZE = 50_000
+
+
+def text_key(text: str) -> bytes:
+    """Binary MD5 of a text, used as the memo key.
+
+    Example:
+        >>> len(text_key("hello"))
+        16
+    """
+    return hashlib.md5(text.encode("utf-8", "ignore"), usedforsecurity=False).digest()
+
+
+def detect_languages(texts: List[str]) -> List[str]:
+    """
+    Detects the language of each text. Synchronous, meant to run in a process pool.
+
+    Example:
+        >>> detect_languages(["This is written in English.", ""])
+        ['en', 'en']
+    """
+    results = []
+    for text in texts:
+        try:
+            results.append(lang_detect(text))
+        except Exception:
+            results.append(DEFAULT_LANGUAGE)
+    return results
+
+
+class LanguageResolver:
+    """
+    Resolves story languages with as little detection as possible.
+
+    Most publishers always publish in the same language, so once a publisher has
+    enough stories that overwhelmingly share one language, that language is used
+    without running detection. Texts seen before are answered from a bounded memo.
+    Everything else has to be detected by the caller (see detect_languages) and
+    reported back with remember().
+
+    Example:
+        >>> resolver = LanguageResolver()
+        >>> resolver.observe(1, "pt", 30)
+        >>> resolver.resolve(1, "Qualquer texto")
+        'pt'
+        >>> resolver.resolve(2, "Some text") is None
+        True
+        >>> resolver.remember(2, "Some text", "en")
+        >>> resolver.resolve(2, "Some text")
+        'en'
+    """
+
+    def __init__(self, memo_size: int = MEMO_SIZE):
+        self.memo_size = memo_size
+        self._memo: "OrderedDict[bytes, str]" = OrderedDict()
+        self._counts: Dict[int, Counter] = defaultdict(Counter)
+        self._priors: Dict[int, Optional[str]] = {}
+        self.stats = {"prior_hits": 0, "memo_hits": 0, "detected": 0}
+
+    @classmethod
+    def from_history(cls, rows: Iterable[Tuple[int, str, int]], **kwargs) -> "LanguageResolver":
+        """Build a resolver from (publisher_id, lang, story_count) rows."""
+        resolver = cls(**kwargs)
+        for publisher_id, lang, count in rows:
+            resolver.observe(publisher_id, lang, count)
+        return resolver
+
+    def observe(self, publisher_id: int, lang: str, count: int = 1):
+        """Count `count` stories of `publisher_id` in `lang` towards its prior."""
+        if not lang:
+            return
+        self._counts[publisher_id][lang] += count
+        self._priors.pop(publisher_id, None)
+
+    def prior(self, publisher_id: int) -> Optional[str]:
+        """The publisher's language, if its history is confident enough."""
+        if publisher_id not in self._priors:
+            counts = self._counts.get(publisher_id)
+            lang = None
+            if counts:
+                top_lang, top_count = counts.most_common(1)[0]
+                total = sum(counts.values())
+                if total >= PRIOR_MIN_STORIES and top_count / total >= PRIOR_MIN_SHARE:
+                    lang = top_lang
+            self._priors[publisher_id] = lang
+        return self._priors[publisher_id]
+
+    def resolve(self, publisher_id: int, text: str) -> Optional[str]:
+        """Language from the prior or the memo, or None if it has to be detected."""
+        lang = self.prior(publisher_id)
+        if lang:
+            self.stats["prior_hits"] += 1
+            return lang
+
+        key = text_key(text)
+        lang = self._memo.get(key)
+        if lang:
+            self._memo.move_to_end(key)
+            self.stats["memo_hits"] += 1
+        return lang
+
+    def remember(self, publisher_id: int, text: str, lang: str):
+        """Record a detection result in the memo and the publisher's counts."""
+        self.stats["detected"] += 1
+        self._memo[text_key(text)] = lang
+        if len(self._memo) > self.memo_size:
+            self._memo.popitem(last=False)
+        self.observe(publisher_id, lang)
@@ -0,0 +1,229 @@
+import asyncio
+import fcntl
+import json
+import os
+import time
+
+from website_scripts import scheduler_util
+
+# Seconds a lease lives without a heartbeat; a dead node's shards are taken over after this
+LEASE_TTL = 60
+
+# Heartbeats per LEASE_TTL
+HEARTBEATS_PER_TTL = 3
+
+# Seconds a finished shard stays claimed. Its publishers' next polls are at least
+# MIN_POLL_INTERVAL away, so a node planning with an older list of due publishers
+# can't fetch them again before they are due anyway.
+SHARD_COOLDOWN = scheduler_util.MIN_POLL_INTERVAL
+
+KEY_PREFIX = "search_news:shard:"
+
+# Compare-and-set scripts: only the lease's holder may extend, replace or drop it
+_RENEW_SCRIPT = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("PEXPIRE", KEYS[1], ARGV[2])
+end
+return 0
+"""
+_REPLACE_SCRIPT = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    redis.call("SET", KEYS[1], ARGV[2], "PX", ARGV[3])
+    return 1
+end
+return 0
+"""
+_RELEASE_SCRIPT = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("DEL", KEYS[1])
+end
+return 0
+"""
+
+
+def shard_of(category_id: int, publisher_id: int, shards_per_category: int = 1) -> str:
+    """
+    Shard a publisher belongs to: its category, split into `shards_per_category`
+    parts by publisher ID. Every node computes the same shards.
+
+    Example:
+        >>> shard_of(12, 345, 4)
+        '12.1'
+    """
+    return f"{category_id}.{publisher_id % max(1, shards_per_category)}"
+
+
+class RedisLeaseStore:
+    """Leases as Redis keys with a TTL, shared by every ingestion node."""
+
+    def __init__(self, url: str):
+        import redis.asyncio
+
+        self.redis = redis.asyncio.from_url(url, decode_responses=True)
+
+    async def acquire(self, key: str, owner: str, ttl: float) -> bool:
+        return bool(await self.redis.set(key, owner, nx=True, px=int(ttl * 1000)))
+
+    async def renew(self, key: str, owner: str, ttl: float) -> bool:
+        return bool(await self.redis.eval(_RENEW_SCRIPT, 1, key, owner, int(ttl * 1000)))
+
+    async def replace(self, key: str, owner: str, value: str, ttl: float) -> bool:
+        return bool(await self.redis.eval(_REPLACE_SCRIPT, 1, key, owner, value, int(ttl * 1000)))
+
+    async def release(self, key: str, owner: str) -> bool:
+        return bool(await self.redis.eval(_RELEASE_SCRIPT, 1, key, owner))
+
+    async def close(self):
+        await self.redis.aclose()
+
+
+class LocalLeaseStore:
+    """
+    Stand-in for RedisLeaseStore that keeps leases in a JSON file, locked with
+    flock, so several ingestion processes can share shards on one machine
+    without Redis (development and testing).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _update(self, change):
+        """Run `change(leases, now)` on the live leases under an exclusive lock."""
+        with open(f"{self.path}.lock", "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            now = time.time()
+            try:
+                with open(self.path, encoding="utf-8") as f:
+                    leases = {key: lease for key, lease in json.load(f).items() if lease[1] > now}
+            except (OSError, ValueError):
+                leases = {}
+
+            result = change(leases, now)
+
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(leases, f)
+            os.replace(tmp_path, self.path)
+            return result
+
+    async def acquire(self, key: str, owner: str, ttl: float) -> bool:
+        def change(leases, now):
+            if key in leases:
+                return False
+            leases[key] = [owner, now + ttl]
+            return True
+
+        return self._update(change)
+
+    async def renew(self, key: str, owner: str, ttl: float) -> bool:
+        return await self.replace(key, owner, owner, ttl)
+
+    async def replace(self, key: str, owner: str, value: str, ttl: float) -> bool:
+        def change(leases, now):
+            if leases.get(key, [None])[0] != owner:
+                return False
+            leases[key] = [value, now + ttl]
+            return True
+
+        return self._update(change)
+
+    async def release(self, key: str, owner: str) -> bool:
+        def change(leases, now):
+            if leases.get(key, [None])[0] != owner:
+                return False
+            del leases[key]
+            return True
+
+        return self._update(change)
+
+    async def close(self):
+        pass
+
+
+class ShardLeases:
+    """
+    The shards one ingestion node holds. A node claims a shard before fetching
+    its publishers and renews its leases with heartbeats. A node that dies stops
+    renewing, so its shards become free for the others after LEASE_TTL seconds.
+    Finished shards stay claimed for SHARD_COOLDOWN seconds, so another node
+    doesn't fetch the same publishers again within that cycle.
+
+    Example:
+        >>> leases = ShardLeases(LocalLeaseStore("/tmp/leases.json"), node_id="node-a")
+        >>> asyncio.run(leases.claim("12.1"))
+        True
+        >>> leases.holds("12.1")
+        True
+        >>> asyncio.run(leases.release_all())
+    """
+
+    def __init__(self, store, node_id: str, ttl: float = LEASE_TTL, cooldown: float = SHARD_COOLDOWN):
+        self.store = store
+        self.node_id = node_id
+        self.ttl = ttl
+        self.cooldown = cooldown
+        self.held = set()
+        self.lost = 0
+
+    @staticmethod
+    def _key(shard: str) -> str:
+        return f"{KEY_PREFIX}{shard}"
+
+    def holds(self, shard: str) -> bool:
+        return shard in self.held
+
+    async def claim(self, shard: str) -> bool:
+        """Take the lease on a shard. False when another node has it, or finished it recently."""
+        if shard in self.held:
+            return True
+        if await self.store.acquire(self._key(shard), self.node_id, self.ttl):
+            self.held.add(shard)
+            return True
+        return False
+
+    async def renew(self) -> int:
+        """Extend every held lease. Shards that were lost meanwhile are dropped; returns their count."""
+        lost = [
+            shard for shard in list(self.held)
+            if not await self.store.renew(self._key(shard), self.node_id, self.ttl)
+        ]
+        self.held.difference_update(lost)
+        self.lost += len(lost)
+        return len(lost)
+
+    async def heartbeat(self):
+        """Renew the held leases every ttl / HEARTBEATS_PER_TTL seconds, until cancelled."""
+        while True:
+            await asyncio.sleep(self.ttl / HEARTBEATS_PER_TTL)
+            try:
+                await self.renew()
+            except Exception:
+                # Store unreachable for now; the leases outlive a few missed beats
+                continue
+
+    async def claim_task(self, name: str, ttl: float) -> bool:
+        """Claim a job only one node should run every `ttl` seconds, e.g. pruning."""
+        return await self.store.acquire(self._key(name), f"done:{self.node_id}", ttl)
+
+    async def finish_all(self):
+        """Mark every held shard done; it stays claimed for `cooldown` seconds."""
+        for shard in list(self.held):
+            await self.store.replace(self._key(shard), self.node_id, f"done:{self.node_id}", self.cooldown)
+        self.held.clear()
+
+    async def release_all(self):
+        """Give up every held shard, e.g. on shutdown, so other nodes can take it over right away."""
+        for shard in list(self.held):
+            await self.store.release(self._key(shard), self.node_id)
+        self.held.clear()
+
+    async def close(self):
+        await self.store.close()
+
+
+def node_name() -> str:
+    """Default node ID: host name and process ID."""
+    return f"{os.uname().nodename}:{os.getpid()}"
@@ -0,0 +1,171 @@
+import hashlib
+import re
+
+from collections import defaultdict
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+NUM_HASHES = 32
+SIGNATURE_SIZE = NUM_HASHES * 4  # Bytes, matches stories.minhash BINARY(128)
+
+# Locality-sensitive hashing: signatures are split into BANDS bands of ROWS
+# hashes, and only stories that agree on a whole band are compared. The chance
+# of becoming candidates crosses 50% around (1 / BANDS) ** (1 / ROWS) ~ 0.6 similarity.
+BANDS = 8
+ROWS = NUM_HASHES // BANDS
+
+# Estimated Jaccard similarity above which two stories are near-duplicates
+MIN_SIMILARITY = 0.6
+
+# Signatures only agree on every hash when the texts have the same words, up to
+# casing and punctuation, or nearly so. Texts made from the same template (same
+# words, other numbers) almost never do.
+SAME_TEXT_SIMILARITY = 1.0
+
+# Texts shorter than this give unreliable signatures ("Live updates", "Weather")
+MIN_WORDS = 6
+
+# Random permutations h(x) = (a * x + b) mod p, fixed so signatures are stable
+# across processes and runs
+_PRIME = (1 << 31) - 1
+_rng = np.random.RandomState(20240601)
+_A = _rng.randint(1, _PRIME, size=NUM_HASHES).astype(np.uint64)
+_B = _rng.randint(0, _PRIME, size=NUM_HASHES).astype(np.uint64)
+
+WORD = re.compile(r"\w+")
+
+
+def signature(text: str) -> Optional[bytes]:
+    """
+    MinHash signature of a text's lowercased words and word bigrams. The share of
+    positions where two signatures agree estimates the Jaccard similarity of the
+    two texts' word sets.
+
+    Args:
+        text: Usually a story's title and description.
+
+    Returns:
+        bytes: SIGNATURE_SIZE bytes, or None for texts with fewer than MIN_WORDS words.
+
+    Example:
+        >>> a = signature("Central bank keeps interest rates unchanged as inflation slows")
+        >>> b = signature("Central bank keeps interest rates unchanged as inflation slows - Reuters")
+        >>> similarity(a, b) >= MIN_SIMILARITY
+        True
+        >>> signature("Live updates") is None
+        True
+    """
+    words = WORD.findall((text or "").lower())
+    if len(words) < MIN_WORDS:
+        return None
+
+    features = set(words)
+    features.update(f"{a} {b}" for a, b in zip(words, words[1:]))
+    digests = b"".join(
+        hashlib.blake2b(feature.encode("utf-8"), digest_size=4).digest() for feature in features
+    )
+    hashes = np.frombuffer(digests, dtype=">u4").astype(np.uint64) % np.uint64(_PRIME)
+
+    # One row per permutation, minimum over the features
+    permuted = (np.outer(_A, hashes) + _B[:, None]) % np.uint64(_PRIME)
+    return permuted.min(axis=1).astype(">u4").tobytes()
+
+
+def similarity(a: bytes, b: bytes) -> float:
+    """
+    Estimated Jaccard similarity of the texts behind two signatures.
+
+    Example:
+        >>> s = signature("one two three four five six seven")
+        >>> similarity(s, s)
+        1.0
+    """
+    return float(np.mean(np.frombuffer(a, dtype=">u4") == np.frombuffer(b, dtype=">u4")))
+
+
+class MinHashIndex:
+    """
+    Locality-sensitive index of story signatures. Each signature is filed under
+    its BANDS bands, and lookups only compare against signatures that share a
+    band, so finding a near-duplicate doesn't scan the whole index.
+    """
+
+    def __init__(self, min_similarity: float = MIN_SIMILARITY):
+        self.min_similarity = min_similarity
+        self._buckets = defaultdict(list)
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    @staticmethod
+    def _bands(value: bytes):
+        band_size = ROWS * 4
+        for band in range(BANDS):
+            yield band, value[band * band_size:(band + 1) * band_size]
+
+    def add(self, value: bytes, cluster_id: int, publisher_id: int = None):
+        """File a signature under the cluster its story belongs to."""
+        entry = (value, cluster_id, publisher_id)
+        for band in self._bands(value):
+            self._buckets[band].append(entry)
+        self._count += 1
+
+    def find(self, value: bytes) -> Optional[Tuple[int, int, float]]:
+        """
+        (cluster_id, publisher_id, similarity) of the most similar indexed
+        signature that is at least min_similarity similar to `value`, or None.
+
+        Example:
+            >>> index = MinHashIndex()
+            >>> index.add(signature("one two three four five six seven"), cluster_id=7, publisher_id=1)
+            >>> index.find(signature("one two three four five six seven eight"))[:2]
+            (7, 1)
+            >>> index.find(signature("a completely different text about other things")) is None
+            True
+        """
+        best, best_similarity = None, self.min_similarity
+        seen = set()
+        for band in self._bands(value):
+            for entry in self._buckets.get(band, ()):
+                if id(entry) in seen:
+                    continue
+                seen.add(id(entry))
+                score = similarity(value, entry[0])
+                if score >= best_similarity:
+                    best, best_similarity = (entry[1], entry[2], score), score
+        return best
+
+
+def assign_clusters(index: MinHashIndex, items: list) -> List[Optional[Tuple[int, bool]]]:
+    """
+    Cluster a batch of new stories against `index` and against each other.
+    `items` holds (signature, publisher_id, new_cluster_id) per story, where
+    new_cluster_id names the cluster a story starts when nothing matches.
+
+    The batch is not added to `index`: file the signatures once the stories are
+    stored, otherwise a batch that failed to store would match itself when it is
+    fetched again, and be dropped as a republication.
+
+    Returns per story (cluster_id, matched an existing story), or None for a
+    story that is all but the same text as one by the same publisher.
+
+    Example:
+        >>> text = signature("one two three four five six seven")
+        >>> assign_clusters(MinHashIndex(), [(text, 1, 10), (text, 1, 20), (text, 2, 30)])
+        [(10, False), None, (10, True)]
+    """
+    batch = MinHashIndex(index.min_similarity)
+    assigned = []
+    for value, publisher_id, new_cluster_id in items:
+        matches = [match for match in (index.find(value), batch.find(value)) if match]
+        match = max(matches, key=lambda match: match[2]) if matches else None
+        if match and match[1] == publisher_id and match[2] >= SAME_TEXT_SIMILARITY:
+            assigned.append(None)
+            continue
+
+        cluster_id = match[0] if match else new_cluster_id
+        batch.add(value, cluster_id, publisher_id)
+        assigned.append((cluster_id, match is not None))
+    return assigned
@@ -1,6 +1,6 @@
 from datetime import datetime, timedelta
 from flask_login import UserMixin
-from sqlalchemy.dialects.mysql import MEDIUMINT, TIMESTAMP, TINYBLOB, BINARY, CHAR
+from sqlalchemy.dialects.mysql import MEDIUMINT, TIMESTAMP, TINYBLOB, BINARY, CHAR, BIGINT, TINYINT, SMALLINT
 
 from .extensions import db
 from . import (
@@ -9,6 +9,7 @@ from . import (
     totp_util,
     qol_util,
     input_sanitization,
+    encode_util,
     config,
 )
 
@@ -55,6 +56,39 @@ class Publisher(db.Model):
     __table_args__ = (db.Index("uq_site_url", "site_url", unique=True),)
 
 
+class PublisherFetchState(db.Model):
+    __tablename__ = "publisher_fetch_state"
+    publisher_id = db.Column(
+        db.Integer,
+        db.ForeignKey("publishers.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+
+    # HTTP validators from the last successful fetch (used for conditional GETs)
+    etag = db.Column(db.String(255))
+    last_modified = db.Column(db.String(64))
+    content_hash = db.Column(BINARY(16))  # MD5 of the last feed body
+    last_fetched_at = db.Column(db.DateTime)
+
+    # Adaptive polling schedule (see scheduler_util)
+    poll_interval = db.Column(db.Integer)  # seconds
+    next_due_at = db.Column(db.DateTime)
+    new_item_ratio = db.Column(db.Float)
+
+    # Feed health and circuit breaker (see search_news.record_fetch_outcome)
+    consecutive_failures = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    last_success_at = db.Column(db.DateTime)
+    last_error = db.Column(db.String(32))
+    latency_ewma = db.Column(db.Float)  # seconds
+    circuit_open_until = db.Column(db.DateTime)
+
+    __table_args__ = (db.Index("idx_fetch_state_next_due", "next_due_at"),)
+
+    publisher = db.relationship(
+        "Publisher", backref=db.backref("fetch_state", uselist=False)
+    )
+
+
 class Category(db.Model):
     __tablename__ = "categories"
     id = db.Column(db.Integer, autoincrement=True, primary_key=True)
@@ -100,8 +134,19 @@ class Story(db.Model):
 
     pub_date = db.Column(db.DateTime, nullable=False)
     has_image = db.Column(db.Boolean, default=False)
+    image_variants = db.Column(
+        TINYINT(unsigned=True), nullable=False, default=0, server_default="0"
+    )  # srcset copies stored next to the image, as encode_util.VARIANT_BITS / WEBP_BIT
+    image_width = db.Column(
+        SMALLINT(unsigned=True), nullable=False, default=0, server_default="0"
+    )  # width of the full-size image, 0 if unknown
+    feed_image_url = db.Column(db.String(512))  # image the feed carried, used instead of scraping
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
 
+    # Near-duplicate clustering, filled by search_news (see minhash_util)
+    minhash = db.Column(BINARY(128))
+    cluster_id = db.Column(BIGINT(unsigned=True))
+
     category_id = db.Column(db.Integer, db.ForeignKey("categories.id"), nullable=False)
     publisher_id = db.Column(db.Integer, db.ForeignKey("publishers.id"), nullable=False)
 
@@ -124,20 +169,72 @@ class Story(db.Model):
     )
     country = db.relationship("Country", backref="story", lazy="joined")
 
+    __table_args__ = (
+        db.Index("idx_stories_pub_date", "pub_date"),
+        db.Index("idx_stories_cluster_id", "cluster_id"),
+    )
+
     def get_public_id(self) -> str:
         return hashing_util.binary_to_md5_hex(self.url_hash)
 
-    def get_image_url(self) -> str:
+    def get_image_url(self, width: int = None, image_format: str = "avif") -> str:
         if not self.has_image:
             return ""
 
-        path = f"stories/{self.category.name}/{self.get_public_id()}.avif"
-        return get_storage_url(path)
+        path = f"stories/{self.category.name}/{self.get_public_id()}"
+        return get_storage_url(path + encode_util.variant_suffix(width, image_format))
 
     @property
     def image_url(self) -> str:
         return self.get_image_url()
 
+    def get_image_sources(self) -> list:
+        """
+        srcset of each stored image format, preferred first, ready for <source>
+        elements: [{"type": "image/avif", "srcset": ".../id-320.avif 320w, .../id.avif 960w"}].
+        The full-size image is listed at its stored width; images stored before
+        that was recorded get no descriptor, which browsers read as 1x.
+        """
+        if not self.has_image:
+            return []
+
+        variants = self.image_variants or 0
+        widths = encode_util.variant_widths(variants)
+        formats = ("avif", "webp") if variants & encode_util.WEBP_BIT else ("avif",)
+        sources = []
+        for image_format in formats:
+            full_size = self.get_image_url(None, image_format)
+            if self.image_width:
+                full_size += f" {self.image_width}w"
+            sources.append({
+                "type": f"image/{image_format}",
+                "srcset": ", ".join(
+                    [f"{self.get_image_url(width, image_format)} {width}w" for width in widths] + [full_size]
+                ),
+            })
+        return sources
+
+    def get_cluster_summary(self):
+        """
+        gpt_summary of a near-duplicate story in the same language (same cluster),
+        if one was already summarized. Saves an LLM call for wire stories that many
+        publishers carry.
+        """
+        if not self.cluster_id:
+            return None
+
+        sibling = (
+            Story.query.with_entities(Story.gpt_summary)
+            .filter(
+                Story.cluster_id == self.cluster_id,
+                Story.lang == self.lang,
+                Story.id != self.id,
+                Story.gpt_summary.isnot(None),
+            )
+            .first()
+        )
+        return sibling.gpt_summary if sibling else None
+
     def to_dict(self) -> dict:
         return {
             "story_id": self.get_public_id(),
@@ -157,6 +254,7 @@ class Story(db.Model):
                 "favicon_url": self.publisher.favicon_url,
             },
             "image_url": self.get_image_url(),
+            "image_sources": self.get_image_sources(),
         }
 
 
@@ -568,6 +666,28 @@ class SiteStatistics(db.Model):
     total_clicks = db.Column(db.Integer, nullable=False)
 
 
+class StoryDailyCount(db.Model):
+    # Stories per pub_date day and category, kept up to date by ingestion (see rollup_util)
+    __tablename__ = "story_daily_counts"
+    day = db.Column(db.Date, primary_key=True)
+    category_id = db.Column(
+        db.Integer,
+        db.ForeignKey("categories.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    stories = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+
+
+class EngagementDailyCount(db.Model):
+    # Story likes/dislikes, comments and bookmarks per day, kept up to date by the API
+    __tablename__ = "engagement_daily_counts"
+    day = db.Column(db.Date, primary_key=True)
+    likes = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    dislikes = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    comments = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    bookmarks = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+
+
 class Comment(db.Model):
     __tablename__ = "comments"
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
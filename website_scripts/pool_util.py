@@ -0,0 +1,36 @@
+import asyncio
+import os
+
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+
+async def is_healthy(executor: ProcessPoolExecutor) -> bool:
+    """
+    Whether a process pool still runs tasks. Once one of its workers dies (an
+    OOM kill, a crash in a C extension), a ProcessPoolExecutor fails every task
+    with BrokenProcessPool, for good.
+    """
+    try:
+        await asyncio.get_event_loop().run_in_executor(executor, os.getpid)
+        return True
+    except BrokenProcessPool:
+        return False
+
+
+async def replace_if_broken(executor: ProcessPoolExecutor, workers: int) -> Optional[ProcessPoolExecutor]:
+    """
+    A new pool of `workers` processes to use instead of `executor` if it broke,
+    or None while it still works. The broken pool is shut down.
+
+    Example:
+        >>> pool = ProcessPoolExecutor(max_workers=1)
+        >>> asyncio.run(replace_if_broken(pool, 1)) is None
+        True
+        >>> pool.shutdown()
+    """
+    if await is_healthy(executor):
+        return None
+    executor.shutdown(wait=False)
+    return ProcessPoolExecutor(max_workers=workers)
@@ -0,0 +1,233 @@
+import codecs
+import re
+
+from html.parser import HTMLParser
+from typing import List, Optional
+from urllib.parse import urljoin, urlsplit
+
+# Bytes of a page read at most while looking for its <head> metadata. Some pages
+# inline large scripts and styles in <head>, so this is well above a typical head.
+HEAD_MAX_BYTES = 256 * 1024
+
+# Preview image metadata, best first: <meta property/name=...> and <link rel="image_src">
+IMAGE_PROPERTIES = (
+    "og:image",
+    "og:image:url",
+    "og:image:secure_url",
+    "twitter:image",
+    "twitter:image:src",
+    "image_src",
+)
+
+# Favicon <link rel> values, best first
+ICON_RELS = ("icon", "shortcut icon", "apple-touch-icon", "apple-touch-icon-precomposed")
+
+# Elements that belong in <head>. Any other start tag means the body has begun.
+HEAD_TAGS = {"html", "head", "title", "meta", "link", "base", "script", "style", "noscript", "template"}
+
+# Bytes looked at for a <meta charset> when the Content-Type has no charset
+CHARSET_SNIFF_SIZE = 1024
+
+# Elements whose content isn't part of the head's metadata
+_OPAQUE_TAGS = {"noscript", "template"}
+
+# Bytes needed to recognize an image format by its signature
+IMAGE_SNIFF_SIZE = 16
+
+# Leading bytes of the formats Pillow opens for story images and favicons
+IMAGE_SIGNATURES = (
+    (b"\xff\xd8\xff", "jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "png"),
+    (b"GIF87a", "gif"),
+    (b"GIF89a", "gif"),
+    (b"BM", "bmp"),
+    (b"\x00\x00\x01\x00", "ico"),
+    (b"II*\x00", "tiff"),
+    (b"MM\x00*", "tiff"),
+)
+
+# ISO media brands (bytes 8-12 of an 'ftyp' box) of AVIF images
+AVIF_BRANDS = (b"avif", b"avis")
+
+# Declared content types that are never an image. Images are also served as
+# application/octet-stream or without a type, so only these are rejected unseen.
+NON_IMAGE_CONTENT_TYPES = (
+    "text/", "audio/", "video/", "font/", "application/json", "application/xml",
+    "application/xhtml", "application/javascript", "application/pdf", "application/zip",
+)
+
+_META_CHARSET = re.compile(rb"""<meta[^>]+charset\s*=\s*["']?\s*([\w.:-]+)""", re.I)
+_HEADER_CHARSET = re.compile(r"""charset\s*=\s*["']?([\w.:-]+)""", re.I)
+
+
+def _encoding(content_type: str, head: bytes) -> str:
+    """Encoding of a page: the Content-Type charset, a <meta charset> near the top, else UTF-8."""
+    match = _HEADER_CHARSET.search(content_type or "") or _META_CHARSET.search(head[:CHARSET_SNIFF_SIZE])
+    if match:
+        name = match.group(1)
+        name = name.decode("ascii", "replace") if isinstance(name, bytes) else name
+        try:
+            return codecs.lookup(name).name
+        except LookupError:
+            pass
+    return "utf-8"
+
+
+class HeadScanner(HTMLParser):
+    """
+    Incremental scanner for the preview metadata in a page's <head>. Feed it the
+    page in chunks as they arrive; it stops at </head>, at the first element
+    that belongs to the body, or after `max_bytes`, so the rest of the page
+    needn't be downloaded or parsed. Call finish() if the page ends first.
+
+    Example:
+        >>> scanner = HeadScanner("https://example.com/news/1")
+        >>> scanner.scan(b'<html><head><meta property="og:image" content="/a.jpg">')
+        False
+        >>> scanner.scan(b'<link rel="icon" href="/favicon.png"></head><body>...')
+        False
+        >>> scanner.finish()
+        >>> scanner.image, scanner.favicon
+        ('https://example.com/a.jpg', 'https://example.com/favicon.png')
+    """
+
+    def __init__(self, base_url: str, content_type: str = "", max_bytes: int = HEAD_MAX_BYTES):
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self.content_type = content_type
+        self.max_bytes = max_bytes
+        self.bytes_read = 0
+        self.done = False
+        self._decoder = None
+        self._pending = b""
+        self._opaque_depth = 0
+        self._images = {}
+        self._icons = {}
+
+    def scan(self, chunk: bytes) -> bool:
+        """Feed the next chunk of the page. Returns True once the head was scanned."""
+        if self.done:
+            return True
+
+        chunk = chunk[:self.max_bytes - self.bytes_read]
+        self.bytes_read += len(chunk)
+        if self._decoder is None:
+            # Hold the start back until a <meta charset> in it can be seen
+            self._pending += chunk
+            if len(self._pending) < CHARSET_SNIFF_SIZE and self.bytes_read < self.max_bytes:
+                return False
+            chunk, self._pending = self._pending, b""
+            self._decoder = codecs.getincrementaldecoder(_encoding(self.content_type, chunk))("replace")
+
+        self.feed(self._decoder.decode(chunk))
+        if self.bytes_read >= self.max_bytes:
+            self.done = True
+        return self.done
+
+    def finish(self):
+        """The page ended: scan whatever is still buffered."""
+        if self._decoder is None:
+            self._decoder = codecs.getincrementaldecoder(_encoding(self.content_type, self._pending))("replace")
+            chunk, self._pending = self._pending, b""
+        else:
+            chunk = b""
+        if not self.done:
+            self.feed(self._decoder.decode(chunk, final=True))
+            self.close()
+        self.done = True
+
+    @property
+    def images(self) -> List[str]:
+        """Absolute http(s) preview image URLs found, best first."""
+        return [self._images[key] for key in IMAGE_PROPERTIES if key in self._images]
+
+    @property
+    def image(self) -> Optional[str]:
+        images = self.images
+        return images[0] if images else None
+
+    @property
+    def favicon(self) -> Optional[str]:
+        for rel in ICON_RELS:
+            if rel in self._icons:
+                return self._icons[rel]
+        return None
+
+    def _url(self, value: Optional[str]) -> Optional[str]:
+        if not value or not value.strip():
+            return None
+        url = urljoin(self.base_url, value.strip())
+        return url if urlsplit(url).scheme in ("http", "https") else None
+
+    def handle_starttag(self, tag, attrs):
+        if self.done:
+            return
+        if tag not in HEAD_TAGS and not self._opaque_depth:
+            self.done = True
+            return
+        if tag in _OPAQUE_TAGS:
+            self._opaque_depth += 1
+            return
+        if self._opaque_depth:
+            return
+
+        attrs = {name: value for name, value in attrs if value is not None}
+        if tag == "base" and "href" in attrs:
+            self.base_url = urljoin(self.base_url, attrs["href"].strip())
+        elif tag == "meta":
+            key = (attrs.get("property") or attrs.get("name") or "").strip().lower()
+            url = self._url(attrs.get("content")) if key in IMAGE_PROPERTIES else None
+            if url:
+                self._images.setdefault(key, url)
+        elif tag == "link":
+            rel = " ".join((attrs.get("rel") or "").lower().split())
+            url = self._url(attrs.get("href"))
+            if not url:
+                return
+            if rel == "image_src":
+                self._images.setdefault(rel, url)
+            elif rel in ICON_RELS:
+                self._icons.setdefault(rel, url)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag in _OPAQUE_TAGS and self._opaque_depth:
+            self._opaque_depth -= 1
+
+    def handle_endtag(self, tag):
+        if tag in _OPAQUE_TAGS and self._opaque_depth:
+            self._opaque_depth -= 1
+        elif tag == "head":
+            self.done = True
+
+
+def sniff_image(head: bytes) -> Optional[str]:
+    """
+    Image format of a body from its first bytes (at least IMAGE_SNIFF_SIZE),
+    or None when they aren't an image's.
+
+    Example:
+        >>> sniff_image(b"\\x89PNG\\r\\n\\x1a\\n\\x00\\x00\\x00\\rIHDR")
+        'png'
+        >>> sniff_image(b"<!DOCTYPE html><html>") is None
+        True
+    """
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "webp"
+    if head[4:8] == b"ftyp" and head[8:12] in AVIF_BRANDS:
+        return "avif"
+    for signature, image_format in IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            return image_format
+    return None
+
+
+def is_non_image_type(content_type: str) -> bool:
+    """
+    Whether a declared Content-Type rules an image out.
+
+    Example:
+        >>> is_non_image_type("text/html; charset=utf-8"), is_non_image_type("application/octet-stream")
+        (True, False)
+    """
+    return (content_type or "").strip().lower().startswith(NON_IMAGE_CONTENT_TYPES)
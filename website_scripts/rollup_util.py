@@ -0,0 +1,216 @@
+from collections import Counter
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Tuple
+
+from sqlalchemy import text
+
+# Columns of engagement_daily_counts
+ENGAGEMENT_METRICS = ("likes", "dislikes", "comments", "bookmarks")
+
+# story_reactions.action -> engagement metric. Other actions (e.g. 'report') aren't counted.
+REACTION_METRICS = {"like": "likes", "dislike": "dislikes"}
+
+# Kind of engagement event (a reaction action, 'comment' or 'bookmark') -> metric
+EVENT_METRICS = {**REACTION_METRICS, "comment": "comments", "bookmark": "bookmarks"}
+
+# Adds (day, category_id, stories) rows to the story rollup; negative counts subtract
+STORY_COUNTS_UPSERT = """
+    INSERT INTO story_daily_counts (day, category_id, stories)
+    VALUES (%s, %s, %s)
+    ON DUPLICATE KEY UPDATE stories = stories + VALUES(stories)
+"""
+
+# Adds (day, likes, dislikes, comments, bookmarks) rows to the engagement rollup;
+# negative counts subtract
+ENGAGEMENT_COUNTS_UPSERT = """
+    INSERT INTO engagement_daily_counts (day, likes, dislikes, comments, bookmarks)
+    VALUES (%s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        likes = likes + VALUES(likes),
+        dislikes = dislikes + VALUES(dislikes),
+        comments = comments + VALUES(comments),
+        bookmarks = bookmarks + VALUES(bookmarks)
+"""
+
+# (day, kind, n) rows of the reactions and bookmarks of some stories, which are
+# deleted along with them. Format {ids} with one placeholder per story ID and
+# pass the IDs twice.
+STORY_ENGAGEMENT_SELECT = """
+    SELECT DATE(created_at) AS day, action AS kind, COUNT(*) AS n
+    FROM story_reactions WHERE story_id IN ({ids}) GROUP BY day, kind
+    UNION ALL
+    SELECT DATE(created_at), 'bookmark', COUNT(*)
+    FROM bookmarks WHERE story_id IN ({ids}) GROUP BY DATE(created_at)
+"""
+
+# Recompute both rollups from the source tables, e.g. after a backfill or to repair drift
+REBUILD_STATEMENTS = (
+    "DELETE FROM story_daily_counts",
+    """
+    INSERT INTO story_daily_counts (day, category_id, stories)
+    SELECT DATE(pub_date), category_id, COUNT(*)
+    FROM stories
+    WHERE pub_date IS NOT NULL
+    GROUP BY DATE(pub_date), category_id
+    """,
+    "DELETE FROM engagement_daily_counts",
+    """
+    INSERT INTO engagement_daily_counts (day, likes, dislikes, comments, bookmarks)
+    SELECT day, SUM(likes), SUM(dislikes), SUM(comments), SUM(bookmarks)
+    FROM (
+        SELECT DATE(created_at) AS day, action = 'like' AS likes, action = 'dislike' AS dislikes,
+               0 AS comments, 0 AS bookmarks
+        FROM story_reactions WHERE action IN ('like', 'dislike') AND created_at IS NOT NULL
+        UNION ALL
+        SELECT DATE(created_at), 0, 0, 1, 0 FROM comments WHERE created_at IS NOT NULL
+        UNION ALL
+        SELECT DATE(created_at), 0, 0, 0, 1 FROM bookmarks
+    ) AS events
+    GROUP BY day
+    """,
+)
+
+
+def _day(value) -> date:
+    """The day of a date, datetime or 'YYYY-MM-DD ...' string; today (UTC) for None."""
+    if value is None:
+        return datetime.utcnow().date()
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+def story_day_counts(stories: Iterable[Tuple]) -> List[Tuple[date, int, int]]:
+    """
+    Fold (pub_date, category_id) pairs into (day, category_id, count) rows for
+    STORY_COUNTS_UPSERT, sorted so concurrent writers lock rollup rows in the
+    same order.
+
+    Example:
+        >>> story_day_counts([("2026-10-17 08:00:00", 3), ("2026-10-17 21:15:00", 3), ("2026-10-16 23:59:59", 1)])
+        [(datetime.date(2026, 10, 16), 1, 1), (datetime.date(2026, 10, 17), 3, 2)]
+    """
+    counts = Counter((_day(pub_date), category_id) for pub_date, category_id in stories)
+    return [(day, category_id, count) for (day, category_id), count in sorted(counts.items())]
+
+
+def group_by_day(items: Iterable[Tuple]) -> Dict[Tuple[date, int], list]:
+    """
+    Group (pub_date, category_id, item) triples by (day, category_id), in the
+    order of story_day_counts. Inserting each group on its own gives the exact
+    number of new stories per rollup row from the affected row counts.
+
+    Example:
+        >>> group_by_day([("2026-10-17 08:00:00", 3, "a"), ("2026-10-16 12:00:00", 3, "b"), ("2026-10-17", 3, "c")])
+        {(datetime.date(2026, 10, 16), 3): ['b'], (datetime.date(2026, 10, 17), 3): ['a', 'c']}
+    """
+    groups = {}
+    for pub_date, category_id, item in items:
+        groups.setdefault((_day(pub_date), category_id), []).append(item)
+    return dict(sorted(groups.items()))
+
+
+def engagement_day_counts(rows: Iterable[Tuple], sign: int = 1) -> List[Tuple]:
+    """
+    Fold (day, kind, count) rows, where kind is a key of EVENT_METRICS, into
+    (day, likes, dislikes, comments, bookmarks) rows for ENGAGEMENT_COUNTS_UPSERT,
+    multiplied by `sign` and sorted by day. Rows without a day or of kinds that
+    aren't counted (e.g. 'report') are skipped.
+
+    Example:
+        >>> engagement_day_counts([(date(2026, 10, 17), "like", 2), (date(2026, 10, 17), "bookmark", 1), (date(2026, 10, 17), "report", 4)], sign=-1)
+        [(datetime.date(2026, 10, 17), -2, 0, 0, -1)]
+    """
+    totals = {}
+    for day, kind, count in rows:
+        metric = EVENT_METRICS.get(kind)
+        if day is None or metric is None:
+            continue
+        day_totals = totals.setdefault(_day(day), dict.fromkeys(ENGAGEMENT_METRICS, 0))
+        day_totals[metric] += sign * int(count)
+    return [(day, *(day_totals[metric] for metric in ENGAGEMENT_METRICS)) for day, day_totals in sorted(totals.items())]
+
+
+def daily_series(counts: dict, start: date, days: int) -> list:
+    """
+    {day: count} as a list of `days` counts from `start` on, zero for days without a row.
+
+    Example:
+        >>> daily_series({date(2026, 10, 2): 5}, date(2026, 10, 1), 3)
+        [0, 5, 0]
+    """
+    return [counts.get(start + timedelta(days=i), 0) for i in range(days)]
+
+
+def top_countries(category_counts: Iterable[Tuple[str, int]], limit: int = 5) -> list:
+    """
+    Fold (category name, count) pairs into per-country totals by the name's
+    country prefix ('br_general' -> 'BR') and return the `limit` largest.
+
+    Example:
+        >>> top_countries([("br_general", 3), ("us_general", 2), ("br_sports", 4)], limit=1)
+        [{'country': 'BR', 'count': 7}]
+    """
+    totals = Counter()
+    for category_name, count in category_counts:
+        totals[category_name.split("_", 1)[0].upper()] += int(count or 0)
+    return [{"country": country, "count": count} for country, count in totals.most_common(limit)]
+
+
+def count_engagement(session, metric: str, day, delta: int = 1):
+    """
+    Add `delta` to one day's engagement metric. Runs in the session's
+    transaction, so the rollup commits or rolls back together with the write it
+    counts. `day` is the stored created_at of the row counted, the day
+    REBUILD_STATEMENTS would count it on.
+    """
+    if metric not in ENGAGEMENT_METRICS:
+        raise ValueError(f"Unknown engagement metric: {metric}")
+
+    session.execute(
+        text(
+            f"""
+            INSERT INTO engagement_daily_counts (day, {metric}) VALUES (:day, :delta)
+            ON DUPLICATE KEY UPDATE {metric} = {metric} + VALUES({metric})
+            """
+        ),
+        {"day": _day(day), "delta": delta},
+    )
+
+
+def count_reaction(session, action: str, day, delta: int = 1):
+    """count_engagement for a story reaction; actions that aren't counted are ignored."""
+    metric = REACTION_METRICS.get(action)
+    if metric:
+        count_engagement(session, metric, day, delta)
+
+
+def uncount_user(session, user_id: int):
+    """Take a user's reactions, comments and bookmarks out of the rollup, before they are deleted."""
+    rows = session.execute(
+        text(
+            """
+            SELECT DATE(created_at) AS day, action AS kind, COUNT(*) AS n
+            FROM story_reactions WHERE user_id = :user_id GROUP BY day, kind
+            UNION ALL
+            SELECT DATE(created_at), 'comment', COUNT(*)
+            FROM comments WHERE user_id = :user_id GROUP BY DATE(created_at)
+            UNION ALL
+            SELECT DATE(created_at), 'bookmark', COUNT(*)
+            FROM bookmarks WHERE user_id = :user_id GROUP BY DATE(created_at)
+            """
+        ),
+        {"user_id": user_id},
+    ).all()
+
+    for day, kind, count in rows:
+        if day is not None and kind in EVENT_METRICS:
+            count_engagement(session, EVENT_METRICS[kind], day, -count)
+
+
+def rebuild(session):
+    """Recompute both rollups from the source tables, in the session's transaction."""
+    for statement in REBUILD_STATEMENTS:
+        session.execute(text(statement))
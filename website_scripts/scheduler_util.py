@@ -0,0 +1,163 @@
+from datetime import datetime, timedelta
+from random import uniform
+from statistics import median
+from typing import Iterable, Optional
+
+# Poll intervals, in seconds
+DEFAULT_POLL_INTERVAL = 30 * 60
+MIN_POLL_INTERVAL = 10 * 60
+MAX_POLL_INTERVAL = 24 * 60 * 60
+
+# Weight of the latest fetch in the new-item ratio moving average
+NEW_ITEM_RATIO_ALPHA = 0.3
+
+# Failing publishers: retry after MIN_POLL_INTERVAL, doubling per consecutive failure
+MAX_FAILURE_BACKOFF = 7 * 24 * 60 * 60
+# Consecutive failures after which the circuit opens (publisher skipped until the backoff ends)
+CIRCUIT_BREAKER_THRESHOLD = 5
+
+# Weight of the latest download in the latency moving average
+LATENCY_EWMA_ALPHA = 0.3
+
+
+def estimate_publish_interval(pub_dates: Iterable[datetime]) -> Optional[float]:
+    """
+    Estimates how often a publisher publishes, from the pub dates of its items.
+
+    Args:
+        pub_dates: Publication datetimes (e.g. every entry currently in the feed).
+
+    Returns:
+        Optional[float]: Median gap in seconds between consecutive distinct dates, or None
+        when there are fewer than two usable dates.
+
+    Example:
+        >>> from datetime import datetime
+        >>> estimate_publish_interval([datetime(2025, 1, 1, 10), datetime(2025, 1, 1, 12), datetime(2025, 1, 1, 11)])
+        3600.0
+    """
+    now = datetime.now()
+    dates = sorted({date for date in pub_dates if date and date <= now})
+    if len(dates) < 2:
+        return None
+
+    gaps = [(later - earlier).total_seconds() for earlier, later in zip(dates, dates[1:])]
+    return float(median(gaps))
+
+
+def estimate_interval_from_history(story_count: int, span_seconds: Optional[int]) -> Optional[float]:
+    """
+    Estimates the publish interval from stories we already stored for a publisher.
+
+    Example:
+        >>> estimate_interval_from_history(5, 4 * 3600)
+        3600.0
+    """
+    if not story_count or story_count < 2 or not span_seconds:
+        return None
+    return span_seconds / (story_count - 1)
+
+
+def update_new_item_ratio(previous: Optional[float], new_items: int, total_items: int) -> float:
+    """
+    Exponential moving average of the fraction of fetched items that were new.
+    A fetch that returned nothing (e.g. 304 Not Modified) counts as 0.
+
+    Example:
+        >>> update_new_item_ratio(None, 5, 10)
+        0.5
+        >>> round(update_new_item_ratio(0.5, 0, 10), 2)
+        0.35
+    """
+    current = new_items / total_items if total_items else 0.0
+    if previous is None:
+        return current
+    return (1 - NEW_ITEM_RATIO_ALPHA) * previous + NEW_ITEM_RATIO_ALPHA * current
+
+
+def compute_poll_interval(
+    previous_interval: Optional[int],
+    publish_interval: Optional[float],
+    new_item_ratio: float,
+) -> int:
+    """
+    Computes how long to wait before polling a publisher again.
+
+    Targets about two polls per expected new item. The new-item ratio then corrects the
+    target: fetches that keep finding mostly new items poll faster (items could fall off
+    the feed between polls), and fetches that find nothing back off.
+
+    Args:
+        previous_interval: Last poll interval in seconds, if any.
+        publish_interval: Estimated seconds between the publisher's items, if known.
+        new_item_ratio: Moving average of the fraction of new items per fetch.
+
+    Returns:
+        int: Poll interval in seconds, within [MIN_POLL_INTERVAL, MAX_POLL_INTERVAL].
+
+    Example:
+        >>> compute_poll_interval(None, 3600, 0.2)
+        1800
+        >>> compute_poll_interval(3600, None, 0.0)
+        5400
+    """
+    if publish_interval:
+        target = publish_interval / 2
+    else:
+        target = previous_interval or DEFAULT_POLL_INTERVAL
+
+    if new_item_ratio > 0.5:
+        target *= 0.5
+    elif new_item_ratio == 0:
+        target *= 1.5
+
+    # Smooth against the previous interval so a single odd fetch doesn't swing it
+    if previous_interval and publish_interval:
+        target = (previous_interval + target) / 2
+
+    return int(min(MAX_POLL_INTERVAL, max(MIN_POLL_INTERVAL, target)))
+
+
+def compute_next_due(interval: int, now: Optional[datetime] = None, jitter: float = 0.1) -> datetime:
+    """
+    Returns when a publisher should next be polled. A small random jitter keeps publishers
+    with the same interval from all becoming due in the same run.
+    """
+    now = now or datetime.now()
+    return now + timedelta(seconds=interval * uniform(1 - jitter, 1 + jitter))
+
+
+def update_latency_ewma(previous: Optional[float], latency: float) -> float:
+    """
+    Exponential moving average of a publisher's download latency, in seconds.
+
+    Example:
+        >>> update_latency_ewma(None, 2.0)
+        2.0
+        >>> round(update_latency_ewma(2.0, 12.0), 2)
+        5.0
+    """
+    if previous is None:
+        return latency
+    return (1 - LATENCY_EWMA_ALPHA) * previous + LATENCY_EWMA_ALPHA * latency
+
+
+def compute_failure_backoff(consecutive_failures: int) -> int:
+    """
+    Seconds to wait before retrying a publisher whose last fetches failed.
+
+    Example:
+        >>> compute_failure_backoff(1) == MIN_POLL_INTERVAL
+        True
+        >>> compute_failure_backoff(3) == 4 * MIN_POLL_INTERVAL
+        True
+        >>> compute_failure_backoff(50) == MAX_FAILURE_BACKOFF
+        True
+    """
+    exponent = min(max(consecutive_failures, 1) - 1, 20)
+    return min(MAX_FAILURE_BACKOFF, MIN_POLL_INTERVAL * 2 ** exponent)
+
+
+def is_circuit_open(consecutive_failures: int) -> bool:
+    """A publisher that failed this many times in a row is treated as dead until its backoff ends."""
+    return consecutive_failures >= CIRCUIT_BREAKER_THRESHOLD
@@ -0,0 +1,117 @@
+from urllib.parse import parse_qsl, unquote, urlsplit, urlunsplit
+
+# Query parameters that only track where a click came from
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "gclsrc", "msclkid", "yclid", "igshid", "twclid", "ttclid",
+    "_ga", "_gl", "_hsenc", "_hsmi", "mkt_tok", "oly_enc_id", "oly_anon_id", "vero_id",
+    "cmpid", "cmp", "icid", "ocid", "ito", "taid", "smid", "sr_share", "ref_src", "ref_url",
+    "rss", "xtor", "wt_mc", "wt.mc_id", "spm", "sharesource",
+}
+TRACKING_PREFIXES = ("utm_", "at_", "ns_", "mc_", "pk_", "piwik_", "matomo_", "itm_")
+
+# Redirectors that carry the real article URL in a query parameter
+REDIRECT_PARAMS = {
+    ("www.google.com", "/url"): ("url", "q"),
+    ("google.com", "/url"): ("url", "q"),
+    ("news.google.com", "/news/url"): ("url",),
+    ("l.facebook.com", "/l.php"): ("u",),
+    ("www.bing.com", "/news/apiclick.aspx"): ("url",),
+    ("out.reddit.com", "/"): ("url",),
+    ("t.umblr.com", "/redirect"): ("z",),
+    ("feeds.feedblitz.com", "/~/t/0/0/"): ("url",),
+    ("www.linkedin.com", "/redir/redirect"): ("url",),
+}
+MAX_UNWRAP = 3
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def _is_tracking_param(name: str) -> bool:
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+
+def _query_params(query: str) -> list:
+    """Non-tracking `name=value` pairs of a query string, still encoded as they came."""
+    return [
+        param for param in query.split("&")
+        if param and not _is_tracking_param(unquote(param.split("=", 1)[0]))
+    ]
+
+
+def _unwrap_redirect(parts):
+    """The URL a known redirector points to, or None."""
+    host = (parts.hostname or "").lower()
+    for (redirect_host, path_prefix), params in REDIRECT_PARAMS.items():
+        if host != redirect_host or not parts.path.startswith(path_prefix):
+            continue
+        query = dict(parse_qsl(parts.query, keep_blank_values=True))
+        for param in params:
+            target = unquote(query.get(param, "")).strip()
+            if target.lower().startswith(("http://", "https://")):
+                return target
+    return None
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Cleaned-up version of a story link, safe to store and to open: known
+    redirectors are unwrapped, credentials, default ports, fragments and tracking
+    query parameters are removed and the host is lowercased. The path and the
+    order of the remaining parameters are kept as they are.
+
+    Args:
+        url: Link from a feed entry.
+
+    Returns:
+        str: The canonical URL, or `url` unchanged when it can't be parsed.
+
+    Example:
+        >>> canonicalize_url("HTTPS://User@News.Example.COM:443/a/b/?utm_source=rss&id=7&fbclid=x#top")
+        'https://news.example.com/a/b/?id=7'
+        >>> canonicalize_url("https://www.google.com/url?q=https%3A%2F%2Fexample.com%2Fstory&sa=t")
+        'https://example.com/story'
+    """
+    try:
+        parts = urlsplit(url.strip())
+        for _ in range(MAX_UNWRAP):
+            target = _unwrap_redirect(parts)
+            if not target:
+                break
+            parts = urlsplit(target)
+
+        scheme = parts.scheme.lower()
+        host = (parts.hostname or "").rstrip(".")
+        port = parts.port
+    except (AttributeError, ValueError):
+        return url
+
+    if not scheme or not host:
+        return url
+
+    netloc = host if port in (None, DEFAULT_PORTS.get(scheme)) else f"{host}:{port}"
+    query = "&".join(_query_params(parts.query))
+    return urlunsplit((scheme, netloc, parts.path or "/", query, ""))
+
+
+def url_key(url: str) -> str:
+    """
+    Identity of a story link, hashed into stories.url_hash. On top of
+    canonicalize_url it ignores the scheme, a leading "www.", a trailing slash and
+    the order of query parameters, so links that differ only in those are the
+    same story.
+
+    Example:
+        >>> url_key("http://www.example.com/a/b/?y=2&x=1&utm_medium=feed")
+        'example.com/a/b?x=1&y=2'
+        >>> url_key("https://example.com/a/b?x=1&y=2") == url_key("http://www.example.com/a/b/?y=2&x=1")
+        True
+    """
+    parts = urlsplit(canonicalize_url(url))
+    host = parts.netloc
+    if host.startswith("www."):
+        host = host[4:]
+
+    path = parts.path.rstrip("/")
+    query = "&".join(sorted(_query_params(parts.query)))
+    return f"{host}{path}?{query}" if query else f"{host}{path}"